@@ -9,77 +9,84 @@
 # - Forward and Reverse Primer
 # - Mutation in primer
 # - PubMed Literature Search
-
-import requests
+#
+# requests, Biopython and the NumPy-backed modules (composition, primers,
+# seqcontext) are imported by the functions that use them, so the CLI and
+# freshly spawned workers only load what their analyses need.
+#
+# CLI (JSON on stdout; input from --sequence, a file, or stdin):
+#   python analyzer.py gc --sequence ATGCGC
+#   python analyzer.py orfs construct.fa --both-strands --min-length 300
+#   cat seq.txt | python analyzer.py analyze --primer-length 22
+
+import argparse
+import itertools
+import json
 import re
+import sys
 
-try:
-    from Bio import Entrez
-    BIO_AVAILABLE = True
-except ImportError:
-    BIO_AVAILABLE = False
+from metrics import timed
+import seqcore
+import translation
 
 # --------------------------
 # --- Clean Sequence
 # --------------------------
+@timed("clean")
 def clean_sequence(seq):
-    return ''.join([base for base in seq.upper() if base in 'ATGC'])
+    cleaned = seqcore.clean_bytes(seq)
+    return cleaned.decode('ascii') if isinstance(seq, str) else cleaned
 
 # --------------------------
 # --- GC Content
 # --------------------------
+@timed("gc_content")
 def gc_content(seq):
-    g = seq.count('G')
-    c = seq.count('C')
-    return round(((g + c) / len(seq)) * 100, 2)
+    return seqcore.gc_content_bytes(seq)
 
 # --------------------------
 # --- Reverse Complement
 # --------------------------
+@timed("reverse_complement")
 def reverse_complement(seq):
-    complement = {'A': 'T', 'T': 'A', 'G': 'C', 'C': 'G'}
-    return ''.join([complement[base] for base in reversed(seq)])
+    rev = seqcore.reverse_complement_bytes(seq)
+    return rev.decode('ascii') if isinstance(seq, str) else rev
 
 # --------------------------
 # --- Transcription
 # --------------------------
+@timed("transcribe")
 def transcribe(seq):
-    return seq.replace('T', 'U')
+    if isinstance(seq, str):
+        return seq.replace('T', 'U')
+    return seqcore.transcribe_bytes(seq)
 
 # --------------------------
 # --- Translation
 # --------------------------
-def translate_dna(seq):
-    codon_table = {
-        'ATA':'I', 'ATC':'I', 'ATT':'I', 'ATG':'M',
-        'ACA':'T', 'ACC':'T', 'ACG':'T', 'ACT':'T',
-        'AAC':'N', 'AAT':'N', 'AAA':'K', 'AAG':'K',
-        'AGC':'S', 'AGT':'S', 'AGA':'R', 'AGG':'R',
-        'CTA':'L', 'CTC':'L', 'CTG':'L', 'CTT':'L',
-        'CCA':'P', 'CCC':'P', 'CCG':'P', 'CCT':'P',
-        'CAC':'H', 'CAT':'H', 'CAA':'Q', 'CAG':'Q',
-        'CGA':'R', 'CGC':'R', 'CGG':'R', 'CGT':'R',
-        'GTA':'V', 'GTC':'V', 'GTG':'V', 'GTT':'V',
-        'GCA':'A', 'GCC':'A', 'GCG':'A', 'GCT':'A',
-        'GAC':'D', 'GAT':'D', 'GAA':'E', 'GAG':'E',
-        'GGA':'G', 'GGC':'G', 'GGG':'G', 'GGT':'G',
-        'TCA':'S', 'TCC':'S', 'TCG':'S', 'TCT':'S',
-        'TTC':'F', 'TTT':'F', 'TTA':'L', 'TTG':'L',
-        'TAC':'Y', 'TAT':'Y', 'TAA':'_', 'TAG':'_', 'TGA':'_'
-    }
+@timed("translate")
+def translate_dna(seq, genetic_code=1, read_through=False):
+    # Codon lookup is precompiled per NCBI table in translation.py.
+    return translation.translate(seq, genetic_code, read_through=read_through)
 
-    protein = ""
-    for i in range(0, len(seq) - 2, 3):
-        codon = seq[i:i+3]
-        amino_acid = codon_table.get(codon, '?')
-        if amino_acid == '_':
-            break
-        protein += amino_acid
-    return protein
+@timed("translate")
+def translate_six_frames(seq, genetic_code=1, read_through=True):
+    return translation.translate_frames(seq, genetic_code, read_through)
+
+# --------------------------
+# --- Composition Profile
+# --------------------------
+@timed("profile")
+def sequence_profile(seq, window=None, step=None, points=1000, tracks=None, k=None):
+    # Windowed GC%, GC skew, CpG o/e (and k-mer frequencies when k is set),
+    # downsampled to at most ``points`` windows; all tracks by default.
+    import composition
+    return composition.sequence_profile(seq, window, step, points, composition.TRACKS if tracks is None else tracks, k)
 
 # --------------------------
 # --- Primer Generator
 # --------------------------
+@timed("primers")
 def get_primers(seq, primer_len=20):
     if len(seq) < primer_len:
         return ("Sequence too short", "Sequence too short")
@@ -90,14 +97,18 @@ def get_primers(seq, primer_len=20):
 # --------------------------
 # --- Primer Stats
 # --------------------------
+@timed("primer_stats")
 def primer_stats(primer):
-    gc = gc_content(primer)
+    # One pass over the bases serves both GC% and the Wallace fallback.
+    counts = seqcore.base_counts(primer)
     length = len(primer)
-    a = primer.count('A')
-    t = primer.count('T')
-    g = primer.count('G')
-    c = primer.count('C')
-    tm = 2 * (a + t) + 4 * (g + c)
+    gc = round(((counts['G'] + counts['C']) / length) * 100, 2)
+    import primers
+    try:
+        tm = primers.primer_tm(primer)
+    except ValueError:
+        # Not a primer (e.g. "Sequence too short"): fall back to the Wallace rule.
+        tm = 2 * (counts['A'] + counts['T']) + 4 * (counts['G'] + counts['C'])
 
     quality = "Good"
     if length < 18 or length > 25:
@@ -113,6 +124,7 @@ def primer_stats(primer):
 # --- BLAST Function
 # --------------------------
 def blast_primer(primer_seq):
+    import requests
     headers = {
         'User-Agent': 'GautamPandey-DNAAnalyzer/1.0 (pandegautam01@gmail.com)'
     }
@@ -126,7 +138,7 @@ def blast_primer(primer_seq):
         "MEGABLAST": "on"
     }
 
-    response = requests.post(blast_url, data=params, headers=headers)
+    response = requests.post(blast_url, data=params, headers=headers, timeout=30)
     if "RID =" not in response.text:
         return {"status": "failed", "message": "BLAST request failed. Try again later."}
 
@@ -137,6 +149,7 @@ def blast_primer(primer_seq):
 # --------------------------
 # --- Mutation Scanner
 # --------------------------
+@timed("mutation")
 def scan_for_mutation(sequence, f_primer, r_primer, mutation_input):
     if not mutation_input:
         return None
@@ -180,19 +193,28 @@ def scan_for_mutation(sequence, f_primer, r_primer, mutation_input):
         "location": mutation_location
     }
 
-def display_sequence_with_positions(seq, chunk_size=10):
-    result = []
-    for i in range(0, len(seq), chunk_size):
+def iter_display_chunks(seq, chunk_size=10, start=0, stop=None):
+    # (chunk, positions) pairs from chunk index ``start`` up to ``stop``.
+    # The position digits repeat every 10 bases, so each row is a slice of
+    # one precomputed digit string.
+    digits = "1234567890" * (chunk_size // 10 + 2)
+    n_chunks = -(-len(seq) // chunk_size)
+    for index in range(start, n_chunks if stop is None else min(stop, n_chunks)):
+        i = index * chunk_size
         chunk = seq[i:i+chunk_size]
-        positions = ''.join(f"{(i+j+1)%10}" for j in range(len(chunk)))
-        result.append((chunk, positions))
-    return result
+        yield (chunk, digits[i % 10:i % 10 + len(chunk)])
+
+@timed("display")
+def display_sequence_with_positions(seq, chunk_size=10):
+    return list(iter_display_chunks(seq, chunk_size))
 
 # --------------------------
 # --- Literature Search (PubMed Only)
 # --------------------------
 def search_literature_by_sequence(seq, max_results=5, email="pandegautam01@gmail.com"):
-    if not BIO_AVAILABLE:
+    try:
+        from Bio import Entrez
+    except ImportError:
         return {"status": "error", "message": "Bio library not available"}
     
     Entrez.email = email
@@ -206,15 +228,16 @@ def search_literature_by_sequence(seq, max_results=5, email="pandegautam01@gmail
         results = []
 
         if id_list:
-            for pubmed_id in id_list:
-                summary_handle = Entrez.esummary(db="pubmed", id=pubmed_id)
-                summary = Entrez.read(summary_handle)[0]
+            # One esummary call for all IDs instead of one per ID.
+            summary_handle = Entrez.esummary(db="pubmed", id=",".join(id_list))
+            summaries = Entrez.read(summary_handle)
+            summary_handle.close()
+            for pubmed_id, summary in zip(id_list, summaries):
                 results.append({
                     'id': pubmed_id,
                     'title': summary.get('Title', 'No Title'),
                     'url': f"https://pubmed.ncbi.nlm.nih.gov/{pubmed_id}/"
                 })
-                summary_handle.close()
 
         return {"status": "success", "count": len(results), "results": results}
 
@@ -222,154 +245,200 @@ def search_literature_by_sequence(seq, max_results=5, email="pandegautam01@gmail
         return {"status": "error", "message": str(e)}
 
 # --- ORF Finder ----
-def find_orfs_with_translation(seq):
-    start_codon = 'ATG'
-    stop_codons = {'TAA', 'TAG', 'TGA'}
-    orfs = []
-
-    for frame in range(3):  # check all 3 forward frames
-        i = frame
-        while i < len(seq) - 2:
-            codon = seq[i:i+3]
-            if codon == start_codon:
-                for j in range(i + 3, len(seq) - 2, 3):
-                    stop_codon = seq[j:j+3]
-                    if stop_codon in stop_codons:
-                        orf_seq = seq[i:j+3]
-                        protein = translate_dna(orf_seq)
-                        orfs.append({
-                            'start': i + 1,       # 1-based index
-                            'end': j + 3,
-                            'length': j + 3 - i,
-                            'sequence': orf_seq,
-                            'protein': protein
-                        })
-                        break
-                i += 3  # skip overlapping ORFs in same frame
-            else:
-                i += 3
-    return orfs
+def iter_orfs(seq, min_length=0, mode="nested", both_strands=False, include_sequence=True,
+              offset=0, limit=None, context=None):
+    # Generator behind find_orfs_with_translation. offset/limit skip ORFs on
+    # the coordinate stream, before any sequence or protein is built.
+    # Every ORF's protein is a slice of its frame's read-through translation,
+    # and the scan, reverse strand and translations come from ``context``
+    # (a SequenceContext over ``seq``), so each is computed once.
+    if context is None:
+        from seqcontext import SequenceContext
+        context = SequenceContext(seq, clean=False)
+    hits = context.orfs(min_length, mode, both_strands)
+    views = {}  # frame -> (strand sequence, read-through protein)
+    stop = None if limit is None else offset + limit
+    for strand, frame, start, end in itertools.islice(hits, offset, stop):
+        orf = {
+            'start': start,       # 1-based index
+            'end': end,
+            'length': end - start + 1,
+        }
+        if both_strands:
+            orf['strand'] = strand
+            orf['frame'] = frame
+        if include_sequence:
+            view = views.get(frame)
+            if view is None:
+                strand_seq = seq
+                if strand == '-':
+                    strand_seq = (context.reverse_complement_text if isinstance(seq, str)
+                                  else context.reverse_complement)
+                view = views[frame] = (strand_seq, context.translation(frame, read_through=True))
+            strand_seq, protein = view
+            offset_in_strand = start - 1 if strand == '+' else len(seq) - end
+            codon = offset_in_strand // 3
+            orf['sequence'] = strand_seq[offset_in_strand:offset_in_strand + end - start + 1]
+            orf['protein'] = protein[codon:codon + (end - start + 1) // 3 - 1]
+        yield orf
+
+
+@timed("orfs")
+def find_orfs_with_translation(seq, min_length=0, mode="nested", both_strands=False,
+                               include_sequence=True, context=None):
+    # Forward-strand, nested output matches the original three-frame scanner.
+    # both_strands adds the reverse frames and tags every ORF with its
+    # strand and frame; include_sequence=False returns coordinates only.
+    return list(iter_orfs(seq, min_length, mode, both_strands, include_sequence, context=context))
 
 
-if __name__ == "__main__":
-    # --------------------------
-    # --- Get Primer Length!
-    # --------------------------
-    try:
-        primer_len = int(input("Enter primer length (default 20): ") or "20")
-    except ValueError:
-        primer_len = 20
+# --------------------------
+# --- CLI
+# --------------------------
+def _read_sequence(parser, args):
+    if args.sequence is not None:
+        text = args.sequence
+    elif args.input == "-":
+        text = sys.stdin.read()
+    else:
+        with open(args.input) as f:
+            text = f.read()
+    # FASTA header lines would otherwise add their letters to the sequence.
+    text = "\n".join(line for line in text.splitlines() if not line.startswith(">"))
+    cleaned = clean_sequence(text)
+    if not cleaned:
+        parser.error("no valid DNA sequence found")
+    return cleaned
 
-    # --------------------------
-    # --- Ask for DNA Input
-    # --------------------------
-    dna_input = input("Enter your DNA sequence: ")
 
-    sequence = clean_sequence(dna_input)
-    print("\nCleaned DNA sequence:", sequence)
-    print("Length:", len(sequence))
+def _primer_stats_dict(primer):
+    gc, tm, quality = primer_stats(primer)
+    return {"gc_content": gc, "tm": tm, "quality": quality}
 
-    print("GC Content:", gc_content(sequence), "%")
 
-    print("Reverse Complement:", reverse_complement(sequence))
+def _cmd_clean(seq, args):
+    return {"length": len(seq), "sequence": seq}
 
-    print("Transcribed mRNA:", transcribe(sequence))
 
-    print("Translated Protein Sequence:", translate_dna(sequence))
+def _cmd_gc(seq, args):
+    return {"length": len(seq), "gc_content": gc_content(seq)}
 
-    # --------------------------
-    # --- Print Primers & Stats
-    # --------------------------
-    f_primer, r_primer = get_primers(sequence, primer_len)
 
-    f_gc, f_tm, f_quality = primer_stats(f_primer)
-    r_gc, r_tm, r_quality = primer_stats(r_primer)
+def _cmd_revcomp(seq, args):
+    return {"reverse_complement": reverse_complement(seq)}
 
-    print("\nForward Primer:", f_primer)
-    print("  GC%:", f_gc, "| Tm:", f_tm, "C |", f_quality)
 
-    print("Reverse Primer:", r_primer)
-    print("  GC%:", r_gc, "| Tm:", r_tm, "C |", r_quality)
+def _cmd_transcribe(seq, args):
+    return {"mrna": transcribe(seq)}
 
-    # --------------------------
-    # --- BLAST Output
-    # --------------------------
-    f_blast = blast_primer(f_primer)
-    r_blast = blast_primer(r_primer)
-    
-    print(f"\nBLASTing forward primer: {f_primer}")
-    if f_blast["status"] == "success":
-        print(" Submitting BLAST request...")
-        print(f"  Request submitted. Your RID is: {f_blast['rid']}")
-        print(f"➡️  Open this link in your browser to see results:\n{f_blast['result_url']}")
-    else:
-        print("  BLAST request failed. Try again later.")
 
-    print(f"\nBLASTing reverse primer: {r_primer}")
-    if r_blast["status"] == "success":
-        print(" Submitting BLAST request...")
-        print(f"  Request submitted. Your RID is: {r_blast['rid']}")
-        print(f"➡️  Open this link in your browser to see results:\n{r_blast['result_url']}")
-    else:
-        print("  BLAST request failed. Try again later.")
-
-    # --------------------------
-    # --- Display sequence with positions
-    # --------------------------
-    sequence_display = display_sequence_with_positions(sequence)
-    print("\nDNA Sequence with Positions:")
-    for chunk, positions in sequence_display:
-        print(chunk)
-        print(positions)
-
-    # --------------------------
-    # --- Mutation Scanner
-    # --------------------------
-    print("\nMutation Marker Scanner")
-    print("Example format: A>G at position 45")
-
-    user_input = input("Enter your mutation (or press Enter to skip): ").strip()
-    mutation_result = scan_for_mutation(sequence, f_primer, r_primer, user_input)
-    
-    if mutation_result:
-        if mutation_result["status"] == "success":
-            print("\nMutation recognized.")
-            print(f"Position: {mutation_result['position']} | Original: {mutation_result['original_base']} | Mutated: {mutation_result['new_base']}")
-            print("\nOriginal Sequence:")
-            print(mutation_result["original_sequence"])
-            print("\nMutated Sequence:")
-            print(mutation_result["mutated_sequence"])
-            print(f"Mutation is {mutation_result['location']}.")
-        else:
-            print(mutation_result["message"])
-
-    # --------------------------
-    # --- Literature Search
-    # --------------------------
-    literature_results = search_literature_by_sequence(sequence)
-    print(f"\n Searching PubMed for sequence:\n {sequence}")
-    
-    if literature_results["status"] == "success":
-        if literature_results["count"] > 0:
-            print(" PubMed Hits Found:", literature_results["count"])
-            for result in literature_results["results"]:
-                print(f"- {result['title']}")
-                print(f"  {result['url']}")
-        else:
-            print(" No matches found in PubMed.")
-    else:
-        print("PubMed search failed:", literature_results["message"])
+def _cmd_translate(seq, args):
+    if args.six_frames:
+        frames = translate_six_frames(seq, args.genetic_code, args.read_through)
+        return {"frames": {str(frame): protein for frame, protein in frames.items()}}
+    return {"frame": args.frame,
+            "protein": translation.translate(seq, args.genetic_code, args.frame, args.read_through)}
 
-    # --------------------------
-    # --- Display ORFs
-    # --------------------------
-    print("\nDetected Open Reading Frames (ORFs):")
-    orfs = find_orfs_with_translation(sequence)
 
-    if not orfs:
-        print("No valid ORFs found.")
-    else:
-        for idx, orf in enumerate(orfs, 1):
-            print(f"\nORF {idx}: Start at {orf['start']}, End at {orf['end']}, Length: {orf['length']} bp")
-            print("DNA Sequence:", orf['sequence'])
-            print("Protein Sequence:", orf['protein'])
\ No newline at end of file
+def _cmd_primers(seq, args):
+    forward, reverse = get_primers(seq, args.primer_length)
+    if len(seq) < args.primer_length:
+        return {"status": "error", "message": "Sequence too short"}
+    return {
+        "forward_primer": forward,
+        "reverse_primer": reverse,
+        "forward_primer_stats": _primer_stats_dict(forward),
+        "reverse_primer_stats": _primer_stats_dict(reverse),
+    }
+
+
+def _cmd_orfs(seq, args):
+    orfs = find_orfs_with_translation(seq, args.min_length, args.mode, args.both_strands,
+                                      not args.no_sequence)
+    return {"orfs_found": len(orfs), "orfs": orfs}
+
+
+def _cmd_profile(seq, args):
+    return sequence_profile(seq, args.window, args.step, args.points, k=args.k)
+
+
+def _cmd_mutation(seq, args):
+    forward, reverse = get_primers(seq, args.primer_length)
+    return scan_for_mutation(seq, forward, reverse, args.mutation)
+
+
+def _cmd_analyze(seq, args):
+    import tasks
+    fields = tuple(args.fields.split(",")) if args.fields else None
+    return tasks.analyze_sequence(seq, args.primer_length, args.genetic_code, False, fields)
+
+
+def _cmd_blast(seq, args):
+    # Both primers are submitted concurrently; results are fetched by RID.
+    import asyncio
+    from blast_jobs import submit_primers
+    forward, reverse = get_primers(seq, args.primer_length)
+    f_blast, r_blast = asyncio.run(submit_primers([forward, reverse]))
+    return {"forward": {"primer": forward, **f_blast}, "reverse": {"primer": reverse, **r_blast}}
+
+
+def _cmd_literature(seq, args):
+    return search_literature_by_sequence(seq, args.max_results)
+
+
+def main(argv=None):
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("input", nargs="?", default="-",
+                        help="sequence or FASTA file, or '-' for stdin (default)")
+    common.add_argument("-s", "--sequence", help="sequence given inline instead of a file")
+    common.add_argument("--indent", type=int, default=None, help="pretty-print the JSON output")
+
+    parser = argparse.ArgumentParser(description="DNA sequence analysis; prints one JSON object.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def command(name, func, help):
+        sub = commands.add_parser(name, parents=[common], help=help, description=help)
+        sub.set_defaults(func=func)
+        return sub
+
+    command("clean", _cmd_clean, "Cleaned sequence (ACGT only, upper case)")
+    command("gc", _cmd_gc, "GC content")
+    command("revcomp", _cmd_revcomp, "Reverse complement")
+    command("transcribe", _cmd_transcribe, "Transcribed mRNA")
+    sub = command("translate", _cmd_translate, "Protein translation")
+    sub.add_argument("--frame", type=int, default=1, choices=translation.FRAMES)
+    sub.add_argument("--six-frames", action="store_true", help="translate all six frames")
+    sub.add_argument("--genetic-code", type=int, default=1, choices=sorted(translation.GENETIC_CODES))
+    sub.add_argument("--read-through", action="store_true", help="translate past stop codons")
+    sub = command("primers", _cmd_primers, "Forward and reverse primers with GC%%, Tm and quality")
+    sub.add_argument("--primer-length", type=int, default=20)
+    sub = command("orfs", _cmd_orfs, "Open reading frames")
+    sub.add_argument("--min-length", type=int, default=0, help="minimum ORF length in bp")
+    sub.add_argument("--mode", choices=["nested", "longest"], default="nested")
+    sub.add_argument("--both-strands", action="store_true")
+    sub.add_argument("--no-sequence", action="store_true", help="coordinates only")
+    sub = command("profile", _cmd_profile, "Sliding-window GC%%, GC skew and CpG o/e")
+    sub.add_argument("--window", type=int, default=None)
+    sub.add_argument("--step", type=int, default=None)
+    sub.add_argument("--points", type=int, default=1000)
+    sub.add_argument("--k", type=int, default=None, choices=[1, 2, 3, 4])
+    sub = command("mutation", _cmd_mutation, "Check a point mutation against the sequence and primers")
+    sub.add_argument("--mutation", required=True, help="e.g. 'A>G at position 45'")
+    sub.add_argument("--primer-length", type=int, default=20)
+    sub = command("analyze", _cmd_analyze, "Everything /analyze returns")
+    sub.add_argument("--primer-length", type=int, default=20)
+    sub.add_argument("--genetic-code", type=int, default=1, choices=sorted(translation.GENETIC_CODES))
+    sub.add_argument("--fields", default=None, help="comma-separated fields (default: all)")
+    sub = command("blast", _cmd_blast, "Submit both primers to NCBI BLAST (network)")
+    sub.add_argument("--primer-length", type=int, default=20)
+    sub = command("literature", _cmd_literature, "Search PubMed for the sequence (network)")
+    sub.add_argument("--max-results", type=int, default=5)
+
+    args = parser.parse_args(argv)
+    sequence = _read_sequence(parser, args)
+    json.dump(args.func(sequence, args), sys.stdout, indent=args.indent, default=str)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,112 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, File, HTTPException, Query, Request, UploadFile
+from fastapi.responses import Response, StreamingResponse
+import asyncio
 from fastapi.middleware.cors import CORSMiddleware
-import uvicorn
 import os
+import re
+import shutil
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from datetime import datetime
 from pathlib import Path
 from pydantic import BaseModel, Field, validator
-from typing import Optional
-from analyzer import (clean_sequence, gc_content, reverse_complement, transcribe, 
-                      translate_dna, get_primers, primer_stats, blast_primer, 
-                      search_literature_by_sequence, find_orfs_with_translation, 
-                      display_sequence_with_positions,
-                      scan_for_mutation)
+from typing import Any, Optional
+from urllib.parse import quote
+from translation import GENETIC_CODES
+from seqio import READ_ERRORS, read_records
+import tasks
+from executor import AnalysisExecutor, ExecutorBusy, ExecutorCrashed, ExecutorTimeout
+from cache import ResultCache, cache_key
+from datadir import data_path
+from jobs import JobManager, JobQueueFull
+from metrics import CONTENT_TYPE, SIZE_BUCKETS, Registry, server_timing
+from sessions import SequenceSessionStore, sequence_id as content_id
+import hashlib
+import json
+from streaming import decode_cursor, ndjson, parse_fields, sse
+from analyzer import clean_sequence, get_primers, iter_display_chunks
+
+# Process pool for the CPU-bound endpoints; see executor.py for settings.
+executor = AnalysisExecutor.from_env()
+# Pooled, rate-limited NCBI client for /blast and /literature; see ncbi.py.
+ncbi_client = None
+# Background RID polling and cached BLAST results; see blast_jobs.py.
+blast_jobs = None
+# Content-addressed cache for /analyze, /orfs and /literature; see cache.py.
+result_cache = ResultCache.from_env()
+# Uploaded sequences referenced by sequence_id; see sessions.py.
+sequence_sessions = SequenceSessionStore.from_env()
+# Prometheus metrics served at /metrics; see metrics.py.
+metrics_registry = Registry()
+request_latency = metrics_registry.histogram(
+    "dna_request_duration_seconds", "Time until the response starts.", ("method", "route", "status"))
+request_input = metrics_registry.histogram(
+    "dna_request_input_bytes", "Length of the 'sequence' parameter, or of the request body.",
+    ("route",), SIZE_BUCKETS)
+stage_latency = metrics_registry.histogram(
+    "dna_stage_duration_seconds", "Analyzer stage time per executor task.", ("stage",))
+cache_lookups = metrics_registry.counter(
+    "dna_cache_lookups_total", "Result cache lookups by namespace and outcome.", ("namespace", "outcome"))
+cache_evictions = metrics_registry.counter("dna_cache_evictions_total", "Result cache entries evicted.")
+cache_bytes = metrics_registry.gauge("dna_cache_bytes", "Bytes held by the in-memory result cache.")
+ncbi_calls = metrics_registry.counter("dna_ncbi_calls_total", "HTTP requests sent to NCBI, retries included.")
+executor_in_flight = metrics_registry.gauge("dna_executor_in_flight", "Analysis tasks running or queued.")
+executor_workers = metrics_registry.gauge("dna_executor_workers", "Analysis worker processes.")
+jobs_active = metrics_registry.gauge("dna_jobs", "Background jobs queued or running.", ("status",))
+session_sequences = metrics_registry.gauge("dna_sequence_sessions", "Sequences held in memory by the session store.")
+session_bytes = metrics_registry.gauge("dna_sequence_session_bytes", "Bytes held in memory by the session store.")
+session_lookups = metrics_registry.counter(
+    "dna_sequence_session_lookups_total", "sequence_id lookups by outcome.", ("outcome",))
+# Stage timings of the current request when it asked for them with X-Profile.
+request_profile = ContextVar("request_profile", default=None)
+# Executor timeout for the current request; background jobs raise it.
+task_timeout = ContextVar("task_timeout", default=None)
+started_at = time.time()
+
+
+@asynccontextmanager
+async def lifespan(app):
+    from blast_jobs import BlastJobManager
+    from ncbi import NCBIClient
+    from twobit import SequenceStore
+    global ncbi_client, blast_jobs, store
+    STORE_DIR.mkdir(parents=True, exist_ok=True)
+    OFFTARGET_DIR.mkdir(parents=True, exist_ok=True)
+    store = SequenceStore(STORE_DIR)
+    result_cache.start()
+    executor.start()
+    ncbi_client = NCBIClient.from_env()
+    blast_jobs = BlastJobManager.from_env(ncbi_client)
+    await analysis_jobs.start()
+    yield
+    await analysis_jobs.aclose()
+    await blast_jobs.aclose()
+    await ncbi_client.aclose()
+    executor.shutdown()
+    await result_cache.aclose()
+
 
 app = FastAPI(
     title="DNA Sequence Analysis API",
     description="API for analyzing DNA sequences with various functionalities such as cleaning, " \
         "GC content calculation, reverse complement, and more.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 
+# Directory of .2bit files served by the /store endpoints; opened in the lifespan.
+STORE_DIR = Path(os.environ.get("DNA_STORE_DIR") or data_path("store"))
+store = None
+# Longest region /store/{seq_id}/sequence returns in one response.
+STORE_SEQUENCE_MAX = int(os.environ.get("DNA_STORE_SEQUENCE_MAX", 10_000_000))
+
+# Directory of off-target indexes (one subdirectory each) for /offtarget.
+OFFTARGET_DIR = Path(os.environ.get("DNA_OFFTARGET_DIR") or data_path("offtarget"))
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -31,6 +118,31 @@ app.add_middleware(
     allow_headers=["*"],  
 )
 
+@app.middleware("http")
+async def observe_request(request: Request, call_next):
+    """Record latency and input size; add a Server-Timing breakdown when X-Profile is set."""
+    profile = {} if request.headers.get("x-profile", "").lower() in ("1", "true", "yes") else None
+    token = request_profile.set(profile)
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        elapsed = time.perf_counter() - start
+        request_profile.reset(token)
+        route = request.scope.get("route")
+        route = route.path if route is not None else "unmatched"
+        request_latency.observe(elapsed, method=request.method, route=route, status=status)
+        size = len(request.query_params.get("sequence", "")) or int(request.headers.get("content-length") or 0)
+        if size:
+            request_input.observe(size, route=route)
+    if profile is not None:
+        profile["total"] = elapsed
+        response.headers["Server-Timing"] = server_timing(profile)
+    return response
+
+
 class SequenceRequest(BaseModel):
     sequence: str = Field(..., 
                           description="The DNA sequence to analyze.", 
@@ -44,9 +156,16 @@ class SequenceRequest(BaseModel):
             raise ValueError("Sequence must contain valid DNA bases (A, C, G, T).")
         return v
     
-class MutationRequest(BaseModel):
+class SequenceUploadRequest(BaseModel):
     sequence: str = Field(..., 
-                          description="Original DNA sequence.")
+                          description="DNA sequence to store; it is cleaned first.", 
+                          min_length=1)
+
+class MutationRequest(BaseModel):
+    sequence: Optional[str] = Field(None, 
+                                    description="Original DNA sequence.")
+    sequence_id: Optional[str] = Field(None, 
+                                       description="ID from POST /sequences, sent instead of 'sequence'.")
     forward_primer: str = Field(..., 
                                 description="Forward primer sequence.")
     reverse_primer: str = Field(..., 
@@ -54,12 +173,172 @@ class MutationRequest(BaseModel):
     mutation: str = Field(..., 
                           description="Mutation in format 'A>G at position 45'")
     
+class MutationBatchRequest(BaseModel):
+    sequence: Optional[str] = Field(None, 
+                                    description="Reference DNA sequence.", 
+                                    min_length=1)
+    sequence_id: Optional[str] = Field(None, 
+                                       description="ID from POST /sequences, sent instead of 'sequence'.")
+    variants: Optional[list[str]] = Field(None, 
+                                          description="Variants like '45:A>G', '45 AT>A' or 'A>G at position 45'.", 
+                                          max_length=100000)
+    vcf: Optional[str] = Field(None, 
+                               description="VCF text (CHROM POS ID REF ALT ...); CHROM is ignored.")
+    forward_primer: Optional[str] = Field(None, 
+                                          description="Forward primer; defaults to the first primer_length bases.")
+    reverse_primer: Optional[str] = Field(None, 
+                                          description="Reverse primer; defaults to the last primer_length bases.")
+    primer_length: int = Field(20, 
+                               description="Primer length used when no primers are given.")
+    genetic_code: int = Field(1, 
+                              description="NCBI genetic code table id.")
+    min_orf_length: int = Field(0, 
+                                description="Ignore ORFs shorter than this (bp).", 
+                                ge=0)
+    both_strands: bool = Field(True, 
+                               description="Also index reverse-strand ORFs.")
+    context: int = Field(10, 
+                         description="Bases of context shown on each side of a variant.", 
+                         ge=0, le=100)
+
+class EditRequest(BaseModel):
+    edits: Optional[list[str]] = Field(None, 
+                                       description="Edits like '45:A>G', '45 AT>A', '45:->GC' or 'A>G at position 45'.", 
+                                       max_length=100000)
+    vcf: Optional[str] = Field(None, 
+                               description="VCF text (CHROM POS ID REF ALT ...); CHROM is ignored.")
+    primer_length: int = Field(20, 
+                               description="Primer length, as for /analyze.")
+    genetic_code: int = Field(1, 
+                              description="NCBI genetic code table id used for translation.")
+    min_orf_length: int = Field(0, 
+                                description="Ignore ORFs shorter than this (bp).", 
+                                ge=0)
+    orf_mode: str = Field("nested", 
+                          description="'nested' or 'longest', as for /orfs.", 
+                          pattern="^(nested|longest)$")
+    both_strands: bool = Field(True, 
+                               description="Also compare reverse-strand ORFs.")
+    include_sequence: bool = Field(True, 
+                                   description="Include sequence and protein of added and modified ORFs.")
+    window: Optional[int] = Field(None, 
+                                  description="Profile window (bp); defaults to the one /profile picks for the stored sequence.", 
+                                  ge=1)
+
+class BlastJobsRequest(BaseModel):
+    sequences: list[str] = Field(..., 
+                                 description="Primer sequences to BLAST.", 
+                                 min_length=1, max_length=20)
+    program: str = Field("blastn", 
+                         description="BLAST program.")
+    database: str = Field("nt", 
+                          description="BLAST database.")
+
+class JobRequest(BaseModel):
+    type: str = Field(..., 
+                      description="Analysis to run, e.g. 'orfs', 'literature' or 'blast' (see GET /jobs/types).")
+    params: dict[str, Any] = Field({}, 
+                                   description="The analysis endpoint's query parameters (or body for POST ones).")
+
 class PrimerStatsResponse(BaseModel):
     gc_content: float
     tm: float
     quality: str
 
 
+async def run_analysis(func, *args):
+    """Run an analysis task in the executor and map its failures to HTTP errors."""
+    start = time.perf_counter()
+    try:
+        results, stages = await executor.run(tasks.profiled, func, *args, timeout=task_timeout.get())
+    except ExecutorBusy as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+    except ExecutorTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ExecutorCrashed as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    for name, (seconds, _) in stages.items():
+        stage_latency.observe(seconds, stage=name)
+    profile = request_profile.get()
+    if profile is not None:
+        profile.update((name, seconds) for name, (seconds, _) in stages.items())
+        profile["executor"] = time.perf_counter() - start
+    return results
+
+
+def _clean_or_400(sequence):
+    cleaned_sequence = clean_sequence(sequence)
+    if not cleaned_sequence:
+        raise HTTPException(status_code=400, detail="No valid DNA sequence found.")
+    return cleaned_sequence
+
+
+async def _sequence_or_400(sequence, sequence_id):
+    """Cleaned sequence and its content ID, from a raw ``sequence`` or a stored ``sequence_id``.
+
+    The ID doubles as the sequence part of result cache keys, so requests by
+    ID skip both cleaning and rehashing.
+    """
+    if sequence and sequence_id:
+        raise HTTPException(status_code=400, detail="Send either 'sequence' or 'sequence_id', not both.")
+    if sequence_id:
+        data = await sequence_sessions.get(sequence_id)
+        if data is None:
+            raise HTTPException(status_code=404, 
+                                detail=f"Unknown sequence_id '{sequence_id}'; upload it with POST /sequences.")
+        return data.decode("ascii"), sequence_id
+    if not sequence:
+        raise HTTPException(status_code=400, detail="Provide 'sequence' or 'sequence_id'.")
+    cleaned_sequence = _clean_or_400(sequence)
+    return cleaned_sequence, content_id(cleaned_sequence)
+
+
+def _fields_or_400(fields, allowed):
+    try:
+        return parse_fields(fields, allowed)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _cursor_or_400(cursor):
+    try:
+        return decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def cached_json_response(request, entry, cache_status, prefix=None):
+    """JSON response for a cache entry with ETag / If-None-Match handling.
+
+    ``prefix`` holds request-specific fields (e.g. the raw input) that are
+    spliced in front of the cached body rather than stored with it.
+    """
+    body, etag = entry.body, entry.etag
+    if prefix:
+        extra = json.dumps(prefix)[1:-1].encode("utf-8")
+        body = b"{" + extra + (b", " + body[1:] if body != b"{}" else b"}")
+        etag = hashlib.sha256(etag.encode("ascii") + extra).hexdigest()[:32]
+    headers = {"ETag": f'"{etag}"', "X-Cache": cache_status}
+    if_none_match = request.headers.get("if-none-match", "")
+    if f'"{etag}"' in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def cached_analysis(request, namespace, key, func, *args, prefix=None):
+    """Serve ``func(*args)`` from the result cache, computing it in the executor on a miss."""
+    entry = await result_cache.get(namespace, key)
+    if entry is not None:
+        return cached_json_response(request, entry, "hit", prefix)
+    results = await run_analysis(func, *args)
+    entry = result_cache.put(namespace, key, results)
+    return cached_json_response(request, entry, "miss", prefix)
+
+
 @app.get("/")
 async def root():
     """Welcome message and API info."""
@@ -68,10 +347,28 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "analyze": "/analyze - Complete sequence analysis",
+            "analyze_display": "/analyze/display - Paginated sequence display rows",
+            "analyze_batch": "/analyze/batch - Upload FASTA/FASTQ (gzip ok), NDJSON per record",
+            "sequences": "/sequences - Upload a sequence once, then pass its sequence_id to the analysis endpoints",
+            "sequence_edits": "/sequences/{id}/edits - Apply edits to a stored sequence and get only what changed",
             "mutation": "/mutation - Mutation analysis", 
+            "mutations_batch": "/mutations/batch - Classify many variants (list or VCF)",
             "blast": "/blast - BLAST primer sequences",
+            "blast_jobs": "/blast/jobs, /blast/{id} - Concurrent BLAST jobs and results",
             "literature": "/literature - Search literature",
             "orfs": "/orfs - Find Open Reading Frames",
+            "translate": "/translate - Six-frame translation",
+            "kmers": "/kmers - k-mer counts (k <= 31)",
+            "motifs": "/motifs - IUPAC multi-motif search on both strands",
+            "repeats": "/repeats - Tandem repeats",
+            "restriction": "/restriction - Restriction enzyme site map",
+            "profile": "/profile - Sliding-window GC, skew, CpG o/e and k-mer tracks",
+            "primers": "/primers - Design primer pairs (nearest-neighbour Tm)",
+            "store": "/store - Stored 2-bit reference sequences",
+            "offtarget": "/offtarget - Local primer off-target search against indexed references",
+            "jobs": "/jobs - Run any analysis in the background; poll /jobs/{id} or stream /jobs/{id}/events",
+            "cache": "/cache/stats - Result cache counters",
+            "metrics": "/metrics - Prometheus metrics (send X-Profile: 1 for a Server-Timing breakdown)",
             "health": "/health - Ping server for health check"
         },
         "docs": "/docs"
@@ -80,105 +377,305 @@ async def root():
 
 @app.get("/analyze")
 async def analysis(
-    sequence: str = Query(..., 
-                          description="The DNA sequence to analyze.", 
-                          min_length=1),
+    request: Request,
+    sequence: Optional[str] = Query(None, 
+                                    description="The DNA sequence to analyze.", 
+                                    min_length=1),
+    sequence_id: Optional[str] = Query(None, 
+                                       description="ID from POST /sequences, sent instead of 'sequence'."),
     primer_length: int = Query(20, 
                                description="Primer length"),  
+    genetic_code: int = Query(1, 
+                              description="NCBI genetic code table id used for translation."),
+    fields: Optional[str] = Query(None, 
+                                  description="Comma-separated fields to return, e.g. 'length,gc_content' (default: all)."),
 ):
-    """Analyze DNA sequence with desired functionalities."""
+    """Analyze DNA sequence with desired functionalities.
+
+    Only the requested ``fields`` are computed; page through
+    display_sequence with /analyze/display instead of requesting it here
+    for large inputs.
+    """
+    if genetic_code not in GENETIC_CODES:
+        raise HTTPException(status_code=400, detail=f"Unknown genetic code {genetic_code}.")
+    names = _fields_or_400(fields, ("original_input",) + tasks.ANALYZE_FIELDS)
+    cleaned_sequence, digest = await _sequence_or_400(sequence, sequence_id)
+    prefix = None
+    if names is None or "original_input" in names:
+        prefix = {"original_input": sequence} if sequence else {"sequence_id": sequence_id}
+    if names is not None:
+        names = tuple(name for name in names if name != "original_input")
+    key = cache_key("analyze", digest, primer_length=primer_length, genetic_code=genetic_code,
+                    fields=names)
+    return await cached_analysis(request, "analyze", key, tasks.analyze_sequence, cleaned_sequence,
+                                 primer_length, genetic_code, False, names,
+                                 prefix=prefix)
+
+
+@app.get("/analyze/display")
+async def display_chunks(
+    sequence: Optional[str] = Query(None, 
+                                    description="The DNA sequence to display.", 
+                                    min_length=1),
+    sequence_id: Optional[str] = Query(None, 
+                                       description="ID from POST /sequences, sent instead of 'sequence'."),
+    cursor: Optional[str] = Query(None, 
+                                  description="next_cursor from the previous page."),
+    limit: int = Query(100, 
+                       description="Rows per page.", 
+                       ge=1, le=10000),
+    chunk_size: int = Query(10, 
+                            description="Bases per row.", 
+                            ge=1, le=1000),
+    format: str = Query("json", 
+                        description="'json' for a page object, 'ndjson' to stream one row per line.", 
+                        pattern="^(json|ndjson)$"),
+):
+    """Page through the sequence display rows (chunk, position digits)."""
+    cleaned_sequence, _ = await _sequence_or_400(sequence, sequence_id)
+    if format == "ndjson":
+        offset = _cursor_or_400(cursor)
+        rows = iter_display_chunks(cleaned_sequence, chunk_size, offset, offset + limit)
+        return StreamingResponse(ndjson(rows), media_type="application/x-ndjson")
+    return await run_analysis(tasks.display_page, cleaned_sequence, cursor, limit, chunk_size)
+
+
+# Sequence bytes handed to a worker per batch task.
+BATCH_CHUNK_BYTES = 1 << 20
+
+
+def _read_chunk(records, limit):
+    """(records, error): the next ~``limit`` sequence bytes of records ([] at the end).
+
+    A read error is returned along with the records parsed before it.
+    """
+    chunk, size = [], 0
     try:
-        cleaned_sequence = clean_sequence(sequence)
-        if not cleaned_sequence:
-            raise HTTPException(status_code=400, detail="No valid DNA sequence found.")
-        
-        gc = gc_content(cleaned_sequence)
-        rev_comp = reverse_complement(cleaned_sequence)
-        transcribed_mrna = transcribe(cleaned_sequence)
-        translated_protein = translate_dna(cleaned_sequence)
-        forward_primer, reverse_primer = get_primers(cleaned_sequence, primer_length)
-        display_sequence = display_sequence_with_positions(cleaned_sequence)
-        f_gc, f_tm, f_quality = primer_stats(forward_primer)
-        r_gc, r_tm, r_quality = primer_stats(reverse_primer)
-
-        results = {
-            "original_input": sequence,
-            "cleaned_sequence": cleaned_sequence,
-            "length": len(cleaned_sequence),
-            "gc_content": gc,
-            "reverse_complement": rev_comp,
-            "transcribed_mrna": transcribed_mrna,
-            "translated_protein": translated_protein,
-            "forward_primer": forward_primer,
-            "reverse_primer": reverse_primer,
-            "display_sequence": display_sequence,
-            "forward_primer_stats": {
-                "gc_content": f_gc,
-                "tm": f_tm, 
-                "quality": f_quality
-            },
-            "reverse_primer_stats": {
-                "gc_content": r_gc,
-                "tm": r_tm,
-                "quality": r_quality
-            }
-        }
+        for record in records:
+            chunk.append(record)
+            size += len(record.sequence)
+            if size >= limit:
+                break
+    except (ValueError, *READ_ERRORS) as e:
+        return chunk, e
+    return chunk, None
+
+
+async def _analyze_chunk(chunk, primer_length, include_sequences):
+    # The response has started, so a busy executor is waited for, not a 429.
+    while True:
+        try:
+            return await executor.run(tasks.analyze_batch, chunk, primer_length, include_sequences)
+        except ExecutorBusy:
+            await asyncio.sleep(1)
+
+
+async def _batch_lines(records, primer_length, include_sequences):
+    """NDJSON lines for /analyze/batch; errors end the stream with an error record."""
+    try:
+        while True:
+            # Parsing (and un-gzipping) the upload blocks, so it runs in a thread.
+            chunk, error = await asyncio.to_thread(_read_chunk, records, BATCH_CHUNK_BYTES)
+            if chunk:
+                for result in await _analyze_chunk(chunk, primer_length, include_sequences):
+                    yield json.dumps(result) + "\n"
+            if error is not None:
+                raise error
+            if not chunk:
+                return
+    except (ValueError, ExecutorTimeout, ExecutorCrashed, *READ_ERRORS) as e:
+        yield json.dumps({"id": None, "status": "error", "message": str(e)}) + "\n"
+    finally:
+        records.close()
+
+
+@app.post("/analyze/batch")
+async def batch_analysis(
+    file: UploadFile = File(..., 
+                            description="FASTA or FASTQ file, optionally gzip-compressed."),
+    primer_length: int = Query(20, 
+                               description="Primer length"),
+    format: Optional[str] = Query(None, 
+                                  description="'fasta' or 'fastq'; detected from content when omitted.", 
+                                  pattern="^(fasta|fastq)$"),
+    include_sequences: bool = Query(False, 
+                                    description="Include cleaned sequence, reverse complement, mRNA and protein."),
+):
+    """Analyze every record of an uploaded file, streaming one JSON line per record.
+
+    Records are analyzed in the executor about BATCH_CHUNK_BYTES at a time.
+    A parse error or a corrupt gzip stream ends the output with an error
+    record whose id is null.
+    """
+    records = read_records(file.file, format)
+    return StreamingResponse(_batch_lines(records, primer_length, include_sequences),
+                             media_type="application/x-ndjson")
+
+
+@app.post("/sequences")
+async def sequence_upload(request: SequenceUploadRequest):
+    """Clean and store a sequence; pass the returned sequence_id instead of 'sequence' afterwards.
+
+    The ID is the SHA-256 of the cleaned sequence, so uploading the same
+    construct again returns the same ID.
+    """
+    cleaned_sequence = _clean_or_400(request.sequence)
+    seq_id = await sequence_sessions.add(cleaned_sequence.encode("ascii"))
+    return {"sequence_id": seq_id, "length": len(cleaned_sequence)}
+
+
+@app.get("/sequences")
+async def sequence_sessions_stats():
+    """Session store size and lookup counters."""
+    return sequence_sessions.summary()
+
+
+@app.get("/sequences/{sequence_id}")
+async def sequence_get(
+    sequence_id: str,
+    include_sequence: bool = Query(False, 
+                                   description="Include the cleaned sequence itself."),
+):
+    """Length of a stored sequence and, optionally, its bases."""
+    cleaned_sequence, _ = await _sequence_or_400(None, sequence_id)
+    results = {"sequence_id": sequence_id, "length": len(cleaned_sequence)}
+    if include_sequence:
+        results["sequence"] = cleaned_sequence
+    return results
+
+
+@app.delete("/sequences/{sequence_id}")
+async def sequence_delete(sequence_id: str):
+    """Forget a stored sequence."""
+    if not sequence_sessions.remove(sequence_id):
+        raise HTTPException(status_code=404, detail=f"Unknown sequence_id '{sequence_id}'.")
+    return {"sequence_id": sequence_id, "deleted": True}
+
+
+@app.post("/sequences/{sequence_id}/edits")
+async def sequence_edit(sequence_id: str, request: EditRequest):
+    """Apply edits to a stored sequence, store the result and return what changed.
+
+    Only the bases around each edit are analyzed again. The response lists
+    the differences from the stored sequence (GC, base counts, codons,
+    translation, ORFs, profile windows, primers) and the new sequence_id,
+    which can be edited in turn.
+    """
+    if not request.edits and not request.vcf:
+        raise HTTPException(status_code=400, detail="Provide 'edits' or 'vcf'.")
+    if request.genetic_code not in GENETIC_CODES:
+        raise HTTPException(status_code=400, detail=f"Unknown genetic code {request.genetic_code}.")
+    cleaned_sequence, _ = await _sequence_or_400(None, sequence_id)
+    # The edits are applied (and the result hashed) once, in the worker.
+    results, edited = await run_analysis(tasks.analyze_edits, cleaned_sequence, request.edits,
+                                         request.vcf, sequence_id, request.primer_length,
+                                         request.genetic_code, request.min_orf_length,
+                                         request.orf_mode, request.both_strands,
+                                         request.include_sequence, request.window)
+    await sequence_sessions.add(edited, results["sequence_id"])
+    return results
 
-        return results
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    
 
 @app.post("/mutation")
 async def mutation_analysis(request: MutationRequest):
     """Analyze mutation in a DNA sequence."""
-    try:
-        sequence = request.sequence
-        mutation = request.mutation
-        f_primer = request.forward_primer
-        r_primer = request.reverse_primer
-        
-        cleaned_sequence = clean_sequence(sequence)
-        if not cleaned_sequence:
-            raise HTTPException(status_code=400, detail="No valid DNA sequence found.")
-        
-        mutation_result = scan_for_mutation(cleaned_sequence, f_primer, r_primer, mutation)
-        
-        if not mutation_result:
-            return {"message": "No mutation analysis performed"}
-        
-        return mutation_result
-    
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    
+    cleaned_sequence, _ = await _sequence_or_400(request.sequence, request.sequence_id)
+    return await run_analysis(tasks.analyze_mutation, cleaned_sequence, request.forward_primer,
+                              request.reverse_primer, request.mutation)
+
+
+@app.post("/mutations/batch")
+async def mutation_batch_analysis(request: MutationBatchRequest):
+    """Check and classify many variants (list or VCF) against one sequence."""
+    if not request.variants and not request.vcf:
+        raise HTTPException(status_code=400, detail="Provide 'variants' or 'vcf'.")
+    cleaned_sequence, _ = await _sequence_or_400(request.sequence, request.sequence_id)
+    return await run_analysis(tasks.analyze_mutations, cleaned_sequence, request.variants,
+                              request.vcf, request.forward_primer, request.reverse_primer,
+                              request.primer_length, request.genetic_code,
+                              request.min_orf_length, request.both_strands, request.context)
+
 
 @app.get("/blast")
 async def blast_primer_endpoint(
-    sequence: str = Query(..., 
-                          description="The primer sequence to BLAST.", 
-                          min_length=1)
+    sequence: Optional[str] = Query(None, 
+                                    description="The primer sequence to BLAST.", 
+                                    min_length=1),
+    sequence_id: Optional[str] = Query(None, 
+                                       description="ID from POST /sequences, sent instead of 'sequence'."),
 ):
-    """BLAST a primer sequence against the NCBI database."""
+    """BLAST a primer sequence against the NCBI database.
+
+    The search is submitted and polled in the background; fetch it from
+    /blast/{id} (its RID works too once NCBI has accepted it). A primer
+    BLASTed before is answered from the cache without a new search.
+    """
+    if sequence_id:
+        sequence, _ = await _sequence_or_400(sequence, sequence_id)
+    elif not sequence:
+        raise HTTPException(status_code=400, detail="Provide 'sequence' or 'sequence_id'.")
     try:
-        results = blast_primer(sequence)
-        return results
+        job = await blast_jobs.submit(sequence)
+        return {
+            "status": "success",
+            "id": job["id"],
+            "rid": job["rid"],
+            "result_url": job["result_url"],
+            "search_status": job["status"],
+            "cached": job["cached"],
+        }
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/blast/jobs")
+async def blast_jobs_submit(request: BlastJobsRequest):
+    """Submit several primers to BLAST; the searches start in the background."""
+    try:
+        jobs = await blast_jobs.submit_many(request.sequences, request.program, request.database)
+        return {"jobs": jobs}
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/blast/{job_id}")
+async def blast_job_status(job_id: str):
+    """Status of a BLAST search (by job id or RID) and, once ready, its parsed hits."""
+    job = await blast_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown BLAST job or RID '{job_id}'.")
+    return job
     
 
 @app.get("/literature")
 async def literature_search(
-    sequence: str = Query(..., 
-                          description="The DNA sequence to search in literature.", 
-                          min_length=1)
+    request: Request,
+    sequence: Optional[str] = Query(None, 
+                                    description="The DNA sequence to search in literature.", 
+                                    min_length=1),
+    sequence_id: Optional[str] = Query(None, 
+                                       description="ID from POST /sequences, sent instead of 'sequence'."),
 ):
-    """Search literature for a given DNA sequence."""
+    """Search literature for a given DNA sequence.
+
+    Successful searches are cached for CACHE_TTL_LITERATURE seconds, keyed on
+    the exact search term sent to PubMed.
+    """
+    if sequence_id:
+        sequence, _ = await _sequence_or_400(sequence, sequence_id)
+    elif not sequence:
+        raise HTTPException(status_code=400, detail="Provide 'sequence' or 'sequence_id'.")
     try:
-        results = search_literature_by_sequence(sequence)
-        return results
+        key = cache_key("literature", sequence.strip())
+        entry = await result_cache.get("literature", key)
+        if entry is not None:
+            return cached_json_response(request, entry, "hit")
+        results = await ncbi_client.search_literature(sequence)
+        if results["status"] != "success":
+            return results
+        return cached_json_response(request, result_cache.put("literature", key, results), "miss")
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -186,30 +683,709 @@ async def literature_search(
 
 @app.get("/orfs")
 async def orf_search(
-    sequence: str = Query(..., 
-                          description="The DNA sequence to find ORFs.", 
-                          min_length=1)
+    request: Request,
+    sequence: Optional[str] = Query(None, 
+                                    description="The DNA sequence to find ORFs.", 
+                                    min_length=1),
+    sequence_id: Optional[str] = Query(None, 
+                                       description="ID from POST /sequences, sent instead of 'sequence'."),
+    min_length: int = Query(0, 
+                            description="Minimum ORF length in bp, stop codon included.", 
+                            ge=0),
+    mode: str = Query("nested", 
+                      description="'nested' reports every ATG, 'longest' only the outermost per stop.", 
+                      pattern="^(nested|longest)$"),
+    both_strands: bool = Query(False, 
+                               description="Also scan the three reverse-strand frames."),
+    include_sequence: bool = Query(True, 
+                                   description="Include DNA and protein sequences for each ORF."),
+    fields: Optional[str] = Query(None, 
+                                  description="Comma-separated ORF fields, e.g. 'start,end,protein' (default: all)."),
+    cursor: Optional[str] = Query(None, 
+                                  description="next_cursor from the previous page."),
+    limit: Optional[int] = Query(None, 
+                                 description="ORFs per page (default: all, unpaginated).", 
+                                 ge=1, le=100000),
+    format: str = Query("json", 
+                        description="'json' for one response, 'ndjson' to stream one ORF per line.", 
+                        pattern="^(json|ndjson)$"),
+):
+    """Find Open Reading Frames (ORFs) in a DNA sequence.
+
+    With ``limit`` the response is one page plus a ``next_cursor``; the
+    input sequence is not echoed back.
+    """
+    names = _fields_or_400(fields, tasks.ORF_FIELDS)
+    cleaned_sequence, digest = await _sequence_or_400(sequence, sequence_id)
+    _cursor_or_400(cursor)
+    if format == "ndjson":
+        orfs = tasks.stream_orfs(cleaned_sequence, min_length, mode, both_strands, include_sequence,
+                                 cursor, limit, names)
+        return StreamingResponse(ndjson(orfs), media_type="application/x-ndjson")
+    key = cache_key("orfs", digest, min_length=min_length, mode=mode,
+                    both_strands=both_strands, include_sequence=include_sequence,
+                    fields=names, cursor=cursor, limit=limit)
+    return await cached_analysis(request, "orfs", key, tasks.find_orfs, cleaned_sequence,
+                                 min_length, mode, both_strands, include_sequence,
+                                 cursor, limit, names)
+
+
+@app.get("/primers")
+async def primer_design(
+    request: Request,
+    sequence: Optional[str] = Query(None, 
+                                    description="The template DNA sequence.", 
+                                    min_length=1),
+    sequence_id: Optional[str] = Query(None, 
+                                       description="ID from POST /sequences, sent instead of 'sequence'."),
+    min_length: int = Query(18, description="Shortest primer length.", ge=8),
+    max_length: int = Query(25, description="Longest primer length.", le=40),
+    tm_min: float = Query(57.0, description="Lowest acceptable Tm (deg C)."),
+    tm_max: float = Query(63.0, description="Highest acceptable Tm (deg C)."),
+    tm_target: float = Query(60.0, description="Optimal Tm (deg C)."),
+    gc_min: float = Query(40.0, description="Lowest acceptable GC%."),
+    gc_max: float = Query(60.0, description="Highest acceptable GC%."),
+    flank: Optional[int] = Query(None, 
+                                 description="Search primers only within this many bases of each end.", 
+                                 ge=1),
+    product_min: Optional[int] = Query(None, description="Shortest amplicon in bp.", ge=1),
+    product_max: Optional[int] = Query(None, description="Longest amplicon in bp.", ge=1),
+    na: float = Query(50.0, description="Monovalent cation concentration (mM).", ge=0),
+    mg: float = Query(1.5, description="Mg2+ concentration (mM).", ge=0),
+    dntp: float = Query(0.6, description="dNTP concentration (mM).", ge=0),
+    oligo_nm: float = Query(50.0, description="Primer concentration (nM).", gt=0),
+    top_k: int = Query(5, description="Number of primer pairs to return.", ge=1, le=50),
+):
+    """Design the best forward/reverse primer pairs for a template."""
+    from primers import PrimerConditions
+    cleaned_sequence, digest = await _sequence_or_400(sequence, sequence_id)
+    product_range = None
+    if product_min is not None or product_max is not None:
+        product_range = (product_min or 1, product_max or len(cleaned_sequence))
+    options = {
+        "length_range": (min_length, max_length),
+        "tm_range": (tm_min, tm_max),
+        "tm_target": tm_target,
+        "gc_range": (gc_min, gc_max),
+        "flank": flank,
+        "product_range": product_range,
+        "top_k": top_k,
+        "conditions": PrimerConditions(na=na, mg=mg, dntp=dntp, oligo_nm=oligo_nm),
+    }
+    key = cache_key("primers", digest, **{k: v for k, v in options.items() if k != "conditions"},
+                    na=na, mg=mg, dntp=dntp, oligo_nm=oligo_nm)
+    return await cached_analysis(request, "primers", key, tasks.design_primers,
+                                 cleaned_sequence, options)
+
+
+def _profile_options(tracks):
+    from composition import TRACKS
+    names = tuple(name.strip() for name in tracks.split(",") if name.strip())
+    unknown = set(names) - set(TRACKS)
+    if unknown:
+        raise HTTPException(status_code=400, 
+                            detail=f"Unknown track(s) {sorted(unknown)}. Choose from {list(TRACKS)}.")
+    return names
+
+
+@app.get("/profile")
+async def composition_profile(
+    request: Request,
+    sequence: Optional[str] = Query(None, 
+                                    description="The DNA sequence to profile.", 
+                                    min_length=1),
+    sequence_id: Optional[str] = Query(None, 
+                                       description="ID from POST /sequences, sent instead of 'sequence'."),
+    window: Optional[int] = Query(None, 
+                                  description="Window size in bp (default: length / points).", 
+                                  ge=1),
+    step: Optional[int] = Query(None, 
+                                description="Step between windows in bp (default: window); raised if needed to fit points.", 
+                                ge=1),
+    points: int = Query(1000, 
+                        description="Maximum number of windows returned.", 
+                        ge=1, le=100000),
+    tracks: str = Query("gc,gc_skew,cpg_oe", 
+                        description="Comma-separated tracks: gc, gc_skew, cpg_oe."),
+    k: Optional[int] = Query(None, 
+                             description="Also return k-mer frequencies per window (1-4).", 
+                             ge=1, le=4),
+):
+    """Sliding-window GC%, GC skew, CpG o/e and k-mer composition."""
+    names = _profile_options(tracks)
+    cleaned_sequence, digest = await _sequence_or_400(sequence, sequence_id)
+    key = cache_key("profile", digest, window=window, step=step, points=points,
+                    tracks=names, k=k)
+    return await cached_analysis(request, "profile", key, tasks.profile_sequence, cleaned_sequence,
+                                 window, step, points, names, k)
+
+
+def _names(value):
+    return tuple(name.strip() for name in value.split(",") if name.strip()) if value else None
+
+
+@app.get("/kmers")
+async def kmer_counts(
+    request: Request,
+    sequence: Optional[str] = Query(None, 
+                                    description="The DNA sequence to count k-mers in.", 
+                                    min_length=1),
+    sequence_id: Optional[str] = Query(None, 
+                                       description="ID from POST /sequences, sent instead of 'sequence'."),
+    k: int = Query(..., 
+                   description="k-mer length (1-31).", 
+                   ge=1, le=31),
+    top: int = Query(20, 
+                     description="Number of most frequent k-mers returned.", 
+                     ge=1, le=10000),
+    canonical: bool = Query(False, 
+                            description="Count each k-mer together with its reverse complement."),
+):
+    """Most frequent k-mers of a sequence."""
+    cleaned_sequence, digest = await _sequence_or_400(sequence, sequence_id)
+    key = cache_key("kmers", digest, k=k, top=top, canonical=canonical)
+    return await cached_analysis(request, "kmers", key, tasks.count_kmers, cleaned_sequence,
+                                 k, top, canonical)
+
+
+@app.get("/motifs")
+async def motif_search(
+    request: Request,
+    sequence: Optional[str] = Query(None, 
+                                    description="The DNA sequence to search.", 
+                                    min_length=1),
+    sequence_id: Optional[str] = Query(None, 
+                                       description="ID from POST /sequences, sent instead of 'sequence'."),
+    motifs: str = Query(..., 
+                        description="Comma-separated IUPAC motifs, e.g. 'TATAAA,GGNCC'.", 
+                        min_length=1),
+    both_strands: bool = Query(True, 
+                               description="Also report matches on the reverse strand."),
+):
+    """Find every occurrence of several IUPAC motifs in one pass."""
+    cleaned_sequence, digest = await _sequence_or_400(sequence, sequence_id)
+    patterns = _names(motifs)
+    key = cache_key("motifs", digest, motifs=patterns, both_strands=both_strands)
+    return await cached_analysis(request, "motifs", key, tasks.search_motifs, cleaned_sequence,
+                                 list(patterns or ()), both_strands)
+
+
+@app.get("/repeats")
+async def repeat_search(
+    request: Request,
+    sequence: Optional[str] = Query(None, 
+                                    description="The DNA sequence to search.", 
+                                    min_length=1),
+    sequence_id: Optional[str] = Query(None, 
+                                       description="ID from POST /sequences, sent instead of 'sequence'."),
+    min_period: int = Query(1, description="Shortest repeat unit (bp).", ge=1, le=50),
+    max_period: int = Query(6, description="Longest repeat unit (bp).", ge=1, le=50),
+    min_copies: int = Query(3, description="Minimum number of copies of the unit.", ge=2),
+    min_length: int = Query(10, description="Minimum repeat length (bp).", ge=1),
+):
+    """Find perfect tandem repeats (microsatellites)."""
+    cleaned_sequence, digest = await _sequence_or_400(sequence, sequence_id)
+    key = cache_key("repeats", digest, min_period=min_period, max_period=max_period,
+                    min_copies=min_copies, min_length=min_length)
+    return await cached_analysis(request, "repeats", key, tasks.find_repeats, cleaned_sequence,
+                                 min_period, max_period, min_copies, min_length)
+
+
+@app.get("/restriction")
+async def restriction_sites(
+    request: Request,
+    sequence: Optional[str] = Query(None, 
+                                    description="The DNA sequence to map.", 
+                                    min_length=1),
+    sequence_id: Optional[str] = Query(None, 
+                                       description="ID from POST /sequences, sent instead of 'sequence'."),
+    enzymes: Optional[str] = Query(None, 
+                                   description="Comma-separated enzyme names (default: all bundled enzymes)."),
+    include_fragments: bool = Query(True, 
+                                    description="Include fragment lengths for each enzyme."),
+):
+    """Restriction site map with cut positions for the bundled enzymes."""
+    cleaned_sequence, digest = await _sequence_or_400(sequence, sequence_id)
+    names = _names(enzymes)
+    key = cache_key("restriction", digest, enzymes=names, include_fragments=include_fragments)
+    return await cached_analysis(request, "restriction", key, tasks.map_restriction_sites,
+                                 cleaned_sequence, names, include_fragments)
+
+
+@app.get("/restriction/enzymes")
+async def restriction_enzymes():
+    """The bundled restriction enzymes with their sites and cut offsets."""
+    from restriction import ENZYMES
+    return {name: {"site": site, "cut": cut} for name, (site, cut) in ENZYMES.items()}
+
+
+@app.get("/translate")
+async def translate_frames(
+    sequence: Optional[str] = Query(None, 
+                                    description="The DNA sequence to translate.", 
+                                    min_length=1),
+    sequence_id: Optional[str] = Query(None, 
+                                       description="ID from POST /sequences, sent instead of 'sequence'."),
+    genetic_code: int = Query(1, 
+                              description="NCBI genetic code table id."),
+    read_through: bool = Query(True, 
+                               description="Translate past stop codons, shown as '_'."),
+):
+    """Translate all six reading frames of a DNA sequence."""
+    if genetic_code not in GENETIC_CODES:
+        raise HTTPException(status_code=400, detail=f"Unknown genetic code {genetic_code}.")
+    cleaned_sequence, _ = await _sequence_or_400(sequence, sequence_id)
+    return await run_analysis(tasks.translate_frames, cleaned_sequence, genetic_code, read_through)
+
+
+def _store_region(seq_id, start, end):
+    """Resolve a stored sequence and convert a 1-based inclusive region to 0-based half-open."""
+    try:
+        twobit, name = store.resolve(seq_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    length = twobit.length(name)
+    end = length if end is None else end
+    if not 1 <= start <= end <= length:
+        raise HTTPException(status_code=400, 
+                            detail=f"Region {start}-{end} is outside {name} (length {length}).")
+    return twobit, name, start - 1, end
+
+
+@app.get("/store")
+async def store_list():
+    """List the sequences available in the 2-bit store."""
+    return {"sequences": store.sequences()}
+
+
+@app.post("/store/{file_id}")
+async def store_upload(
+    file_id: str,
+    file: UploadFile = File(..., 
+                            description="FASTA or FASTQ file, optionally gzip-compressed."),
 ):
-    """Find Open Reading Frames (ORFs) in a DNA sequence."""
+    """Pack an uploaded FASTA/FASTQ file into the 2-bit store as <file_id>.2bit.
+
+    The upload is copied to a temporary file and packed in the executor; the
+    packed file then replaces any earlier <file_id>.2bit.
+    """
+    if not file_id.replace("_", "").replace("-", "").replace(".", "").isalnum():
+        raise HTTPException(status_code=400, detail="file_id may only contain letters, digits, '.', '_' and '-'.")
+    fd, upload = tempfile.mkstemp(dir=STORE_DIR, suffix=".upload")
+    packed = f"{upload}.2bit.tmp"
     try:
-        cleaned_sequence = clean_sequence(sequence)
+        with os.fdopen(fd, "wb") as fh:
+            await asyncio.to_thread(shutil.copyfileobj, file.file, fh)
+        await run_analysis(tasks.pack_twobit, upload, packed)
+        twobit = store.install(file_id, packed)
+    finally:
+        os.remove(upload)
+        if os.path.exists(packed):
+            os.remove(packed)
+    return {
+        "file": file_id,
+        "sequences": [{"id": f"{file_id}:{name}", "name": name, "length": twobit.length(name)}
+                      for name in twobit.names()]
+    }
+
+
+@app.get("/store/{seq_id}/sequence")
+async def store_sequence(
+    seq_id: str,
+    start: int = Query(1, description="1-based start position."),
+    end: Optional[int] = Query(None, description="1-based inclusive end position (default: sequence end)."),
+):
+    """Return the bases of a stored sequence region ('N' over unknown bases).
+
+    Regions are limited to STORE_SEQUENCE_MAX bases; fetch longer ones in pieces.
+    """
+    twobit, name, start0, end0 = _store_region(seq_id, start, end)
+    if end0 - start0 > STORE_SEQUENCE_MAX:
+        raise HTTPException(status_code=400, 
+                            detail=f"Region {start}-{end0} is {end0 - start0} bp; at most "
+                                   f"{STORE_SEQUENCE_MAX} bp are returned at once, set 'start' and 'end'.")
+
+    def region_json():
+        # Unpacking and encoding megabases would hold up the event loop.
+        return json.dumps({"id": seq_id, "start": start, "end": end0,
+                           "sequence": twobit.fetch(name, start0, end0).decode("ascii")}).encode("ascii")
+    return Response(content=await asyncio.to_thread(region_json), media_type="application/json")
+
+
+@app.get("/store/{seq_id}/profile")
+async def store_profile(
+    seq_id: str,
+    start: int = Query(1, description="1-based start position."),
+    end: Optional[int] = Query(None, description="1-based inclusive end position (default: sequence end)."),
+    window: Optional[int] = Query(None, description="Window size in bp (default: length / points).", ge=1),
+    step: Optional[int] = Query(None, description="Step between windows in bp (default: window).", ge=1),
+    points: int = Query(1000, description="Maximum number of windows returned.", ge=1, le=100000),
+    tracks: str = Query("gc,gc_skew,cpg_oe", description="Comma-separated tracks: gc, gc_skew, cpg_oe."),
+    k: Optional[int] = Query(None, description="Also return k-mer frequencies per window (1-4).", ge=1, le=4),
+):
+    """Composition profile of a stored sequence region; N bases are not counted."""
+    names = _profile_options(tracks)
+    twobit, name, start0, end0 = _store_region(seq_id, start, end)
+    results = await run_analysis(tasks.profile_stored, str(twobit.path), name, start0, end0,
+                                 window, step, points, names, k)
+    return {"id": seq_id, "start": start, "end": end0, **results}
+
+
+@app.get("/store/{seq_id}/analyze")
+async def store_analysis(
+    seq_id: str,
+    start: int = Query(1, description="1-based start position."),
+    end: Optional[int] = Query(None, description="1-based inclusive end position (default: sequence end)."),
+    primer_length: int = Query(20, description="Primer length"),
+    include_reverse_complement: bool = Query(True, 
+                                             description="Include the region's reverse complement."),
+):
+    """GC content, reverse complement and primers for a stored sequence region.
+
+    GC is counted on the packed bytes without unpacking the region; N bases
+    are left out of the percentage, as clean_sequence would drop them.
+    """
+    twobit, name, start0, end0 = _store_region(seq_id, start, end)
+    results = await run_analysis(tasks.analyze_stored, str(twobit.path), name, start0, end0,
+                                 primer_length, include_reverse_complement)
+    return {"id": seq_id, "start": start, "end": end0, **results}
+
+
+@app.get("/store/{seq_id}/orfs")
+async def store_orfs(
+    seq_id: str,
+    start: int = Query(1, description="1-based start position."),
+    end: Optional[int] = Query(None, description="1-based inclusive end position (default: sequence end)."),
+    min_length: int = Query(0, 
+                            description="Minimum ORF length in bp, stop codon included.", 
+                            ge=0),
+    mode: str = Query("nested", 
+                      description="'nested' reports every ATG, 'longest' only the outermost per stop.", 
+                      pattern="^(nested|longest)$"),
+    both_strands: bool = Query(False, 
+                               description="Also scan the three reverse-strand frames."),
+    include_sequence: bool = Query(False, 
+                                   description="Include DNA and protein sequences for each ORF."),
+):
+    """Find ORFs in a stored sequence region.
+
+    Coordinates are on the stored sequence; frames count from the region start.
+    """
+    twobit, name, start0, end0 = _store_region(seq_id, start, end)
+    results = await run_analysis(tasks.find_stored_orfs, str(twobit.path), name, start0, end0,
+                                 min_length, mode, both_strands, include_sequence)
+    return {"id": seq_id, "start": start, "end": end0, **results}
+
+
+def _offtarget_path(index_id):
+    if not index_id.replace("_", "").replace("-", "").replace(".", "").isalnum():
+        raise HTTPException(status_code=400, detail="index_id may only contain letters, digits, '.', '_' and '-'.")
+    return OFFTARGET_DIR / index_id
+
+
+@app.get("/offtarget")
+async def offtarget_list():
+    """List the off-target indexes available for /offtarget/{index_id}/search."""
+    from offtarget import OffTargetIndex
+    return {"indexes": [{"id": path.name, **OffTargetIndex(path).summary()}
+                        for path in sorted(OFFTARGET_DIR.iterdir()) if (path / "meta.json").exists()]}
+
+
+@app.post("/offtarget/{index_id}")
+async def offtarget_build(
+    index_id: str,
+    file: UploadFile = File(..., 
+                            description="FASTA or FASTQ references, optionally gzip-compressed."),
+    k: Optional[int] = Query(None, 
+                             description="Seed length, 4-14 (default 10); the table takes 8 * 4**k bytes."),
+):
+    """Build (or rebuild) the off-target index <index_id> from uploaded references.
+
+    The build runs in the executor with the background-job task timeout,
+    reading the upload from a temporary file next to the indexes.
+    """
+    path = _offtarget_path(index_id)
+    fd, upload = tempfile.mkstemp(dir=OFFTARGET_DIR, suffix=".upload")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            await asyncio.to_thread(shutil.copyfileobj, file.file, fh)
+        task_timeout.set(analysis_jobs.task_timeout)
+        summary = await run_analysis(tasks.build_offtarget, str(path), upload, k)
+    finally:
+        os.remove(upload)
+    return {"id": index_id, **summary}
+
+
+@app.get("/offtarget/{index_id}/search")
+async def offtarget_search(
+    index_id: str,
+    forward_primer: Optional[str] = Query(None, description="Forward primer (5'->3')."),
+    reverse_primer: Optional[str] = Query(None, description="Reverse primer (5'->3')."),
+    sequence: Optional[str] = Query(None, 
+                                    description="Template to take primers from (as /analyze does) when none are given."),
+    sequence_id: Optional[str] = Query(None, 
+                                       description="ID from POST /sequences, sent instead of 'sequence'."),
+    primer_length: int = Query(20, description="Primer length used with 'sequence'.", ge=8),
+    max_mismatches: int = Query(3, 
+                                description="Most mismatches allowed at a binding site.", 
+                                ge=0, le=6),
+    max_amplicon: int = Query(3000, 
+                              description="Longest predicted amplicon in bp.", 
+                              ge=1),
+    max_three_prime_mismatches: Optional[int] = Query(None, 
+                                                      description="Sites with more mismatches in the 3'-most 5 bases are not extended into amplicons.", 
+                                                      ge=0, le=5),
+):
+    """Mismatch-tolerant primer binding sites and predicted amplicons, searched locally.
+
+    An offline alternative to /blast: seeds are looked up in a memory-mapped
+    index, so a primer pair is checked in milliseconds.
+    """
+    path = _offtarget_path(index_id)
+    if not (path / "meta.json").exists():
+        raise HTTPException(status_code=404, detail=f"Unknown off-target index '{index_id}'.")
+    primers = {}
+    if forward_primer:
+        primers["forward"] = _clean_or_400(forward_primer)
+    if reverse_primer:
+        primers["reverse"] = _clean_or_400(reverse_primer)
+    if not primers:
+        if not sequence and not sequence_id:
+            raise HTTPException(status_code=400, detail="Provide primers or a 'sequence' to take them from.")
+        cleaned_sequence, _ = await _sequence_or_400(sequence, sequence_id)
+        if len(cleaned_sequence) < primer_length:
+            raise HTTPException(status_code=400, detail="Sequence is shorter than primer_length.")
+        primers["forward"], primers["reverse"] = get_primers(cleaned_sequence, primer_length)
+    return await run_analysis(tasks.offtarget_search, str(path), primers, max_mismatches,
+                              max_amplicon, max_three_prime_mismatches)
+
+
+# --------------------------
+# --- Background Jobs
+# --------------------------
+# Job type -> the endpoint it runs. Jobs call the endpoint in-process, so
+# they get the same validation, result cache and executor as a request.
+JOB_ROUTES = {
+    "analyze": ("GET", "/analyze"),
+    "display": ("GET", "/analyze/display"),
+    "orfs": ("GET", "/orfs"),
+    "translate": ("GET", "/translate"),
+    "profile": ("GET", "/profile"),
+    "primers": ("GET", "/primers"),
+    "kmers": ("GET", "/kmers"),
+    "motifs": ("GET", "/motifs"),
+    "repeats": ("GET", "/repeats"),
+    "restriction": ("GET", "/restriction"),
+    "mutation": ("POST", "/mutation"),
+    "mutations_batch": ("POST", "/mutations/batch"),
+    "offtarget": ("GET", "/offtarget/{index_id}/search"),
+    "literature": ("GET", "/literature"),
+    "blast": ("GET", "/blast"),
+}
+# These take the raw text; every other job's sequence goes through the session store.
+_RAW_SEQUENCE_JOBS = ("literature", "blast")
+_PATH_PARAM_RE = re.compile(r"\{(\w+)\}")
+# Seconds between checks of a BLAST job's RID.
+JOB_BLAST_POLL = 5.0
+
+
+async def _job_request(client, method, path, params, progress):
+    """Call an endpoint in-process, waiting while the executor is busy; its JSON as bytes."""
+    while True:
+        if method == "GET":
+            response = await client.get(path, params=params)
+        else:
+            response = await client.post(path, json=params)
+        if response.status_code != 429:
+            break
+        progress("waiting_for_worker")
+        await asyncio.sleep(float(response.headers.get("retry-after", 1)))
+    if response.status_code >= 400:
+        try:
+            detail = response.json().get("detail", response.text)
+        except ValueError:
+            detail = response.text
+        raise ValueError(f"{response.status_code}: {detail}")
+    if not response.headers.get("content-type", "").startswith("application/json"):
+        raise ValueError("Jobs return JSON; drop the 'format' parameter.")
+    progress("running")
+    return response.content
+
+
+async def run_job(job, progress):
+    """Job runner for the JobManager: one in-process call to the job's endpoint."""
+    method, path = JOB_ROUTES[job["type"]]
+    params = dict(job["params"])
+    path = _PATH_PARAM_RE.sub(lambda m: quote(str(params.pop(m[1], "")), safe=""), path)
+    if params.get("sequence") and job["type"] not in _RAW_SEQUENCE_JOBS:
+        # Large inputs would not fit in a query string; pass them by ID.
+        cleaned_sequence = clean_sequence(params.pop("sequence"))
         if not cleaned_sequence:
-            raise HTTPException(status_code=400, detail="No valid DNA sequence found.")
-            
-        orfs = find_orfs_with_translation(cleaned_sequence)
-        return {
-            "sequence": cleaned_sequence,
-            "orfs_found": len(orfs),
-            "orfs": orfs
-        }
-    
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    
+            raise ValueError("No valid DNA sequence found.")
+        params["sequence_id"] = await sequence_sessions.add(cleaned_sequence.encode("ascii"))
+    import httpx
+    task_timeout.set(analysis_jobs.task_timeout)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://jobs", timeout=None) as client:
+        result = await _job_request(client, method, path, params, progress)
+    if job["type"] != "blast":
+        return result  # stored as is, without decoding and encoding it again
+
+    result = json.loads(result)
+    if result["status"] != "success":
+        raise ValueError(result.get("message", "BLAST request failed."))
+    blast_id, polls = result["id"], 0
+    while True:
+        blast_job = await blast_jobs.get(blast_id)
+        if blast_job is None or blast_job["status"] == "failed":
+            raise ValueError((blast_job or {}).get("message", f"BLAST search {blast_id} was lost."))
+        if blast_job["status"] == "ready":
+            return blast_job
+        polls += 1
+        progress("waiting_for_ncbi", rid=blast_job["rid"], polls=polls)
+        await asyncio.sleep(JOB_BLAST_POLL)
+
+
+# Background jobs (SQLite-backed, survive restarts); see jobs.py.
+analysis_jobs = JobManager.from_env(run_job)
+
+
+async def _job_or_404(job_id):
+    job = await analysis_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired job '{job_id}'.")
+    return job
+
+
+@app.post("/jobs", status_code=202)
+async def job_submit(request: JobRequest):
+    """Queue an analysis; poll GET /jobs/{id} or stream /jobs/{id}/events for its result."""
+    if request.type not in JOB_ROUTES:
+        raise HTTPException(status_code=400, 
+                            detail=f"Unknown job type '{request.type}'. Choose from {list(JOB_ROUTES)}.")
+    params = request.params
+    if params.get("sequence_id") and not await sequence_sessions.persist(params["sequence_id"]):
+        # A memory-only session is gone after a restart; keep the sequence in the job instead.
+        cleaned_sequence, _ = await _sequence_or_400(None, params["sequence_id"])
+        params = {**{k: v for k, v in params.items() if k != "sequence_id"}, "sequence": cleaned_sequence}
+    try:
+        job = await analysis_jobs.submit(request.type, params)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    return analysis_jobs.snapshot(job)
+
+
+@app.get("/jobs")
+async def job_list(
+    limit: int = Query(100, 
+                       description="Most recent jobs returned.", 
+                       ge=1, le=1000),
+):
+    """Recent jobs (newest first) and the queue counters."""
+    return {**analysis_jobs.summary(), 
+            "jobs": [analysis_jobs.snapshot(job) for job in await analysis_jobs.recent(limit)]}
+
+
+@app.get("/jobs/types")
+async def job_types():
+    """Job types and the endpoint whose parameters each takes."""
+    return {name: f"{method} {path}" for name, (method, path) in JOB_ROUTES.items()}
+
+
+@app.get("/jobs/{job_id}")
+async def job_status(
+    job_id: str,
+    include_result: bool = Query(True, 
+                                 description="Include the result once the job has succeeded."),
+):
+    """Status, progress and, once succeeded, the result of a job."""
+    job = analysis_jobs.snapshot(await _job_or_404(job_id))
+    if not include_result or job["status"] != "succeeded":
+        return job
+    # The stored result is spliced in as is: decoding and re-encoding a large
+    # result would hold up the event loop.
+    result = await analysis_jobs.result(job_id)
+    return Response(content=json.dumps(job).encode("utf-8")[:-1] + b', "result": ' + result + b"}",
+                    media_type="application/json")
+
+
+@app.get("/jobs/{job_id}/result")
+async def job_result(job_id: str):
+    """The result of a succeeded job, exactly as its endpoint returned it."""
+    job = await _job_or_404(job_id)
+    if job["status"] != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job '{job_id}' is {job['status']}.")
+    return Response(content=await analysis_jobs.result(job_id), media_type="application/json")
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """Server-sent 'status' events on every change of a job, until it finishes."""
+    await _job_or_404(job_id)
+    return StreamingResponse(sse(analysis_jobs.watch(job_id)), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
+
+@app.delete("/jobs/{job_id}")
+async def job_cancel(job_id: str):
+    """Cancel a queued or running job, or delete a finished one."""
+    job = await _job_or_404(job_id)
+    if await analysis_jobs.cancel(job_id) is None:
+        await analysis_jobs.delete(job_id)
+        return {"id": job_id, "deleted": True}
+    return analysis_jobs.snapshot(job)
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Result cache size and hit/miss counters per endpoint."""
+    return result_cache.summary()
+
+
+_CACHE_STAT_RE = re.compile(r"(.+)_(hits_memory|hits_disk|misses)")
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Request, stage, cache, session, executor, job and NCBI metrics in Prometheus text format."""
+    stats = result_cache.summary()
+    for name, value in stats.items():
+        match = _CACHE_STAT_RE.fullmatch(name)
+        if match:
+            cache_lookups.set(value, namespace=match[1], outcome=match[2])
+    cache_evictions.set(stats.get("evictions", 0))
+    cache_bytes.set(stats["bytes"])
+    ncbi_calls.set(ncbi_client.calls if ncbi_client else 0)
+    executor_in_flight.set(executor.in_flight)
+    executor_workers.set(executor.workers)
+    job_counts = analysis_jobs.summary()
+    for status in ("queued", "running"):
+        jobs_active.set(job_counts[status], status=status)
+    sessions = sequence_sessions.summary()
+    session_sequences.set(sessions["sequences"])
+    session_bytes.set(sessions["bytes"])
+    for outcome in ("hits_memory", "hits_disk", "misses"):
+        session_lookups.set(sessions.get(outcome, 0), outcome=outcome)
+    return Response(content=metrics_registry.render(), media_type=CONTENT_TYPE)
+
+
 @app.get("/health")
-async def health():
-    return {"status": "ok", "timestamp": datetime.now()}
+async def health(response: Response):
+    # A broken pool is rebuilt by the next analysis; until then report it, with
+    # a 503, so a supervisor can tell the server is not serving analyses.
+    degraded = executor.broken
+    if degraded:
+        response.status_code = 503
+    return {
+        "status": "degraded" if degraded else "ok",
+        "timestamp": datetime.now(),
+        "uptime_seconds": round(time.time() - started_at, 1),
+        "executor": executor.stats(),
+        "jobs": analysis_jobs.summary(),
+        "ncbi_calls": ncbi_client.calls if ncbi_client else 0,
+    }
 
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
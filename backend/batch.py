@@ -0,0 +1,95 @@
+# Batch Analysis
+# Runs the analyzer over every record of a FASTA/FASTQ file and streams one
+# JSON object per record (NDJSON). Used by POST /analyze/batch and as a CLI:
+#   python batch.py reads.fastq.gz --primer-length 20 > results.ndjson
+#   cat genome.fa | python batch.py - > results.ndjson
+
+import argparse
+import json
+import sys
+
+from analyzer import (clean_sequence, gc_content, reverse_complement, transcribe,
+                      translate_dna, get_primers, primer_stats,
+                      find_orfs_with_translation)
+from seqio import READ_ERRORS, read_records
+
+
+# --------------------------
+# --- Per-Record Analysis
+# --------------------------
+def analyze_record(record, primer_length=20, include_sequences=False):
+    """Summarise one Record the way /analyze does, minus the bulky fields.
+
+    ``include_sequences`` adds the cleaned sequence, reverse complement,
+    mRNA and protein, which are as large as the input itself.
+    """
+    cleaned = clean_sequence(record.sequence)
+    if not cleaned:
+        return {"id": record.id, "status": "error", "message": "No valid DNA sequence found."}
+
+    forward_primer, reverse_primer = get_primers(cleaned, primer_length)
+    if isinstance(forward_primer, bytes):
+        forward_primer = forward_primer.decode("ascii")
+        reverse_primer = reverse_primer.decode("ascii")
+    f_gc, f_tm, f_quality = primer_stats(forward_primer)
+    r_gc, r_tm, r_quality = primer_stats(reverse_primer)
+    orfs = find_orfs_with_translation(cleaned, include_sequence=False)
+
+    result = {
+        "id": record.id,
+        "description": record.description,
+        "status": "success",
+        "length": len(cleaned),
+        "gc_content": gc_content(cleaned),
+        "forward_primer": forward_primer,
+        "reverse_primer": reverse_primer,
+        "forward_primer_stats": {"gc_content": f_gc, "tm": f_tm, "quality": f_quality},
+        "reverse_primer_stats": {"gc_content": r_gc, "tm": r_tm, "quality": r_quality},
+        "orfs_found": len(orfs),
+    }
+    if include_sequences:
+        result["cleaned_sequence"] = cleaned.decode("ascii")
+        result["reverse_complement"] = reverse_complement(cleaned).decode("ascii")
+        result["transcribed_mrna"] = transcribe(cleaned).decode("ascii")
+        result["translated_protein"] = translate_dna(cleaned)
+    return result
+
+
+def analyze_records(records, primer_length=20, include_sequences=False):
+    """Yield one result dict per record; parse errors end the stream with an error entry."""
+    try:
+        for record in records:
+            try:
+                yield analyze_record(record, primer_length, include_sequences)
+            except Exception as e:
+                yield {"id": record.id, "status": "error", "message": str(e)}
+    except (ValueError, *READ_ERRORS) as e:
+        yield {"id": None, "status": "error", "message": str(e)}
+
+
+def to_ndjson(results):
+    for result in results:
+        yield json.dumps(result) + "\n"
+
+
+# --------------------------
+# --- CLI
+# --------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze every record of a FASTA/FASTQ file (gzip ok) as NDJSON.")
+    parser.add_argument("input", help="FASTA/FASTQ path, or '-' for stdin")
+    parser.add_argument("--format", choices=["fasta", "fastq"], default=None,
+                        help="input format (detected from content by default)")
+    parser.add_argument("--primer-length", type=int, default=20)
+    parser.add_argument("--include-sequences", action="store_true",
+                        help="also output cleaned sequence, reverse complement, mRNA and protein")
+    args = parser.parse_args(argv)
+
+    source = sys.stdin.buffer if args.input == "-" else args.input
+    records = read_records(source, args.format)
+    for line in to_ndjson(analyze_records(records, args.primer_length, args.include_sequences)):
+        sys.stdout.write(line)
+
+
+if __name__ == "__main__":
+    main()
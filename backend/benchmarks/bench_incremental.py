@@ -0,0 +1,96 @@
+# Benchmark: incremental re-analysis after edits (incremental.py) against a
+# full rescan of the edited sequence.
+#   python benchmarks/bench_incremental.py                  # 10 Mbp
+#   python benchmarks/bench_incremental.py --sizes 1000000 100000000 --cases snv frameshift
+# The rescan is what the client did before: /analyze fields (GC, protein,
+# primers), /orfs on both strands and /profile on the edited sequence.
+# Before timing, every case checks that the ORFs of the old sequence, minus
+# the removed ones, moved by the shifts, plus the added ones, are exactly the
+# ORFs of the edited sequence.
+
+import argparse
+import random
+
+from common import best_of, format_size, random_sequence
+
+import composition
+import incremental
+import orfs as orfs_engine
+from seqcontext import SequenceContext
+from variants import Variant
+
+
+def _snv(data, position, rng):
+    ref = chr(data[position - 1])
+    return Variant(position, ref, rng.choice([base for base in "ACGT" if base != ref]), None)
+
+
+CASES = {
+    "snv": lambda data, rng: [_snv(data, len(data) // 2, rng)],
+    "insertion": lambda data, rng: [Variant(len(data) // 2, "", "T", None)],
+    "frameshift": lambda data, rng: [Variant(len(data) // 2, data[len(data) // 2 - 1:len(data) // 2 + 1]
+                                             .decode("ascii"), "", None)],
+    "inframe_indel": lambda data, rng: [Variant(len(data) // 2, "", "ATGTAA", None)],
+    "snv_x10": lambda data, rng: [_snv(data, position, rng)
+                                  for position in sorted(rng.sample(range(1, len(data) + 1), 10))],
+}
+
+
+def incremental_delta(data, edits):
+    edited, splices = incremental.apply_edits(data, edits)
+    return incremental.edit_delta(data, edited, edits, splices, old_key="old")
+
+
+def full_rescan(data, edits):
+    edited, _ = incremental.apply_edits(data, edits)
+    context = SequenceContext(edited, clean=False)
+    return (context.gc_content, context.translation(1), context.primers(20),
+            context.orfs(0, "nested", True), composition.sequence_profile(edited))
+
+
+def check(data, edits, delta):
+    edited, splices = incremental.apply_edits(data, edits)
+    splices = incremental.merge_splices(data, splices)
+
+    def moved(position):
+        shift = 0
+        for splice in splices:
+            if position <= splice.start:
+                break
+            if position <= splice.end:
+                return None
+            shift += len(splice.alt) - (splice.end - splice.start)
+        return position + shift
+
+    removed = {(orf["strand"], orf["start"], orf["end"]) for orf in delta["orfs"]["removed"]}
+    expected = {(strand, moved(start), moved(end))
+                for strand, _, start, end in orfs_engine.scan_orfs(data, 0, "nested", True)
+                if (strand, start, end) not in removed}
+    expected |= {(orf["strand"], orf["start"], orf["end"]) for orf in delta["orfs"]["added"]}
+    return expected == {(strand, start, end)
+                        for strand, _, start, end in orfs_engine.scan_orfs(edited, 0, "nested", True)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark incremental re-analysis after edits")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000_000])
+    parser.add_argument("--cases", nargs="+", default=list(CASES), choices=list(CASES))
+    args = parser.parse_args()
+
+    print(f"{'case':<14} {'size':>10} {'rescan s':>10} {'delta ms':>10} {'speedup':>9}")
+    for size in args.sizes:
+        data = random_sequence(size, seed=23).encode("ascii")
+        rng = random.Random(size)
+        incremental.base_counts(data, "old")  # counted once per stored sequence, then cached
+        for name in args.cases:
+            edits = CASES[name](data, rng)
+            if not check(data, edits, incremental_delta(data, edits)):
+                raise SystemExit(f"{name}: ORF delta differs from a full rescan")
+            rescan = best_of(full_rescan, data, edits, repeat=1)
+            delta = best_of(incremental_delta, data, edits)
+            print(f"{name:<14} {format_size(size):>10} {rescan:>10.3f} {delta * 1000:>10.2f} "
+                  f"{rescan / delta:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
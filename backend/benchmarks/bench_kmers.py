@@ -0,0 +1,60 @@
+# Benchmark: k-mer counting, motif search, tandem repeats, restriction map.
+#   python benchmarks/bench_kmers.py                      # 1 and 10 Mbp
+#   python benchmarks/bench_kmers.py --sizes 1000000 --naive-max 1000000
+# Naive baselines (collections.Counter over string slices, one regex per
+# motif and strand) are only timed up to --naive-max bases.
+
+import argparse
+import re
+from collections import Counter
+
+from common import best_of, format_size, random_sequence
+
+import kmers
+import motifs
+import restriction
+
+_IUPAC_RE = {code: "[" + "".join(b for b, bit in zip("ACGT", (1, 2, 4, 8)) if mask & bit) + "]"
+             for code, mask in motifs.IUPAC.items()}
+
+
+def naive_count(seq, k):
+    return Counter(seq[i:i + k] for i in range(len(seq) - k + 1))
+
+
+def naive_motifs(seq, patterns):
+    hits = 0
+    for pattern in patterns:
+        for strand in {pattern, motifs.reverse_complement_iupac(pattern)}:
+            regex = re.compile("(?=" + "".join(_IUPAC_RE[ch] for ch in strand) + ")")
+            hits += sum(1 for _ in regex.finditer(seq))
+    return hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the k-mer and motif engines")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--naive-max", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    sites = [site for site, _ in restriction.ENZYMES.values()]
+    print(f"{'size':>10} {'case':<28} {'seconds':>10}")
+    for size in args.sizes:
+        seq = random_sequence(size, seed=3)
+        cases = [
+            ("count k=8", lambda: kmers.count_kmers(seq, 8)),
+            ("count k=21", lambda: kmers.count_kmers(seq, 21)),
+            ("count k=31 canonical", lambda: kmers.count_kmers(seq, 31, canonical=True)),
+            (f"motifs x{len(sites)} both strands", lambda: motifs.MotifSet(sites).search(seq)),
+            ("tandem repeats 1-6", lambda: kmers.tandem_repeats(seq)),
+            ("restriction map", lambda: restriction.restriction_map(seq)),
+        ]
+        if size <= args.naive_max:
+            cases[1:1] = [("naive count k=21", lambda: naive_count(seq, 21))]
+            cases.append((f"naive regex x{len(sites)}", lambda: naive_motifs(seq, sites)))
+        for name, func in cases:
+            print(f"{format_size(size):>10} {name:<28} {best_of(func, repeat=1):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
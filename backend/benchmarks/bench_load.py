@@ -0,0 +1,84 @@
+# Load test: p50/p99 latency and throughput of the API under concurrent
+# requests, with analyses run inline on the event loop (the old behaviour)
+# versus in the process pool.
+#   python benchmarks/bench_load.py --clients 8 --requests 20 --size 60000
+# Requests go through the ASGI app in-process (httpx.ASGITransport), so no
+# server needs to be running; worker processes are real. Sequences travel
+# as a query parameter, which httpx caps at 64 KB.
+
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+import numpy as np
+
+from common import random_sequence
+
+import api
+from executor import AnalysisExecutor
+
+
+def percentiles(samples):
+    if not samples:
+        return "n/a"
+    p50, p99 = np.percentile(samples, [50, 99])
+    return f"p50 {p50 * 1000:8.1f} ms   p99 {p99 * 1000:8.1f} ms   n={len(samples)}"
+
+
+async def run_load(workers, clients, requests, sequence):
+    api.executor = AnalysisExecutor(workers=workers, queue_size=clients)
+    api.executor.start()
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        # Warm up workers (process spawn and imports) outside the timings.
+        await asyncio.gather(*(client.get("/analyze", params={"sequence": "ATGTAA"})
+                               for _ in range(max(workers, 1))))
+
+        analysis_times, health_times = [], []
+        done = asyncio.Event()
+
+        async def worker():
+            for _ in range(requests):
+                start = time.perf_counter()
+                response = await client.get("/analyze", params={"sequence": sequence})
+                response.raise_for_status()
+                analysis_times.append(time.perf_counter() - start)
+
+        async def prober():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/health")
+                health_times.append(time.perf_counter() - start)
+                await asyncio.sleep(0.01)
+
+        probe = asyncio.ensure_future(prober())
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe
+    api.executor.shutdown()
+    return elapsed, analysis_times, health_times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the analysis endpoints")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=20, help="requests per client")
+    parser.add_argument("--size", type=int, default=60_000, help="sequence length per request")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    sequence = random_sequence(args.size, seed=11)
+    total = args.clients * args.requests
+    for label, workers in (("inline (before)", 0), (f"pool x{args.workers}", args.workers)):
+        elapsed, analysis, health = asyncio.run(run_load(workers, args.clients, args.requests, sequence))
+        print(f"{label:<16} {total / elapsed:6.1f} req/s")
+        print(f"  /analyze {percentiles(analysis)}")
+        print(f"  /health  {percentiles(health)}")
+
+
+if __name__ == "__main__":
+    main()
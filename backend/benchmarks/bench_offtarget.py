@@ -0,0 +1,113 @@
+# Benchmark: off-target index build and primer-pair search.
+#   python benchmarks/bench_offtarget.py                  # 10 and 100 Mbp
+#   python benchmarks/bench_offtarget.py --sizes 1000000 --mismatches 0 2
+# The index is written to a temporary directory and removed afterwards.
+# Before timing, a primer hanging one base off the end of a reference is
+# checked to produce no site past that end, and find_sites is compared with
+# a brute-force scan on short references with Ns, where sites end close to
+# a reference end or an N run.
+
+import argparse
+import random
+import shutil
+import tempfile
+
+from common import best_of, format_size, random_sequence
+
+import offtarget
+
+
+def check_reference_end(k):
+    """A primer overhanging a reference end must not match into the padding."""
+    ref = random_sequence(500, seed=7)
+    primer = ref[-19:] + ("A" if ref[-1] != "A" else "C")
+    path = tempfile.mkdtemp()
+    try:
+        index = offtarget.build_index(path, [("ref", ref), ("next", random_sequence(500, seed=8))], k)
+        sites = index.find_sites(primer, max_mismatches=1)
+    finally:
+        shutil.rmtree(path)
+    if any(site["end"] > 500 for site in sites if site["reference"] == "ref"):
+        raise SystemExit(f"off-target site past the reference end: {sites}")
+
+
+def brute_force_sites(references, primer, max_mismatches):
+    """{(reference, strand, start)} of every site, by comparing every window."""
+    rc = primer[::-1].translate(str.maketrans("ACGT", "TGCA"))
+    sites = set()
+    for name, ref in references:
+        for start in range(len(ref) - len(primer) + 1):
+            window = ref[start:start + len(primer)]
+            if "N" in window:
+                continue
+            for strand, query in (("+", primer), ("-", rc)):
+                if sum(a != b for a, b in zip(window, query)) <= max_mismatches:
+                    sites.add((name, strand, start + 1))
+    return sites
+
+
+def check_brute_force(k, indexes=100, primers=20):
+    """find_sites must report exactly the sites a full scan finds."""
+    rng = random.Random(11)
+    for case in range(indexes):
+        references = []
+        for i in range(3):
+            ref = list(random_sequence(rng.randint(40, 160), seed=rng.randrange(1 << 30)))
+            for _ in range(rng.randint(0, 2)):
+                at = rng.randrange(len(ref))
+                ref[at:at + rng.randint(1, 4)] = "N" * len(ref[at:at + 4])
+            references.append((f"ref{i}", "".join(ref)))
+        path = tempfile.mkdtemp()
+        try:
+            index = offtarget.build_index(path, references, k)
+            for _ in range(primers):
+                max_mismatches = rng.randint(0, 3)
+                name, ref = rng.choice(references)
+                length = rng.randint(18, 25)
+                # Mostly copies of a stretch ending at a reference end or an N, mutated.
+                end = rng.choice([len(ref), ref.find("N") if "N" in ref else len(ref),
+                                  rng.randint(length, len(ref))])
+                primer = list(ref[max(end - length, 0):end].replace("N", "A").ljust(length, "A"))
+                for _ in range(rng.randint(0, max_mismatches + 1)):
+                    primer[rng.randrange(length)] = rng.choice("ACGT")
+                primer = "".join(primer)
+                found = {(s["reference"], s["strand"], s["start"])
+                         for s in index.find_sites(primer, max_mismatches)}
+                expected = brute_force_sites(references, primer, max_mismatches)
+                if found != expected:
+                    raise SystemExit(f"index {case}: {primer} with {max_mismatches} mismatches: "
+                                     f"missed {sorted(expected - found)}, extra {sorted(found - expected)}")
+        finally:
+            shutil.rmtree(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the local off-target search")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000_000, 100_000_000])
+    parser.add_argument("--mismatches", type=int, nargs="+", default=[0, 2, 3])
+    parser.add_argument("-k", type=int, default=offtarget.DEFAULT_K)
+    args = parser.parse_args()
+
+    check_reference_end(args.k)
+    check_brute_force(args.k)
+    print(f"{'size':>10} {'case':<28} {'seconds':>10}")
+    for size in args.sizes:
+        seq = random_sequence(size, seed=5)
+        primers = {"forward": seq[1000:1020], "reverse": random_sequence(20, seed=6)}
+        path = tempfile.mkdtemp()
+        try:
+            index = None
+
+            def build():
+                nonlocal index
+                index = offtarget.build_index(path, [("ref", seq)], args.k)
+            print(f"{format_size(size):>10} {f'build k={args.k}':<28} {best_of(build, repeat=1):>10.3f}")
+            for mm in args.mismatches:
+                seconds = best_of(lambda: index.search(primers, max_mismatches=mm))
+                print(f"{format_size(size):>10} {f'search pair, {mm} mismatches':<28} {seconds:>10.4f}")
+        finally:
+            shutil.rmtree(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# Benchmark: legacy nested-loop ORF finder vs. the vectorized ORF engine.
+#   python benchmarks/bench_orfs.py                       # 1, 5 and 20 Mbp
+#   python benchmarks/bench_orfs.py --sizes 100000 --legacy-max 100000
+# The legacy scanner goes quadratic on ATG-rich input, so it is only timed
+# up to --legacy-max bases.
+
+import argparse
+
+from common import best_of, format_size, random_sequence
+
+import analyzer
+
+
+def legacy_find_orfs(seq):
+    start_codon = 'ATG'
+    stop_codons = {'TAA', 'TAG', 'TGA'}
+    orfs = []
+
+    for frame in range(3):
+        i = frame
+        while i < len(seq) - 2:
+            codon = seq[i:i+3]
+            if codon == start_codon:
+                for j in range(i + 3, len(seq) - 2, 3):
+                    stop_codon = seq[j:j+3]
+                    if stop_codon in stop_codons:
+                        orfs.append({'start': i + 1, 'end': j + 3, 'length': j + 3 - i})
+                        break
+                i += 3
+            else:
+                i += 3
+    return orfs
+
+
+def coords_only(seq):
+    return analyzer.find_orfs_with_translation(seq, include_sequence=False)
+
+
+def six_frames(seq):
+    return analyzer.find_orfs_with_translation(seq, both_strands=True, include_sequence=False)
+
+
+def six_frames_longest(seq):
+    return analyzer.find_orfs_with_translation(seq, mode="longest", min_length=300,
+                                               both_strands=True, include_sequence=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ORF engine")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 5_000_000, 20_000_000])
+    parser.add_argument("--legacy-max", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    inputs = [
+        ("random", b"ACGT"),
+        # Stop-poor and ATG-rich: worst case for the per-ATG inner loop.
+        ("atg-rich", b"ATGATGCATG"),
+    ]
+    print(f"{'input':<10} {'size':>10} {'case':<20} {'seconds':>10} {'orfs':>10}")
+    for size in args.sizes:
+        for label, alphabet in inputs:
+            seq = random_sequence(size, seed=7, alphabet=alphabet)
+            cases = [("forward", coords_only), ("six-frame", six_frames),
+                     ("six-frame longest", six_frames_longest)]
+            if size <= args.legacy_max:
+                legacy = legacy_find_orfs(seq)
+                if legacy != coords_only(seq):
+                    raise SystemExit(f"{label}: hit lists differ at {format_size(size)}")
+                cases.insert(0, ("legacy forward", legacy_find_orfs))
+            for name, func in cases:
+                seconds = best_of(func, seq, repeat=1)
+                print(f"{label:<10} {format_size(size):>10} {name:<20} {seconds:>10.3f} {len(func(seq)):>10}")
+
+
+if __name__ == "__main__":
+    main()
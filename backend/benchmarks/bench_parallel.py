@@ -0,0 +1,66 @@
+# Benchmark: chunked parallel analysis (parallel.py) against the serial path.
+#   python benchmarks/bench_parallel.py                        # 100 Mbp, 1/2/4/8 workers
+#   python benchmarks/bench_parallel.py --sizes 10000000 --workers 1 2 --chunk-size 1000000
+# Every parallel result is checked against the serial one before it is timed.
+# Pools are started (and their workers spawned) before timing, as a server
+# would keep them; speedups are bounded by the machine's core count.
+
+import argparse
+import os
+
+from common import best_of, format_size, random_sequence
+
+import analyzer
+import seqcore
+from parallel import DEFAULT_CHUNK_SIZE, ChunkedAnalyzer, sequence_stats
+
+CASES = {
+    "gc_content": (analyzer.gc_content, lambda pa: pa.gc_content),
+    "base_counts": (seqcore.base_counts, lambda pa: pa.base_counts),
+    "stats": (sequence_stats, lambda pa: pa.stats),
+    "orfs": (lambda seq: analyzer.find_orfs_with_translation(seq, both_strands=True),
+             lambda pa: lambda seq: pa.find_orfs_with_translation(seq, both_strands=True)),
+    "orfs_coords": (lambda seq: analyzer.find_orfs_with_translation(seq, min_length=300, mode="longest",
+                                                                    both_strands=True, include_sequence=False),
+                    lambda pa: lambda seq: pa.find_orfs_with_translation(seq, min_length=300, mode="longest",
+                                                                         both_strands=True,
+                                                                         include_sequence=False)),
+}
+
+
+def _warm(pa):
+    # Spawn every worker and import the analysis modules there.
+    pa.base_counts("ACGT" * pa.workers * pa.chunk_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark chunked parallel analysis")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000_000])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--cases", nargs="+", default=list(CASES), choices=list(CASES))
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs, chunk size {format_size(args.chunk_size)}")
+    print(f"{'case':<12} {'size':>10} {'workers':>8} {'seconds':>10} {'speedup':>8}")
+    for size in args.sizes:
+        seq = random_sequence(size, seed=11)
+        for name in args.cases:
+            serial, parallel = CASES[name]
+            expected = serial(seq)
+            serial_seconds = best_of(serial, seq, repeat=1)
+            print(f"{name:<12} {format_size(size):>10} {'serial':>8} {serial_seconds:>10.3f} {1:>8.2f}")
+            for workers in args.workers:
+                with ChunkedAnalyzer(workers, args.chunk_size) as pa:
+                    _warm(pa)
+                    func = parallel(pa)
+                    if func(seq) != expected:
+                        raise SystemExit(f"{name}: {workers} workers differ from the serial result")
+                    seconds = best_of(func, seq, repeat=1)
+                print(f"{name:<12} {format_size(size):>10} {workers:>8} {seconds:>10.3f} "
+                      f"{serial_seconds / seconds:>8.2f}")
+            del expected
+
+
+if __name__ == "__main__":
+    main()
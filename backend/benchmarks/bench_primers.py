@@ -0,0 +1,93 @@
+# Benchmark: primer design scan over a template.
+#   python benchmarks/bench_primers.py                    # 5, 50 and 500 kbp
+#   python benchmarks/bench_primers.py --sizes 50000 --flank 500
+# "scan" is the prefix-sum Tm/GC pass over every window and length;
+# "design" adds the structure checks and pairing. The naive column scores
+# each window from scratch (sum over its dinucleotides) and is only timed
+# up to --naive-max bases. Before timing, the scan is checked against
+# windows scored one at a time on a template with Ns, and design on a
+# lowercase template against the same template in uppercase.
+
+import argparse
+import random
+
+import numpy as np
+
+from common import best_of, format_size, random_sequence
+
+import primers
+import seqcore
+
+
+def naive_scan(seq, lengths=range(18, 26)):
+    conditions = primers.PrimerConditions()
+    found = 0
+    for length in lengths:
+        for start in range(len(seq) - length + 1):
+            primer = seq[start:start + length]
+            gc = (primer.count("G") + primer.count("C")) * 100.0 / length
+            found += 57.0 <= primers.primer_tm(primer, conditions) <= 63.0 and 40.0 <= gc <= 60.0
+    return found
+
+
+def scan(seq):
+    codes = seqcore.encode_2bit(seq).astype(np.int64)
+    return primers.scan_candidates(codes, range(18, 26), primers.PrimerConditions(),
+                                   (57.0, 63.0), (40.0, 60.0), 60.0)
+
+
+def check_ambiguous_templates():
+    """Ns and lowercase bases must neither break the scan nor end up in primers."""
+    rng = random.Random(3)
+    seq = list(random_sequence(2_000, seed=12))
+    for at in rng.sample(range(len(seq)), 40):
+        seq[at] = "N"
+    seq = "".join(seq)
+    conditions = primers.PrimerConditions()
+    expected = set()
+    for length in range(18, 26):
+        for start in range(len(seq) - length + 1):
+            primer = seq[start:start + length]
+            if "N" in primer:
+                continue
+            tm, gc = primers._window_tm_gc(seqcore.encode_2bit(primer).astype(np.int64), length, conditions)
+            if 57.0 <= tm[0] <= 63.0 and 40.0 <= gc[0] <= 60.0:
+                expected.add((start, length))
+    _, starts, lengths, _, _ = scan(seq)
+    found = set(zip(starts.tolist(), lengths.astype(int).tolist()))
+    if found != expected:
+        raise SystemExit(f"scan on a template with Ns: missed {sorted(expected - found)[:5]}, "
+                         f"extra {sorted(found - expected)[:5]}")
+    design = primers.design_primers(seq)
+    if any("N" in pair[side]["sequence"] for pair in design["pairs"] for side in ("forward", "reverse")):
+        raise SystemExit(f"primer over an N: {design['pairs']}")
+    template = random_sequence(2_000, seed=13)
+    if primers.design_primers(template.lower()) != primers.design_primers(template):
+        raise SystemExit("design differs between a lowercase and an uppercase template")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark primer design")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5_000, 50_000, 500_000])
+    parser.add_argument("--flank", type=int, default=None)
+    parser.add_argument("--naive-max", type=int, default=5_000)
+    args = parser.parse_args()
+
+    check_ambiguous_templates()
+    print(f"{'size':>10} {'case':<10} {'seconds':>10} {'result':>10}")
+    for size in args.sizes:
+        seq = random_sequence(size, seed=11)
+        cases = [
+            ("scan", scan, lambda result: len(result[0])),
+            ("design", lambda s: primers.design_primers(s, flank=args.flank),
+             lambda result: len(result["pairs"])),
+        ]
+        if size <= args.naive_max:
+            cases.insert(0, ("naive", naive_scan, lambda result: result))
+        for name, func, summarise in cases:
+            seconds = best_of(func, seq, repeat=1)
+            print(f"{format_size(size):>10} {name:<10} {seconds:>10.3f} {summarise(func(seq)):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# Benchmark: composition profiles.
+#   python benchmarks/bench_profile.py                    # 1, 10 and 100 Mbp
+#   python benchmarks/bench_profile.py --sizes 1000000 --points 5000
+# "build" creates the prefix-count tracks once; the query rows reuse them,
+# which is what repeated /profile calls on the same sequence pay. The naive
+# row recounts every window with bytes.count.
+
+import argparse
+
+from common import best_of, format_size, random_sequence
+
+import composition
+
+
+def naive(seq, window, step):
+    data = seq.encode("ascii")
+    out = []
+    for start in range(0, len(data) - window + 1, step):
+        chunk = data[start:start + window]
+        g, c = chunk.count(b"G"), chunk.count(b"C")
+        out.append(((g + c) * 100 / window, (g - c) / (g + c) if g + c else None,
+                    chunk.count(b"CG") * window / (g * c) if g * c else None))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark composition profiles")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 10_000_000, 100_000_000])
+    parser.add_argument("--points", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'size':>10} {'case':<24} {'seconds':>10}")
+    for size in args.sizes:
+        seq = random_sequence(size, seed=5)
+        window = max(size // args.points, 1)
+        profile = composition.SequenceProfile(seq)
+        cases = [
+            ("naive tiled", lambda: naive(seq, window, window)),
+            ("build", lambda: composition.SequenceProfile(seq)),
+            ("query tiled", lambda: composition.sequence_profile(seq, points=args.points, profile=profile)),
+            ("query 5x overlap", lambda: composition.sequence_profile(
+                seq, window=window * 5, step=window, points=args.points, profile=profile)),
+            ("query tiled + 3-mers", lambda: composition.sequence_profile(
+                seq, points=args.points, k=3, profile=profile)),
+        ]
+        for name, func in cases:
+            print(f"{format_size(size):>10} {name:<24} {best_of(func, repeat=1):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# Benchmark: legacy per-character string functions vs. the byte-level core.
+#   python benchmarks/bench_seqcore.py                # 1 kbp, 1 Mbp, 100 Mbp
+#   python benchmarks/bench_seqcore.py --sizes 1000000
+
+import argparse
+
+from common import best_of, format_size, random_sequence
+
+import analyzer
+
+
+# --------------------------
+# --- Legacy implementations (pre-seqcore)
+# --------------------------
+def legacy_clean_sequence(seq):
+    return ''.join([base for base in seq.upper() if base in 'ATGC'])
+
+
+def legacy_gc_content(seq):
+    g = seq.count('G')
+    c = seq.count('C')
+    return round(((g + c) / len(seq)) * 100, 2)
+
+
+def legacy_reverse_complement(seq):
+    complement = {'A': 'T', 'T': 'A', 'G': 'C', 'C': 'G'}
+    return ''.join([complement[base] for base in reversed(seq)])
+
+
+def legacy_transcribe(seq):
+    return seq.replace('T', 'U')
+
+
+CASES = [
+    ("clean_sequence", legacy_clean_sequence, analyzer.clean_sequence, "raw"),
+    ("gc_content", legacy_gc_content, analyzer.gc_content, "clean"),
+    ("reverse_complement", legacy_reverse_complement, analyzer.reverse_complement, "clean"),
+    ("transcribe", legacy_transcribe, analyzer.transcribe, "clean"),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the sequence core")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 1_000_000, 100_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'function':<20} {'size':>10} {'legacy (s)':>12} {'core (s)':>12} {'speedup':>9}")
+    for size in args.sizes:
+        clean = random_sequence(size, seed=1)
+        # Lowercase, whitespace and ambiguity codes as a pasted input would have.
+        raw = random_sequence(size, seed=2, alphabet=b"ACGTacgtN \n")
+        repeat = 1 if size >= 10_000_000 else args.repeat
+        for name, legacy, core, kind in CASES:
+            seq = raw if kind == "raw" else clean
+            if legacy(seq) != core(seq):
+                raise SystemExit(f"{name}: results differ at {format_size(size)}")
+            old = best_of(legacy, seq, repeat=repeat)
+            new = best_of(core, seq, repeat=repeat)
+            print(f"{name:<20} {format_size(size):>10} {old:>12.5f} {new:>12.5f} {old / new:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# Benchmark: time to first result of the analyzer CLI, and import time of the API.
+#   python benchmarks/bench_startup.py                      # every local subcommand
+#   python benchmarks/bench_startup.py --commands gc revcomp --runs 20 --target 50
+# Each run is a fresh interpreter, so this is what a shell pipeline pays per
+# call. The bare interpreter (``python -c pass``) is timed too: it is the
+# floor no subcommand can go below. Also lists which heavy modules each
+# subcommand ended up importing.
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+from common import BACKEND_DIR
+
+SEQUENCE = "ATGGCTAGCAAAGGAGAAGAACTTTTCACTGGAGTTGTCCCAATTCTTGTTGAATTAGATGGTGATGTTAATGGGCACAAATTTTCTGTCTAA"
+COMMANDS = {
+    "clean": [],
+    "gc": [],
+    "revcomp": [],
+    "transcribe": [],
+    "primers": [],
+    "mutation": ["--mutation", "A>G at position 10"],
+    "translate": [],
+    "orfs": ["--both-strands"],
+    "profile": [],
+    "analyze": [],
+}
+HEAVY = ("numpy", "requests", "Bio", "fastapi")
+# Prints the heavy modules a subcommand imported (to stderr, after its output).
+_PROBE = (
+    "import sys, atexit, analyzer; "
+    f"atexit.register(lambda: print(','.join(m for m in {HEAVY!r} if m in sys.modules), file=sys.stderr)); "
+    "analyzer.main(sys.argv[1:])"
+)
+
+
+def best_run(argv, runs):
+    """Best wall-clock seconds of ``argv`` in a fresh process over ``runs`` runs."""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(argv, cwd=BACKEND_DIR, check=True, stdout=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def heavy_modules(command, extra):
+    result = subprocess.run([sys.executable, "-c", _PROBE, command, "-s", SEQUENCE, *extra],
+                            cwd=BACKEND_DIR, check=True, capture_output=True, text=True)
+    return result.stderr.strip().splitlines()[-1] if result.stderr.strip() else ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CLI startup to first result")
+    parser.add_argument("--commands", nargs="+", default=list(COMMANDS), choices=list(COMMANDS))
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--target", type=float, default=50.0, help="milliseconds to first result")
+    args = parser.parse_args()
+
+    interpreter = best_run([sys.executable, "-c", "pass"], args.runs) * 1000
+    print(f"{'case':<12} {'ms':>8} {'over python':>12} {'target':>7}  heavy imports")
+    print(f"{'python':<12} {interpreter:>8.1f} {0:>12.1f} {'':>7}")
+    for command in args.commands:
+        extra = COMMANDS[command]
+        ms = best_run([sys.executable, "analyzer.py", command, "-s", SEQUENCE, *extra], args.runs) * 1000
+        verdict = "ok" if ms <= args.target else "over"
+        print(f"{command:<12} {ms:>8.1f} {ms - interpreter:>12.1f} {verdict:>7}  "
+              f"{heavy_modules(command, extra) or '-'}")
+
+    env = {**os.environ, "DNA_WORKERS": "0"}
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import api"], cwd=BACKEND_DIR, check=True, env=env)
+    print(f"{'import api':<12} {(time.perf_counter() - start) * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
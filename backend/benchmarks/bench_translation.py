@@ -0,0 +1,59 @@
+# Benchmark: legacy dict-per-call translation vs. the precompiled engine.
+#   python benchmarks/bench_translation.py --sizes 1000 1000000
+
+import argparse
+
+from common import best_of, format_size, random_sequence
+
+import analyzer
+
+STOP_FREE = b"ACGC"  # no T, so no stop codons and translation runs to the end
+
+
+def legacy_translate_dna(seq):
+    codon_table = {
+        'ATA':'I', 'ATC':'I', 'ATT':'I', 'ATG':'M',
+        'ACA':'T', 'ACC':'T', 'ACG':'T', 'ACT':'T',
+        'AAC':'N', 'AAT':'N', 'AAA':'K', 'AAG':'K',
+        'AGC':'S', 'AGT':'S', 'AGA':'R', 'AGG':'R',
+        'CTA':'L', 'CTC':'L', 'CTG':'L', 'CTT':'L',
+        'CCA':'P', 'CCC':'P', 'CCG':'P', 'CCT':'P',
+        'CAC':'H', 'CAT':'H', 'CAA':'Q', 'CAG':'Q',
+        'CGA':'R', 'CGC':'R', 'CGG':'R', 'CGT':'R',
+        'GTA':'V', 'GTC':'V', 'GTG':'V', 'GTT':'V',
+        'GCA':'A', 'GCC':'A', 'GCG':'A', 'GCT':'A',
+        'GAC':'D', 'GAT':'D', 'GAA':'E', 'GAG':'E',
+        'GGA':'G', 'GGC':'G', 'GGG':'G', 'GGT':'G',
+        'TCA':'S', 'TCC':'S', 'TCG':'S', 'TCT':'S',
+        'TTC':'F', 'TTT':'F', 'TTA':'L', 'TTG':'L',
+        'TAC':'Y', 'TAT':'Y', 'TAA':'_', 'TAG':'_', 'TGA':'_'
+    }
+
+    protein = ""
+    for i in range(0, len(seq) - 2, 3):
+        codon = seq[i:i+3]
+        amino_acid = codon_table.get(codon, '?')
+        if amino_acid == '_':
+            break
+        protein += amino_acid
+    return protein
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the translation engine")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 1_000_000, 10_000_000])
+    args = parser.parse_args()
+
+    print(f"{'size':>10} {'legacy (s)':>12} {'engine (s)':>12} {'speedup':>9} {'6 frames (s)':>13}")
+    for size in args.sizes:
+        seq = random_sequence(size, seed=3, alphabet=STOP_FREE)
+        if legacy_translate_dna(seq) != analyzer.translate_dna(seq):
+            raise SystemExit(f"translations differ at {format_size(size)}")
+        old = best_of(legacy_translate_dna, seq)
+        new = best_of(analyzer.translate_dna, seq)
+        six = best_of(analyzer.translate_six_frames, seq)
+        print(f"{format_size(size):>10} {old:>12.5f} {new:>12.5f} {old / new:>8.1f}x {six:>13.5f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# Shared helpers for the benchmark scripts in this folder.
+# Run any benchmark from the backend directory, e.g.:
+#   python benchmarks/bench_seqcore.py --sizes 1000 1000000
+
+import os
+import sys
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+def random_sequence(length, seed=0, alphabet=b"ACGT"):
+    """Deterministic random DNA of ``length`` bases as a str."""
+    rng = np.random.default_rng(seed)
+    letters = np.frombuffer(alphabet, dtype=np.uint8)
+    return rng.choice(letters, size=length).tobytes().decode("ascii")
+
+
+def atg_dense_sequence(length, run=99):
+    """Worst case for nested ORFs: ``run`` in-frame ATGs before every TAA."""
+    unit = "ATG" * run + "TAA"
+    return (unit * (length // len(unit) + 1))[:length]
+
+
+def stop_free_sequence(length):
+    """ATGC repeats: an ATG in every frame of both strands and no stop codon."""
+    return ("ATGC" * (length // 4 + 1))[:length]
+
+
+def best_of(func, *args, repeat=3):
+    """Best wall-clock time in seconds over ``repeat`` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def format_size(n):
+    for unit, scale in (("Gbp", 10**9), ("Mbp", 10**6), ("kbp", 10**3)):
+        if n >= scale:
+            return f"{n / scale:g} {unit}"
+    return f"{n} bp"
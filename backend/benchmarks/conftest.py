@@ -0,0 +1,105 @@
+# pytest-benchmark suite for the analyzer functions and the API endpoints.
+# Run from the backend directory (needs pytest and pytest-benchmark):
+#   python -m pytest benchmarks                            # inputs up to 1 Mbp
+#   python -m pytest benchmarks --max-size 100000000       # up to 100 Mbp
+#   python -m pytest benchmarks --benchmark-autosave       # store a JSON baseline
+#   python -m pytest benchmarks --benchmark-compare        # fail on slowdowns
+# Baselines live in benchmarks/baselines/<machine>/. With --benchmark-compare,
+# a benchmark fails when it regresses past ``benchmark_regression`` in
+# pytest.ini (override with --benchmark-compare-fail). Timings only compare
+# on the same hardware, so no baseline is committed: autosave one on the
+# machine that runs the gate first. --benchmark-compare without a baseline
+# is a usage error before anything runs, not a silently passing gate.
+# Peak traced memory (tracemalloc, which also sees NumPy buffers) of one
+# extra call is saved in each result's extra_info and listed after the run.
+
+import functools
+import os
+import tracemalloc
+
+import pytest
+from pytest_benchmark.utils import parse_compare_fail
+
+from common import atg_dense_sequence, format_size, random_sequence, stop_free_sequence
+
+SIZES = (100, 10_000, 1_000_000, 10_000_000, 100_000_000)
+WORKLOADS = {
+    "random": lambda length: random_sequence(length, seed=17),
+    "atg_dense": atg_dense_sequence,
+    "stop_free": stop_free_sequence,
+}
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+_peaks = {}
+
+
+def pytest_addoption(parser):
+    parser.addoption("--max-size", type=int, default=1_000_000,
+                     help="largest input size in bp (default: 1 Mbp; sizes go up to 100 Mbp)")
+    parser.addini("benchmark_regression", "default --benchmark-compare-fail expressions",
+                  type="args", default=[])
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    # Runs before pytest-benchmark reads its options.
+    if config.getoption("benchmark_storage") == "file://./.benchmarks":
+        config.option.benchmark_storage = "file://" + BASELINE_DIR
+    if config.getoption("benchmark_compare") and not config.getoption("benchmark_compare_fail"):
+        config.option.benchmark_compare_fail = [
+            parse_compare_fail(expr) for expr in config.getini("benchmark_regression")]
+
+
+def pytest_sessionstart(session):
+    # pytest-benchmark only warns when there is nothing to compare against.
+    compare = session.config.getoption("benchmark_compare")
+    if compare and not session.config._benchmarksession.compared_mapping:
+        raise pytest.UsageError(
+            f"--benchmark-compare: no baseline{'' if compare is True else ' matching ' + repr(compare)} "
+            f"in {BASELINE_DIR}; record one with --benchmark-autosave first.")
+
+
+def pytest_generate_tests(metafunc):
+    if "size" in metafunc.fixturenames:
+        marker = metafunc.definition.get_closest_marker("max_size")
+        limit = min(metafunc.config.getoption("--max-size"), marker.args[0] if marker else SIZES[-1])
+        sizes = [size for size in SIZES if size <= limit]
+        metafunc.parametrize("size", sizes, ids=[format_size(size).replace(" ", "") for size in sizes])
+    if "workload" in metafunc.fixturenames:
+        marker = metafunc.definition.get_closest_marker("workloads")
+        metafunc.parametrize("workload", marker.args if marker else ("random",))
+
+
+@functools.lru_cache(maxsize=2)
+def make_sequence(workload, size):
+    return WORKLOADS[workload](size)
+
+
+@pytest.fixture
+def sequence(workload, size):
+    return make_sequence(workload, size)
+
+
+@pytest.fixture
+def measure(request, benchmark):
+    """``measure(func, *args)``: benchmark the call and record its memory peak."""
+    def run(func, *args, **kwargs):
+        tracemalloc.start()
+        try:
+            func(*args, **kwargs)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        benchmark.extra_info["peak_memory_bytes"] = peak
+        _peaks[request.node.nodeid] = peak
+        return benchmark(func, *args, **kwargs)
+    return run
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not _peaks:
+        return
+    terminalreporter.section("peak memory (tracemalloc)")
+    width = max(len(name) for name in _peaks)
+    for name, peak in sorted(_peaks.items()):
+        terminalreporter.write_line(f"{name:<{width}}  {peak / 2 ** 20:>10.2f} MiB")
@@ -0,0 +1,94 @@
+# Benchmarks for the public analyzer functions (see conftest.py for options).
+# blast_primer and search_literature_by_sequence call NCBI and are left out.
+
+import itertools
+
+import pytest
+
+import analyzer
+
+
+def _raw_input(seq):
+    # What users paste: lower case, wrapped at 60 columns, stray digits.
+    lines = (seq[i:i + 60].lower() for i in range(0, len(seq), 60))
+    return "\n".join(f"{i * 60 + 1:>9} {line}" for i, line in enumerate(lines))
+
+
+# --------------------------
+# --- Per-base transforms
+# --------------------------
+@pytest.mark.max_size(10_000_000)
+def bench_clean_sequence(measure, sequence):
+    measure(analyzer.clean_sequence, _raw_input(sequence))
+
+
+def bench_gc_content(measure, sequence):
+    measure(analyzer.gc_content, sequence)
+
+
+def bench_reverse_complement(measure, sequence):
+    measure(analyzer.reverse_complement, sequence)
+
+
+def bench_transcribe(measure, sequence):
+    measure(analyzer.transcribe, sequence)
+
+
+@pytest.mark.workloads("random", "stop_free")
+def bench_translate_dna(measure, sequence):
+    measure(analyzer.translate_dna, sequence)
+
+
+@pytest.mark.workloads("random", "stop_free")
+def bench_translate_six_frames(measure, sequence):
+    measure(analyzer.translate_six_frames, sequence)
+
+
+def bench_sequence_profile(measure, sequence):
+    measure(analyzer.sequence_profile, sequence, k=3)
+
+
+# --------------------------
+# --- Primers and mutations
+# --------------------------
+def bench_get_primers(measure, sequence):
+    measure(analyzer.get_primers, sequence)
+
+
+def bench_primer_stats(measure):
+    measure(analyzer.primer_stats, "AGCGTACCGATGCTAGCTAG")
+
+
+def bench_scan_for_mutation(measure, sequence):
+    position = len(sequence) // 2
+    base = sequence[position]
+    mutation = f"{base}>{'A' if base != 'A' else 'G'} at position {position + 1}"
+    measure(analyzer.scan_for_mutation, sequence, sequence[:20], sequence[-20:], mutation)
+
+
+# --------------------------
+# --- Display
+# --------------------------
+@pytest.mark.max_size(10_000_000)
+def bench_display_sequence_with_positions(measure, sequence):
+    measure(analyzer.display_sequence_with_positions, sequence)
+
+
+def bench_iter_display_chunks_page(measure, sequence):
+    middle = len(sequence) // 20
+    measure(lambda: list(analyzer.iter_display_chunks(sequence, 10, middle, middle + 100)))
+
+
+# --------------------------
+# --- ORFs
+# --------------------------
+@pytest.mark.max_size(10_000_000)
+@pytest.mark.workloads("random", "atg_dense", "stop_free")
+@pytest.mark.parametrize("mode", ["nested", "longest"])
+def bench_find_orfs_with_translation(measure, sequence, mode):
+    measure(analyzer.find_orfs_with_translation, sequence, mode=mode, both_strands=True)
+
+
+@pytest.mark.workloads("random", "atg_dense", "stop_free")
+def bench_iter_orfs_first_page(measure, sequence):
+    measure(lambda: list(itertools.islice(analyzer.iter_orfs(sequence, both_strands=True), 100)))
@@ -0,0 +1,82 @@
+# Benchmarks for the API endpoints through the in-process test client.
+# Tasks run inline (DNA_WORKERS=0) and the result cache is disabled, so each
+# round measures validation, analysis and JSON encoding, not a cache hit.
+
+import os
+
+os.environ["DNA_WORKERS"] = "0"
+os.environ["CACHE_MAX_BYTES"] = "0"
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(api.app) as client:
+        yield client
+
+
+def _get(client, path, **params):
+    response = client.get(path, params=params)
+    assert response.status_code == 200, response.text
+    return response
+
+
+def _post(client, path, body):
+    response = client.post(path, json=body)
+    assert response.status_code == 200, response.text
+    return response
+
+
+# --------------------------
+# --- GET endpoints
+# --------------------------
+ENDPOINTS = {
+    "analyze": ("/analyze", {}),
+    "analyze_fields": ("/analyze", {"fields": "length,gc_content,forward_primer,reverse_primer"}),
+    "analyze_display": ("/analyze/display", {"limit": 100}),
+    "orfs": ("/orfs", {"both_strands": True}),
+    "orfs_page": ("/orfs", {"both_strands": True, "limit": 100}),
+    "translate": ("/translate", {}),
+    "profile": ("/profile", {"k": 2}),
+    "primers": ("/primers", {}),
+    "kmers": ("/kmers", {"k": 8}),
+    "motifs": ("/motifs", {"motifs": "GAATTC,TATAAT,CANNTG"}),
+    "repeats": ("/repeats", {}),
+    "restriction": ("/restriction", {}),
+}
+
+
+# The sequence travels in the query string, which httpx caps at 64 kB.
+@pytest.mark.max_size(10_000)
+@pytest.mark.workloads("random", "atg_dense")
+@pytest.mark.parametrize("endpoint", list(ENDPOINTS))
+def bench_get(measure, client, sequence, endpoint):
+    path, params = ENDPOINTS[endpoint]
+    measure(_get, client, path, sequence=sequence, **params)
+
+
+# --------------------------
+# --- POST endpoints
+# --------------------------
+@pytest.mark.max_size(1_000_000)
+def bench_mutation(measure, client, sequence):
+    base = sequence[len(sequence) // 2]
+    body = {
+        "sequence": sequence,
+        "forward_primer": sequence[:20],
+        "reverse_primer": sequence[-20:],
+        "mutation": f"{base}>{'A' if base != 'A' else 'G'} at position {len(sequence) // 2 + 1}",
+    }
+    measure(_post, client, "/mutation", body)
+
+
+@pytest.mark.max_size(1_000_000)
+def bench_mutations_batch(measure, client, sequence):
+    step = max(len(sequence) // 1000, 1)
+    variants = [f"{i + 1}:{sequence[i]}>{'A' if sequence[i] != 'A' else 'G'}"
+                for i in range(0, len(sequence), step)]
+    measure(_post, client, "/mutations/batch", {"sequence": sequence, "variants": variants})
@@ -0,0 +1,274 @@
+# BLAST Jobs
+# Submits primers to NCBI BLAST and polls their RIDs in background tasks,
+# so callers get a job back at once whatever the BLAST rate limit, and
+# keeps finished hit tables in a persistent SQLite cache keyed by
+# (sequence, program, database), so a repeat primer never starts a new
+# remote search. The cache's SQLite connection lives on its own thread.
+#
+# Configured from the environment:
+#   BLAST_CACHE_PATH   SQLite file for finished results (default: blast_cache.sqlite in the
+#                      data directory, see datadir.py)
+#   BLAST_CACHE_TTL    seconds a cached result is reused (default 7 days)
+#   NCBI_BLAST_POLL    seconds between status polls of one RID (default 60, NCBI's minimum)
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from datadir import data_path
+from ncbi import NCBIClient, NCBIError
+
+# NCBI asks for a wait of at least this long before the first poll.
+MIN_FIRST_POLL = 10
+
+
+def job_key(sequence, program="blastn", database="nt"):
+    raw = f"{sequence.upper()}|{program}|{database}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# --------------------------
+# --- Result Parsing
+# --------------------------
+def parse_hits(report_json, max_hits=50):
+    """Flatten a JSON2_S BLAST report into one dict per hit (best HSP)."""
+    hits = []
+    for output in report_json.get("BlastOutput2", []):
+        search = output.get("report", {}).get("results", {}).get("search", {})
+        for hit in search.get("hits", [])[:max_hits]:
+            description = (hit.get("description") or [{}])[0]
+            hsps = hit.get("hsps") or [{}]
+            best = max(hsps, key=lambda hsp: hsp.get("bit_score", 0))
+            hits.append({
+                "accession": description.get("accession"),
+                "title": description.get("title"),
+                "organism": description.get("sciname"),
+                "length": hit.get("len"),
+                "evalue": best.get("evalue"),
+                "bit_score": best.get("bit_score"),
+                "identity": best.get("identity"),
+                "align_len": best.get("align_len"),
+                "query_from": best.get("query_from"),
+                "query_to": best.get("query_to"),
+                "hit_from": best.get("hit_from"),
+                "hit_to": best.get("hit_to"),
+                "hit_strand": best.get("hit_strand"),
+            })
+    return hits
+
+
+# --------------------------
+# --- Result Cache
+# --------------------------
+class BlastCache:
+    """Finished BLAST results in SQLite, looked up by job key or RID.
+
+    One thread owns the connection; ``get``, ``get_by_rid``, ``put`` and
+    ``close`` return awaitables, so lookups never block the event loop.
+    """
+
+    def __init__(self, path, ttl=None):
+        self.path = str(path)
+        self.ttl = ttl
+        self._db = None
+        self._disk = ThreadPoolExecutor(max_workers=1, thread_name_prefix="blast-cache")
+        self._disk.submit(self._open)  # runs before any query queued after it
+
+    def _on_disk(self, func, *args):
+        return asyncio.get_running_loop().run_in_executor(self._disk, func, *args)
+
+    # _open and the _db_ methods run on the cache's thread.
+    def _open(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS blast_results ("
+            " key TEXT PRIMARY KEY, rid TEXT, sequence TEXT, program TEXT,"
+            " database TEXT, hits TEXT, finished REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS blast_results_rid ON blast_results (rid)")
+        self._db.commit()
+
+    def _row(self, row):
+        if row is None:
+            return None
+        key, rid, sequence, program, database, hits, finished = row
+        if self.ttl and time.time() - finished > self.ttl:
+            return None
+        return {"key": key, "rid": rid, "sequence": sequence, "program": program,
+                "database": database, "hits": json.loads(hits), "finished": finished}
+
+    def _db_get(self, column, value):
+        return self._row(self._db.execute(
+            f"SELECT * FROM blast_results WHERE {column} = ?", (value,)).fetchone())
+
+    def _db_put(self, key, rid, sequence, program, database, hits):
+        self._db.execute(
+            "INSERT OR REPLACE INTO blast_results VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, rid, sequence, program, database, json.dumps(hits), time.time()))
+        self._db.commit()
+
+    def get(self, key):
+        return self._on_disk(self._db_get, "key", key)
+
+    def get_by_rid(self, rid):
+        return self._on_disk(self._db_get, "rid", rid)
+
+    def put(self, key, rid, sequence, program, database, hits):
+        return self._on_disk(self._db_put, key, rid, sequence, program, database, hits)
+
+    async def close(self):
+        if self._db is not None:
+            await self._on_disk(self._db.close)
+        self._disk.shutdown()
+
+
+# --------------------------
+# --- Job Manager
+# --------------------------
+class BlastJobManager:
+    """Tracks BLAST searches from submission to cached result.
+
+    Job dicts have ``id`` (the job key), ``rid`` (None until NCBI accepts
+    the search), ``status`` ('submitting', 'waiting', 'ready' or 'failed'),
+    ``sequence``, ``program``, ``database``, ``cached`` and, once ready,
+    ``hits``. Submitting returns at once: the Put call waits its turn on the
+    client's BLAST rate limit in a background task, which then polls the RID.
+    Failed jobs are kept ``failed_ttl`` seconds so pollers can see why.
+    """
+
+    def __init__(self, client, cache, poll_interval=60.0, failed_ttl=600.0):
+        self.client = client
+        self.cache = cache
+        self.poll_interval = poll_interval
+        self.failed_ttl = failed_ttl
+        self._jobs = {}       # key -> job still running, or failed recently
+        self._rids = {}       # rid -> job
+        self._tasks = set()
+
+    @classmethod
+    def from_env(cls, client):
+        cache = BlastCache(os.environ.get("BLAST_CACHE_PATH") or data_path("blast_cache.sqlite"),
+                           ttl=float(os.environ.get("BLAST_CACHE_TTL", 7 * 24 * 3600)))
+        return cls(client, cache, poll_interval=float(os.environ.get("NCBI_BLAST_POLL", 60)))
+
+    def _cached_job(self, cached):
+        return {
+            "id": cached["key"],
+            "rid": cached["rid"],
+            "status": "ready",
+            "result_url": f"{self.client.blast_url}?CMD=Get&RID={cached['rid']}",
+            "sequence": cached["sequence"],
+            "program": cached["program"],
+            "database": cached["database"],
+            "cached": True,
+            "hits": cached["hits"],
+        }
+
+    async def submit(self, sequence, program="blastn", database="nt"):
+        """Start (or reuse) a search for one sequence and return its job."""
+        sequence = sequence.upper()
+        key = job_key(sequence, program, database)
+        job = self._jobs.get(key)
+        if job is not None and job["status"] != "failed":
+            return job
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return self._cached_job(cached)
+        job = self._jobs.get(key)
+        if job is not None and job["status"] != "failed":
+            return job  # submitted while the cache was checked
+
+        job = {
+            "id": key,
+            "rid": None,
+            "status": "submitting",
+            "sequence": sequence,
+            "program": program,
+            "database": database,
+            "cached": False,
+            "result_url": None,
+            "submitted": None,
+        }
+        self._jobs[key] = job
+        task = asyncio.ensure_future(self._run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def submit_many(self, sequences, program="blastn", database="nt"):
+        """Submit several sequences; results keep input order."""
+        return [await self.submit(seq, program, database) for seq in sequences]
+
+    async def _run(self, job):
+        try:
+            submitted = await self.client.blast_submit(job["sequence"], job["program"], job["database"])
+            if submitted["status"] != "success":
+                self._fail(job, submitted["message"])
+                return
+            job.update(rid=submitted["rid"], status="waiting", result_url=submitted["result_url"],
+                       submitted=time.time())
+            self._rids[job["rid"]] = job
+            await asyncio.sleep(max(submitted.get("rtoe", 0), min(MIN_FIRST_POLL, self.poll_interval)))
+            while True:
+                status = await self.client.blast_status(job["rid"])
+                if status == "READY":
+                    hits = parse_hits(await self.client.blast_results(job["rid"]))
+                    await self.cache.put(job["id"], job["rid"], job["sequence"], job["program"],
+                                         job["database"], hits)
+                    job.update(status="ready", hits=hits)
+                    # The cache answers for this job from now on.
+                    self._forget(job)
+                    return
+                if status in ("FAILED", "UNKNOWN"):
+                    self._fail(job, f"BLAST search {status.lower()}.")
+                    return
+                await asyncio.sleep(self.poll_interval)
+        except NCBIError as e:
+            self._fail(job, str(e))
+        except Exception as e:
+            # Anything else (an unexpected report shape, an unwrapped transport
+            # error) must fail the job too, or it would stay 'waiting' for good
+            # and be handed back to every resubmission.
+            self._fail(job, f"BLAST search failed: {e!r}")
+
+    def _fail(self, job, message):
+        job.update(status="failed", message=message, expires=time.time() + self.failed_ttl)
+        asyncio.get_running_loop().call_later(self.failed_ttl, self._forget, job)
+
+    def _forget(self, job):
+        # A newer job for the same key (a retry after a failure) is left alone.
+        if self._jobs.get(job["id"]) is job:
+            del self._jobs[job["id"]]
+        if self._rids.get(job["rid"]) is job:
+            del self._rids[job["rid"]]
+
+    async def get(self, job_id):
+        """Job for a job ID or RID, from memory or the persistent cache; None if unknown."""
+        job = self._jobs.get(job_id) or self._rids.get(job_id)
+        if job is not None:
+            return job
+        cached = await self.cache.get(job_id) or await self.cache.get_by_rid(job_id)
+        return self._cached_job(cached) if cached else None
+
+    async def aclose(self):
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self.cache.close()
+
+
+# --------------------------
+# --- CLI Helper
+# --------------------------
+async def submit_primers(primers):
+    """Submit several primers concurrently with a throwaway client (no polling)."""
+    client = NCBIClient.from_env()
+    try:
+        return await asyncio.gather(*(client.blast_submit(primer) for primer in primers))
+    finally:
+        await client.aclose()
@@ -0,0 +1,245 @@
+# Result Cache
+# Content-addressed cache for endpoint results.
+# Keys are a SHA-256 of the namespace, the cleaned sequence (the API passes
+# its content ID, see sessions.py) and the request parameters, so the same
+# construct pasted with different whitespace or case hits the same entry.
+# - Memory tier: LRU over serialized JSON, bounded by total bytes
+# - Disk tier (optional): SQLite, survives restarts. One thread owns the
+#   connection, so lookups never block the event loop; writes are queued
+#   and flushed in batches, and a periodic sweep drops expired rows and
+#   the oldest ones beyond the disk budget
+# - Per-namespace TTLs and hit/miss/eviction counters
+#
+# Configured from the environment:
+#   CACHE_MAX_BYTES         memory tier budget (default 256 MB)
+#   CACHE_DB_PATH           SQLite file for the disk tier (unset: memory only)
+#   CACHE_DB_MAX_BYTES      disk tier budget (default 1 GB)
+#   CACHE_SWEEP_INTERVAL    seconds between disk sweeps (default 10 minutes)
+#   CACHE_TTL_LITERATURE    seconds PubMed results stay fresh (default 1 day)
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Seconds between flushes of queued disk writes.
+FLUSH_INTERVAL = 1.0
+
+
+def cache_key(namespace, sequence, **params):
+    """Hex digest identifying ``namespace`` applied to ``sequence`` with ``params``."""
+    digest = hashlib.sha256()
+    digest.update(namespace.encode("utf-8") + b"\0")
+    digest.update(sequence.encode("ascii") if isinstance(sequence, str) else sequence)
+    digest.update(b"\0" + json.dumps(params, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class CacheEntry:
+    __slots__ = ("body", "etag", "expires")
+
+    def __init__(self, body, etag, expires):
+        self.body = body
+        self.etag = etag
+        self.expires = expires
+
+    def fresh(self, now):
+        return self.expires is None or now < self.expires
+
+
+class ResultCache:
+    def __init__(self, max_bytes=256 * 1024 * 1024, db_path=None, ttls=None,
+                 db_max_bytes=1024 * 1024 * 1024, sweep_interval=600.0):
+        self.max_bytes = max_bytes
+        self.ttls = ttls or {}
+        self.db_path = db_path
+        self.db_max_bytes = db_max_bytes
+        self.sweep_interval = sweep_interval
+        self.size = 0
+        self.disk_size = 0
+        self.stats = Counter()
+        self._entries = OrderedDict()
+        self._db = None
+        self._disk = None     # single thread that owns the SQLite connection
+        self._writes = {}     # key -> row queued for the next flush
+        self._maintainer = None
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_bytes=int(os.environ.get("CACHE_MAX_BYTES", 256 * 1024 * 1024)),
+            db_path=os.environ.get("CACHE_DB_PATH") or None,
+            ttls={"literature": float(os.environ.get("CACHE_TTL_LITERATURE", 24 * 3600))},
+            db_max_bytes=int(os.environ.get("CACHE_DB_MAX_BYTES", 1024 * 1024 * 1024)),
+            sweep_interval=float(os.environ.get("CACHE_SWEEP_INTERVAL", 600)),
+        )
+
+    def start(self):
+        """Open the disk tier (if any) and start flushing and sweeping it."""
+        if not self.db_path or self._disk is not None:
+            return
+        self._disk = ThreadPoolExecutor(max_workers=1, thread_name_prefix="result-cache")
+        self._disk.submit(self._open).result()
+        self._maintainer = asyncio.ensure_future(self._maintain())
+
+    async def aclose(self):
+        if self._disk is None:
+            return
+        self._maintainer.cancel()
+        await asyncio.gather(self._maintainer, return_exceptions=True)
+        await self._flush()
+        await self._on_disk(self._close)
+        self._disk.shutdown()
+        self._disk = None
+
+    # --------------------------
+    # --- Memory Tier
+    # --------------------------
+    def _remember(self, key, entry):
+        if key in self._entries:
+            self.size -= len(self._entries.pop(key).body)
+        if len(entry.body) > self.max_bytes:
+            return
+        self._entries[key] = entry
+        self.size += len(entry.body)
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted.body)
+            self.stats["evictions"] += 1
+
+    def _forget(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry.body)
+
+    # --------------------------
+    # --- Disk Tier
+    # --------------------------
+    # _open, _close and the _db_ methods run on the disk thread.
+    def _open(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self._db = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(results)")]
+        if columns and "size" not in columns:
+            # A cache file from before the disk budget; its rows are disposable.
+            self._db.execute("DROP TABLE results")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY, namespace TEXT, body BLOB, etag TEXT, expires REAL,"
+            " size INTEGER, stored REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_stored ON results (stored)")
+        self._db.commit()
+        self._db_sweep()
+
+    def _close(self):
+        self._db.close()
+        self._db = None
+
+    async def _on_disk(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._disk, func, *args)
+
+    def _db_get(self, key):
+        return self._db.execute("SELECT body, etag, expires FROM results WHERE key = ?", (key,)).fetchone()
+
+    def _db_write(self, rows):
+        replaced = 0
+        for start in range(0, len(rows), 500):
+            keys = [row[0] for row in rows[start:start + 500]]
+            replaced += self._db.execute(
+                f"SELECT COALESCE(SUM(size), 0) FROM results WHERE key IN ({','.join('?' * len(keys))})",
+                keys).fetchone()[0]
+        self._db.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        self._db.commit()
+        self.disk_size += sum(row[5] for row in rows) - replaced
+        if self.disk_size > self.db_max_bytes:
+            self._db_evict()
+
+    def _db_evict(self):
+        # Oldest writes go first, until the budget is met again.
+        evicted = []
+        for key, size in self._db.execute("SELECT key, size FROM results ORDER BY stored"):
+            if self.disk_size <= self.db_max_bytes:
+                break
+            evicted.append((key,))
+            self.disk_size -= size
+        self._db.executemany("DELETE FROM results WHERE key = ?", evicted)
+        self._db.commit()
+        self.stats["disk_evictions"] += len(evicted)
+
+    def _db_sweep(self):
+        expired = self._db.execute(
+            "DELETE FROM results WHERE expires IS NOT NULL AND expires <= ?", (time.time(),)).rowcount
+        self._db.commit()
+        self.stats["disk_expired"] += max(expired, 0)
+        self.disk_size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        self._db_evict()
+
+    async def _flush(self):
+        if not self._writes:
+            return
+        rows, self._writes = list(self._writes.values()), {}
+        await self._on_disk(self._db_write, rows)
+
+    async def _maintain(self):
+        last_sweep = time.monotonic()
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            await self._flush()
+            if time.monotonic() - last_sweep >= self.sweep_interval:
+                last_sweep = time.monotonic()
+                await self._on_disk(self._db_sweep)
+
+    # --------------------------
+    # --- Lookup / Store
+    # --------------------------
+    async def get(self, namespace, key):
+        """Return the fresh CacheEntry for ``key`` or None, counting hit/miss."""
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.fresh(now):
+                self._entries.move_to_end(key)
+                self.stats[f"{namespace}_hits_memory"] += 1
+                return entry
+            self._forget(key)
+
+        if self._disk is not None:
+            queued = self._writes.get(key)
+            row = queued[2:5] if queued is not None else await self._on_disk(self._db_get, key)
+            entry = CacheEntry(*row) if row is not None else None
+            # Expired rows are left for the next sweep.
+            if entry is not None and entry.fresh(now):
+                self._remember(key, entry)
+                self.stats[f"{namespace}_hits_disk"] += 1
+                return entry
+
+        self.stats[f"{namespace}_misses"] += 1
+        return None
+
+    def put(self, namespace, key, value):
+        """Serialize ``value`` to JSON, store it in memory, queue it for disk and return the entry."""
+        body = json.dumps(value, default=str).encode("utf-8")
+        etag = hashlib.sha256(body).hexdigest()[:32]
+        ttl = self.ttls.get(namespace)
+        entry = CacheEntry(body, etag, time.time() + ttl if ttl else None)
+        self._remember(key, entry)
+        if self._disk is not None and len(body) <= self.db_max_bytes:
+            self._writes[key] = (key, namespace, body, etag, entry.expires, len(body), time.time())
+        return entry
+
+    def summary(self):
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "disk": self._disk is not None,
+            "disk_bytes": self.disk_size,
+            "disk_max_bytes": self.db_max_bytes,
+            "disk_writes_queued": len(self._writes),
+            **self.stats,
+        }
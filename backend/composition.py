@@ -0,0 +1,175 @@
+# Sequence Profiles
+# Sliding-window composition tracks: GC%, GC skew, CpG observed/expected
+# and k-mer frequencies.
+# Counts are kept as prefix sums so any window is two lookups. To keep the
+# arrays small for 100 Mbp inputs each track is split in two:
+#   block[i]   cumulative count before block i (int64, one per BLOCK bases)
+#   intra[p]   count from the start of p's block up to p (uint8)
+# prefix(p) = block[p // BLOCK] + intra[p], about one byte per base per track.
+# k-mer frequencies come from a per-k code array, built once and bincounted
+# per window.
+
+from collections import OrderedDict
+
+import numpy as np
+
+import seqcore
+
+BLOCK = 256  # intra-block counts stay below 256, so they fit in uint8
+TRACKS = ("gc", "gc_skew", "cpg_oe")
+MAX_K = 4
+
+
+class PrefixCounts:
+    """Prefix sums of a boolean indicator array, ~1 byte per position."""
+
+    def __init__(self, indicator):
+        n = len(indicator)
+        padded = np.zeros((n // BLOCK + 1) * BLOCK, dtype=np.uint8)
+        padded[:n] = indicator
+        blocks = padded.reshape(-1, BLOCK)
+        # Exclusive cumsum within each block; uint8 wraps mod 256 but the
+        # exclusive count never exceeds 255.
+        self.intra = (np.cumsum(blocks, axis=1, dtype=np.uint8) - blocks).reshape(-1)
+        self.block = np.concatenate(([0], np.cumsum(blocks.sum(axis=1, dtype=np.int64))))
+
+    def at(self, positions):
+        """Count of set positions before each 0-based position (0..n)."""
+        return self.block[positions // BLOCK] + self.intra[positions]
+
+    def between(self, starts, ends):
+        return self.at(ends) - self.at(starts)
+
+
+class SequenceProfile:
+    """Prefix-count tracks for one sequence, built once and queried per window."""
+
+    def __init__(self, seq):
+        arr = seqcore.as_array(seqcore.to_bytes(seq).upper())
+        self.length = len(arr)
+        self._codes = seqcore.encode_2bit(arr.tobytes())
+        self.valid = PrefixCounts(self._codes < 4)
+        self.g = PrefixCounts(arr == ord("G"))
+        self.c = PrefixCounts(arr == ord("C"))
+        # A CpG at p covers p and p + 1; counted at p.
+        cpg = np.zeros(self.length, dtype=bool)
+        cpg[:-1] = (arr[:-1] == ord("C")) & (arr[1:] == ord("G"))
+        self.cpg = PrefixCounts(cpg)
+        self._kmers = {}
+
+    def windows(self, window=None, step=None, points=1000):
+        """0-based window starts and ends, stepping far enough to give <= ``points`` windows."""
+        n = self.length
+        if window is None:
+            window = max(-(-n // points), 1)
+        window = min(window, n)
+        step = step or window
+        count = (n - window) // step + 1
+        if count > points:
+            step = -(-(n - window + 1) // points)
+            count = (n - window) // step + 1
+        starts = np.arange(count, dtype=np.int64) * step
+        return starts, starts + window, window, step
+
+    def tracks(self, starts, ends, names=TRACKS):
+        valid = self.valid.between(starts, ends).astype(np.float64)
+        g = self.g.between(starts, ends).astype(np.float64)
+        c = self.c.between(starts, ends).astype(np.float64)
+        result = {}
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if "gc" in names:
+                result["gc"] = (g + c) * 100.0 / valid
+            if "gc_skew" in names:
+                result["gc_skew"] = (g - c) / (g + c)
+            if "cpg_oe" in names:
+                # CpG o/e (Gardiner-Garden & Frommer): CpG * N / (C * G).
+                cpg = self.cpg.between(starts, np.maximum(ends - 1, starts)).astype(np.float64)
+                result["cpg_oe"] = cpg * valid / (c * g)
+        return result
+
+    def _kmer_index(self, k):
+        """k-mer code at every start (4**k marks k-mers with non-ACGT bases), built once per k."""
+        if k not in self._kmers:
+            n = self.length
+            index = np.zeros(n - k + 1, dtype=np.uint16)
+            bad = np.zeros(n - k + 1, dtype=bool)
+            for j in range(k):
+                part = self._codes[j:n - k + 1 + j]
+                index = index * 4 + (part & 3)
+                bad |= part > 3
+            index[bad] = 4 ** k
+            self._kmers[k] = index
+        return self._kmers[k]
+
+    def kmer_frequencies(self, starts, ends, k):
+        """(kmers, frequencies) with one row per window.
+
+        k-mers are counted in the window they start in and must fit inside
+        it; ones with non-ACGT bases are skipped.
+        """
+        if not 1 <= k <= MAX_K:
+            raise ValueError(f"k must be between 1 and {MAX_K}.")
+        size = 4 ** k
+        kmers = ["".join(chr(seqcore.BASES[(idx >> (2 * (k - 1 - j))) & 3]) for j in range(k))
+                 for idx in range(size)]
+        counts = np.zeros((len(starts), size), dtype=np.int64)
+        n = self.length
+        if n >= k:
+            index = self._kmer_index(k)
+            for row, (start, end) in enumerate(zip(starts.tolist(), ends.tolist())):
+                counts[row] = np.bincount(index[start:max(end - k + 1, start)], minlength=size + 1)[:size]
+        totals = counts.sum(axis=1, keepdims=True)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return kmers, np.where(totals > 0, counts / totals, 0.0)
+
+
+# --------------------------
+# --- Profile Cache
+# --------------------------
+# Built profiles are kept per process so repeated queries on the same
+# sequence (other window sizes, zooming) skip the O(n) build.
+_CACHE = OrderedDict()
+CACHE_ENTRIES = 4
+
+
+def get_profile(key, load):
+    """Cached SequenceProfile for ``key``; ``load()`` returns the sequence on a miss."""
+    if key in _CACHE:
+        _CACHE.move_to_end(key)
+        return _CACHE[key]
+    profile = SequenceProfile(load())
+    _CACHE[key] = profile
+    while len(_CACHE) > CACHE_ENTRIES:
+        _CACHE.popitem(last=False)
+    return profile
+
+
+def _to_list(values, digits=4):
+    return [None if not np.isfinite(v) else round(v, digits) for v in values.tolist()]
+
+
+def sequence_profile(seq, window=None, step=None, points=1000, tracks=TRACKS, k=None, profile=None):
+    """JSON-ready windowed profile of ``seq``; ``profile`` reuses a prebuilt SequenceProfile."""
+    unknown = set(tracks) - set(TRACKS)
+    if unknown:
+        raise ValueError(f"Unknown track(s) {sorted(unknown)}. Choose from {list(TRACKS)}.")
+    if window is not None and window < 1 or step is not None and step < 1 or points < 1:
+        raise ValueError("window, step and points must be positive.")
+    profile = profile or SequenceProfile(seq)
+    if profile.length == 0:
+        raise ValueError("Empty sequence.")
+    starts, ends, window, step = profile.windows(window, step, points)
+    result = {
+        "length": profile.length,
+        "window": window,
+        "step": step,
+        "points": len(starts),
+        # 1-based window centres, for plotting
+        "positions": ((starts + ends + 1) // 2).tolist(),
+        "tracks": {name: _to_list(values) for name, values in profile.tracks(starts, ends, tracks).items()},
+    }
+    if k:
+        kmers, freqs = profile.kmer_frequencies(starts, ends, k)
+        result["kmers"] = {"k": k, "kmers": kmers,
+                           "frequencies": [[round(f, 4) for f in row] for row in freqs.tolist()]}
+    return result
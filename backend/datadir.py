@@ -0,0 +1,21 @@
+# Data Directory
+# Where the server keeps its runtime state (the 2-bit store, off-target
+# indexes, the job and BLAST databases) when no explicit path is set for
+# it, so nothing is written into the source tree. Nothing is created on
+# import; each owner creates its file or directory when it is opened.
+#
+# Configured from the environment:
+#   DNA_DATA_DIR   base directory (default: $XDG_DATA_HOME/dna-analyzer,
+#                  i.e. ~/.local/share/dna-analyzer)
+
+import os
+
+
+def data_dir():
+    base = os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.environ.get("DNA_DATA_DIR") or os.path.join(base, "dna-analyzer")
+
+
+def data_path(name):
+    """Default location of ``name`` inside the data directory."""
+    return os.path.join(data_dir(), name)
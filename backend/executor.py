@@ -0,0 +1,148 @@
+# Analysis Executor
+# Runs CPU-bound analysis off the event loop in a process pool.
+# - Bounded: at most workers + queue_size tasks in flight; more raise ExecutorBusy (HTTP 429)
+# - Timeouts: a task that takes longer than its timeout raises ExecutorTimeout (HTTP 504)
+# - Crashes: a worker that dies (OOM kill, segfault) breaks the whole pool;
+#   the tasks it took down raise ExecutorCrashed (HTTP 503) and the pool is
+#   rebuilt for the next task. ``stats()`` reports the pool state and restarts.
+# - workers=0 runs tasks inline on the event loop (the pre-pool behaviour,
+#   handy for debugging and as the load-test baseline)
+#
+# Configured from the environment:
+#   DNA_WORKERS       worker processes (default: CPU count)
+#   DNA_QUEUE_SIZE    tasks allowed to wait for a free worker (default: 4 per worker)
+#   DNA_TASK_TIMEOUT  seconds before a request gives up on its task (default: 30)
+
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+class ExecutorBusy(Exception):
+    """Raised when the executor already has its maximum number of tasks in flight."""
+
+
+class ExecutorTimeout(Exception):
+    """Raised when a task does not finish within its timeout."""
+
+
+class ExecutorCrashed(Exception):
+    """Raised when a worker process died while the task was in the pool."""
+
+
+class AnalysisExecutor:
+    def __init__(self, workers=None, queue_size=None, timeout=30.0):
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.queue_size = self.workers * 4 if queue_size is None else queue_size
+        self.timeout = timeout
+        self.in_flight = 0
+        self.restarts = 0
+        self.last_crash = None
+        self._pool = None
+
+    @classmethod
+    def from_env(cls):
+        workers = os.environ.get("DNA_WORKERS")
+        queue_size = os.environ.get("DNA_QUEUE_SIZE")
+        return cls(
+            workers=int(workers) if workers else None,
+            queue_size=int(queue_size) if queue_size else None,
+            timeout=float(os.environ.get("DNA_TASK_TIMEOUT", 30)),
+        )
+
+    @property
+    def capacity(self):
+        return max(self.workers, 1) + self.queue_size
+
+    def start(self):
+        if self.workers and self._pool is None:
+            # spawn, not fork: the parent runs an event loop and threads.
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            from tasks import ping
+            for _ in range(self.workers):
+                self._pool.submit(ping)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    @property
+    def broken(self):
+        # Set by the pool's manager thread as soon as a worker dies.
+        return self._pool is not None and bool(self._pool._broken)
+
+    def _restart(self, pool):
+        """Replace ``pool`` after a worker died (once, however many tasks saw it)."""
+        if pool is not self._pool:
+            return
+        self.restarts += 1
+        self.last_crash = time.time()
+        self.shutdown()
+        self.start()
+
+    def _release(self):
+        self.in_flight -= 1
+
+    def _release_from(self, loop):
+        try:
+            loop.call_soon_threadsafe(self._release)
+        except RuntimeError:
+            pass  # loop already closed during shutdown
+
+    async def run(self, func, *args, timeout=None):
+        """Run ``func(*args)`` in a worker and await its result."""
+        if self.in_flight >= self.capacity:
+            raise ExecutorBusy(f"Server busy: {self.in_flight} analyses in progress.")
+        timeout = self.timeout if timeout is None else timeout
+
+        if not self.workers:
+            self.in_flight += 1
+            try:
+                return func(*args)
+            finally:
+                self._release()
+
+        if self.broken:
+            self._restart(self._pool)  # a worker died while the pool was idle
+        self.start()
+        loop = asyncio.get_running_loop()
+        pool = self._pool
+        try:
+            future = pool.submit(func, *args)
+        except BrokenProcessPool:
+            self._restart(pool)
+            raise ExecutorCrashed("An analysis worker crashed; the pool is restarting, retry shortly.") from None
+        self.in_flight += 1
+        # The slot is freed when the worker actually finishes, not when the
+        # caller stops waiting, so timed-out tasks still count against capacity.
+        future.add_done_callback(lambda f: self._release_from(loop))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            raise ExecutorTimeout(f"Analysis did not finish within {timeout:g} s.") from None
+        except BrokenProcessPool:
+            self._restart(pool)
+            raise ExecutorCrashed("An analysis worker crashed; the pool is restarting, retry shortly.") from None
+
+    def pool_state(self):
+        if not self.workers:
+            return "inline"
+        if self._pool is None:
+            return "stopped"
+        return "broken" if self.broken else "running"
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "in_flight": self.in_flight,
+            "timeout": self.timeout,
+            "pool": self.pool_state(),
+            "restarts": self.restarts,
+            "last_crash": self.last_crash,
+        }
@@ -0,0 +1,447 @@
+# Incremental Re-analysis
+# What a few edits (SNVs / indels) change in a sequence's analyses, worked
+# out from the bases around each edit instead of a full rescan.
+# - Splices: edits are applied as (old span -> new bases) splices; edits
+#   whose ORF windows (below) overlap are merged into one splice
+# - ORFs: an edit can only change ORFs whose stop codon lies between the
+#   last stop before it and the first stop after it in the same frame and
+#   strand. That window is rescanned in the old and the new sequence and the
+#   two lists are compared; every other ORF is unchanged, only moved by the
+#   indel length when it lies after the splice
+# - Codons: the codons covering each splice in all six frames
+# - Translation: frame +1 up to its first stop, as /analyze returns it,
+#   from the first changed codon on
+# - Composition: base counts are updated from the edited bases; windows of
+#   the /profile grid that contain edited bases are recomputed
+# - Primers: the /analyze primers before and after, and which edits fall
+#   in their binding sites
+# Base counts are kept per sequence ID in each process, so a chain of edits
+# (each result's sequence_id edited again) never counts the whole sequence
+# twice.
+
+from collections import Counter, OrderedDict, namedtuple
+
+import numpy as np
+
+import composition
+import orfs as orfs_engine
+import seqcore
+import translation
+from variants import variant_type
+
+# 0-based [start, end) of the old sequence replaced by ``alt`` (bytes).
+Splice = namedtuple("Splice", ["start", "end", "alt"])
+
+# Bases scanned first on each side of a splice for stop codons; doubled
+# until every frame has one (or the sequence ends).
+SEARCH = 768
+
+_RC_STOP_LUT = np.zeros(seqcore.INVALID_CODON + 1, dtype=bool)
+_RC_STOP_LUT[[seqcore.codon_index(seqcore.reverse_complement_bytes(codon.encode("ascii")).decode("ascii"))
+              for codon in orfs_engine.STOP_CODONS]] = True
+_STOP_LUTS = {"+": orfs_engine._STOP_LUT, "-": _RC_STOP_LUT}
+
+
+# --------------------------
+# --- Applying Edits
+# --------------------------
+def apply_edits(data, edits):
+    """(new bytes, splices) for ``edits`` (variants.Variant) applied to ``data``.
+
+    Positions refer to ``data``; edits must match it and must not overlap.
+    """
+    splices = []
+    for edit in sorted(edits, key=lambda e: (e.position, len(e.ref))):
+        start = edit.position - 1
+        end = start + len(edit.ref)
+        if start < 0 or end > len(data) or (not edit.ref and start > len(data)):
+            raise ValueError(f"Edit at position {edit.position} is out of range for a sequence "
+                             f"of length {len(data)}.")
+        if data[start:end] != edit.ref.encode("ascii"):
+            raise ValueError(f"Edit at position {edit.position} expects '{edit.ref}' but the sequence "
+                             f"has '{data[start:end].decode('ascii')}'.")
+        if splices and (start < splices[-1].end or start == splices[-1].start):
+            raise ValueError(f"Edits overlap at position {edit.position}.")
+        splices.append(Splice(start, end, edit.alt.encode("ascii")))
+    parts, at = [], 0
+    for splice in splices:
+        parts += [data[at:splice.start], splice.alt]
+        at = splice.end
+    parts.append(data[at:])
+    return b"".join(parts), splices
+
+
+# --------------------------
+# --- Stop Codon Search
+# --------------------------
+def _stops_before(data, pos):
+    """Per strand, per phase (position % 3): 0-based start of the last stop codon ending at or before ``pos``."""
+    found = {"+": [None] * 3, "-": [None] * 3}
+    width = SEARCH
+    while True:
+        lo = max(pos - width, 0)
+        idx = seqcore.codon_indices(data[lo:pos])
+        for strand, lut in _STOP_LUTS.items():
+            hits = np.flatnonzero(lut[idx]) + lo
+            for phase in range(3):
+                in_phase = hits[hits % 3 == phase]
+                if len(in_phase):
+                    found[strand][phase] = int(in_phase[-1])
+        if lo == 0 or None not in found["+"] + found["-"]:
+            return found
+        width *= 2
+
+
+def _stops_after(data, pos):
+    """Per strand, per phase: 0-based start of the first stop codon starting at or after ``pos``."""
+    found = {"+": [None] * 3, "-": [None] * 3}
+    width = SEARCH
+    while True:
+        hi = min(pos + width, len(data))
+        idx = seqcore.codon_indices(data[pos:hi])
+        for strand, lut in _STOP_LUTS.items():
+            hits = np.flatnonzero(lut[idx]) + pos
+            for phase in range(3):
+                in_phase = hits[hits % 3 == phase]
+                if len(in_phase):
+                    found[strand][phase] = int(in_phase[0])
+        if hi == len(data) or None not in found["+"] + found["-"]:
+            return found
+        width *= 2
+
+
+def _window_end(data, after):
+    """End of the ORF window on the right: past the last stop found, or the sequence end."""
+    stops = after["+"] + after["-"]
+    return len(data) if None in stops else max(stops) + 3
+
+
+def merge_splices(data, splices):
+    """Merge splices whose ORF windows in ``data`` (the old sequence) overlap."""
+    merged = []
+    for splice in splices:
+        if merged and splice.start < _window_end(data, _stops_after(data, merged[-1].end)):
+            last = merged.pop()
+            splice = Splice(last.start, splice.end, last.alt + data[last.end:splice.start] + splice.alt)
+        merged.append(splice)
+    return merged
+
+
+# --------------------------
+# --- ORFs
+# --------------------------
+def _affected_orfs(data, lo, hi, min_length, mode, both_strands):
+    """ORFs of ``data`` an edit of bases [lo, hi) can change, as scan_orfs tuples.
+
+    Forward ORFs qualify when their stop lies after the last in-frame stop
+    before the edit and no later than the first one after it; reverse ORFs
+    mirror this (their stop is the leftmost codon).
+    """
+    before, after = _stops_before(data, lo), _stops_after(data, hi)
+    left = before["+"] + before["-"]
+    start = 0 if None in left else min(left)
+    end = _window_end(data, after)
+    n = len(data)
+    found = []
+    for strand, _, orf_start, orf_end in orfs_engine.scan_orfs(data[start:end], min_length, mode,
+                                                               both_strands):
+        orf_start, orf_end = orf_start + start, orf_end + start
+        if strand == "+":
+            stop = orf_end - 3
+            first, last = before["+"][stop % 3], after["+"][stop % 3]
+            if (first is None or stop > first) and (last is None or stop <= last):
+                found.append(("+", (orf_start - 1) % 3 + 1, orf_start, orf_end))
+        else:
+            stop = orf_start - 1
+            first, last = before["-"][stop % 3], after["-"][stop % 3]
+            if (first is None or stop >= first) and (last is None or stop < last):
+                found.append(("-", -((n - orf_end) % 3 + 1), orf_start, orf_end))
+    return found
+
+
+def _orf_dict(data, orf, both_strands, include_sequence):
+    strand, frame, start, end = orf
+    result = {"start": start, "end": end, "length": end - start + 1}
+    if both_strands:
+        result["strand"] = strand
+        result["frame"] = frame
+    if include_sequence:
+        sequence = data[start - 1:end]
+        if strand == "-":
+            sequence = seqcore.reverse_complement_bytes(sequence, strict=False)
+        result["sequence"] = sequence.decode("ascii")
+        result["protein"] = translation.translate(sequence, read_through=True)[:-1]
+    return result
+
+
+def orf_delta(old, new, splices, min_length=0, mode="nested", both_strands=True, include_sequence=True):
+    """ORFs removed, added and modified (same coordinates, edited bases inside) by ``splices``.
+
+    ORF dicts are shaped like /orfs ones; removed ORFs carry old
+    coordinates, added and modified ones new coordinates. ``shifts`` lists where the remaining ORFs move: by ``by``
+    bases from old position ``after`` on.
+    """
+    if mode not in orfs_engine.MODES:
+        raise ValueError(f"mode must be one of {orfs_engine.MODES}, got {mode!r}")
+    removed, added, modified, shifts = [], [], [], []
+    shift = 0  # indel length of the splices so far
+    for splice in splices:
+        delta = len(splice.alt) - (splice.end - splice.start)
+        new_start = splice.start + shift
+        new_end = new_start + len(splice.alt)
+
+        def moved(position):
+            # New 1-based position of an old base outside the splice; None inside it.
+            if position <= splice.start:
+                return position + shift
+            if position > splice.end:
+                return position + shift + delta
+            return None
+
+        olds = _affected_orfs(old, splice.start, splice.end, min_length, mode, both_strands)
+        news = {(strand, start, end): (strand, frame, start, end)
+                for strand, frame, start, end in _affected_orfs(new, new_start, new_end, min_length,
+                                                                mode, both_strands)}
+        for orf in olds:
+            strand, _, start, end = orf
+            key = (strand, moved(start), moved(end))
+            if key in news:
+                kept = news.pop(key)
+                if start <= splice.end and end > splice.start:
+                    modified.append(_orf_dict(new, kept, both_strands, include_sequence))
+            else:
+                removed.append(_orf_dict(old, orf, both_strands, False))
+        added += [_orf_dict(new, orf, both_strands, include_sequence) for orf in news.values()]
+        if delta:
+            shifts.append({"after": splice.end, "by": delta})
+        shift += delta
+    return {"removed": removed, "added": added, "modified": modified, "shifts": shifts}
+
+
+# --------------------------
+# --- Codons / Translation
+# --------------------------
+def _codons(data, start, end, code, strand):
+    codons = data[max(start, 0):end]
+    if strand == "-":
+        codons = seqcore.reverse_complement_bytes(codons, strict=False)
+    codons = codons[:len(codons) - len(codons) % 3]
+    return codons.decode("ascii"), translation.translate(codons, code, read_through=True)
+
+
+def codon_changes(old, new, splices, code=1):
+    """Codons covering each splice, before and after, per frame.
+
+    Frames are listed when their codons translate differently, and all six
+    are listed for a frameshift. Forward frames are aligned on the bases
+    before the splice, reverse frames on the bases after it; an empty side
+    of an insertion or deletion still covers the bases next to it.
+    ``position`` is the new 1-based start of the codons and ``frame`` the
+    new frame label.
+    """
+    changes = []
+    shift = 0
+    for splice in splices:
+        delta = len(splice.alt) - (splice.end - splice.start)
+        new_start = splice.start + shift
+        new_end = new_start + len(splice.alt)
+        for phase in range(3):
+            # Forward: this phase's codon grid, from the codon holding the first edited base on.
+            first = new_start - (new_start - phase) % 3
+            if first < 0:
+                first += 3
+            old_first = first - shift
+            old_last = old_first + 3 * -(-(max(splice.end, splice.start + 1) - old_first) // 3)
+            last = first + 3 * -(-(max(new_end, new_start + 1) - first) // 3)
+            entries = [(phase + 1, first, _codons(old, old_first, old_last, code, "+"),
+                        _codons(new, first, last, code, "+"))]
+            # Reverse: the grid whose codons end ``phase`` bases before the sequence end.
+            last = new_end + (len(new) - new_end - phase) % 3
+            if last > len(new):
+                last -= 3
+            old_last = last - shift - delta
+            old_first = old_last - 3 * -(-(old_last - min(splice.start, splice.end - 1)) // 3)
+            first = last - 3 * -(-(last - min(new_start, new_end - 1)) // 3)
+            entries.append((-(phase + 1), max(first, 0), _codons(old, old_first, old_last, code, "-"),
+                            _codons(new, first, last, code, "-")))
+            for frame, position, (ref_codons, ref_aa), (alt_codons, alt_aa) in entries:
+                if (ref_codons or alt_codons) and (ref_aa != alt_aa or delta % 3):
+                    changes.append({
+                        "frame": frame,
+                        "position": position + 1,
+                        "ref_codons": ref_codons,
+                        "alt_codons": alt_codons,
+                        "ref_aa": ref_aa,
+                        "alt_aa": alt_aa,
+                        "frameshift": bool(delta % 3),
+                    })
+        shift += delta
+    return changes
+
+
+def _stop_before(data, end, code):
+    """Whether frame +1 has a stop codon in data[:end] (``end`` a multiple of 3)."""
+    width = SEARCH
+    while True:
+        start = max(end - width, 0)
+        if translation.STOP_SYMBOL in translation.translate(data[start:end], code, read_through=True):
+            return True
+        if start == 0:
+            return False
+        width *= 2
+
+
+def _protein_from(data, start, code):
+    """Frame translation from ``start`` up to its first stop codon."""
+    width = SEARCH
+    while True:
+        protein = translation.translate(data[start:start + width], code, read_through=True)
+        stop = protein.find(translation.STOP_SYMBOL)
+        if stop != -1:
+            return protein[:stop]
+        if start + width >= len(data):
+            return protein
+        width *= 2
+
+
+def protein_delta(old, new, splices, code=1):
+    """Change to the frame +1 protein (to the first stop), or None when the edits are past its end."""
+    if not splices:
+        return None
+    first = splices[0].start - splices[0].start % 3
+    if _stop_before(old, first, code):
+        return None
+    ref, alt = _protein_from(old, first, code), _protein_from(new, first, code)
+    if ref == alt:
+        return None
+    return {"codon": first // 3 + 1, "ref": ref, "alt": alt}
+
+
+# --------------------------
+# --- Composition
+# --------------------------
+# Base counts per sequence ID, per process.
+_COUNTS = OrderedDict()
+CACHE_ENTRIES = 16
+
+
+def _remember_counts(key, counts):
+    _COUNTS[key] = counts
+    _COUNTS.move_to_end(key)
+    while len(_COUNTS) > CACHE_ENTRIES:
+        _COUNTS.popitem(last=False)
+
+
+def base_counts(data, key=None):
+    """seqcore.base_counts, cached under ``key`` (a sequence ID) when given."""
+    if key is not None and key in _COUNTS:
+        _COUNTS.move_to_end(key)
+        return _COUNTS[key]
+    counts = seqcore.base_counts(data)
+    if key is not None:
+        _remember_counts(key, counts)
+    return counts
+
+
+def edited_counts(old, splices, old_key=None, new_key=None):
+    """(old, new) base counts, the new ones derived from the edited bases."""
+    before = base_counts(old, old_key)
+    after = Counter(before)
+    for splice in splices:
+        after.subtract(seqcore.base_counts(old[splice.start:splice.end]))
+        after.update(seqcore.base_counts(splice.alt))
+    after = {base: after[base] for base in before}
+    if new_key is not None:
+        _remember_counts(new_key, after)
+    return before, after
+
+
+def _gc(counts, length):
+    return round(((counts["G"] + counts["C"]) / length) * 100, 2) if length else 0.0
+
+
+def _window_tracks(data, start, end):
+    if end > len(data):
+        return None
+    profile = composition.SequenceProfile(data[start:end])
+    tracks = profile.tracks(np.array([0]), np.array([end - start]))
+    return {name: composition._to_list(values)[0] for name, values in tracks.items()}
+
+
+def window_changes(old, new, splices, window):
+    """Windows of the /profile grid (``window`` bases, no overlap) that contain edited bases.
+
+    After an indel every later window is offset as well; those are not listed.
+    """
+    changes, seen = [], set()
+    shift = 0
+    for splice in splices:
+        new_start = splice.start + shift
+        new_end = max(new_start + len(splice.alt), new_start + 1)
+        for index in range(new_start // window, (new_end - 1) // window + 1):
+            if index in seen:
+                continue
+            seen.add(index)
+            start, end = index * window, (index + 1) * window
+            before, after = _window_tracks(old, start, end), _window_tracks(new, start, end)
+            if before != after:
+                changes.append({"start": start + 1, "end": end, "before": before, "after": after})
+        shift += len(splice.alt) - (splice.end - splice.start)
+    return changes
+
+
+# --------------------------
+# --- Primers
+# --------------------------
+def _primers(data, length):
+    if len(data) < length:
+        return ("Sequence too short", "Sequence too short")
+    return (data[:length].decode("ascii"),
+            seqcore.reverse_complement_bytes(data[-length:], strict=False).decode("ascii"))
+
+
+def primer_regions(edit, length, n):
+    """/analyze primer sites (first and last ``length`` bases) touched by ``edit``."""
+    first = edit.position - 1
+    last = max(first + len(edit.ref), first + 1)
+    regions = []
+    if first < length:
+        regions.append("forward_primer")
+    if last > n - length:
+        regions.append("reverse_primer")
+    return regions
+
+
+# --------------------------
+# --- Delta
+# --------------------------
+def edit_delta(old, new, edits, splices, min_orf_length=0, orf_mode="nested", both_strands=True,
+               include_sequence=True, genetic_code=1, primer_length=20, window=None,
+               old_key=None, new_key=None):
+    """Everything ``edits`` (applied by apply_edits) change between ``old`` and ``new`` (bytes).
+
+    ``window`` is the /profile window size; it defaults to the one /profile
+    picks for ``old`` (1000 windows).
+    """
+    translation.get_table(genetic_code)  # validate before scanning
+    splices = merge_splices(old, splices)
+    before, after = edited_counts(old, splices, old_key, new_key)
+    window = window or max(-(-len(old) // 1000), 1)
+    forward, reverse = _primers(old, primer_length)
+    new_forward, new_reverse = _primers(new, primer_length)
+    return {
+        "length": {"before": len(old), "after": len(new)},
+        "edits": [{"position": edit.position, "ref": edit.ref, "alt": edit.alt,
+                   "type": variant_type(edit), "regions": primer_regions(edit, primer_length, len(old))}
+                  for edit in sorted(edits, key=lambda e: (e.position, len(e.ref)))],
+        "gc_content": {"before": _gc(before, len(old)), "after": _gc(after, len(new))},
+        "base_counts": {"before": before, "after": after},
+        "translated_protein": protein_delta(old, new, splices, genetic_code),
+        "codons": codon_changes(old, new, splices, genetic_code),
+        "orfs": orf_delta(old, new, splices, min_orf_length, orf_mode, both_strands, include_sequence),
+        "windows": {"window": window, "changed": window_changes(old, new, splices, window)},
+        "primers": {
+            "forward_primer": {"before": forward, "after": new_forward},
+            "reverse_primer": {"before": reverse, "after": new_reverse},
+        },
+    }
@@ -0,0 +1,32 @@
+# Interval Index
+# Static index over 1-based inclusive intervals (ORFs, primers, ...).
+# Intervals are sorted by start once. A query binary-searches the last
+# interval starting at or before its end, and, on a running maximum of the
+# ends, the first interval that can still reach its start; the ends in
+# between are then checked with one vectorised comparison. That range can
+# include intervals ending before the query (e.g. everything after one long
+# interval), so a lookup is O(log n + range) rather than O(log n + hits).
+
+import numpy as np
+
+
+class IntervalIndex:
+    def __init__(self, intervals):
+        """``intervals`` is an iterable of ``(start, end, label)``."""
+        intervals = sorted(intervals, key=lambda item: (item[0], item[1]))
+        self.starts = np.array([item[0] for item in intervals], dtype=np.int64)
+        self.ends = np.array([item[1] for item in intervals], dtype=np.int64)
+        self.labels = [item[2] for item in intervals]
+        # max_end[i] is the largest end among intervals[:i + 1]; non-decreasing.
+        self._max_end = np.maximum.accumulate(self.ends) if len(self.ends) else self.ends
+
+    def __len__(self):
+        return len(self.labels)
+
+    def overlapping(self, start, end=None):
+        """Labels of every interval overlapping [start, end] (a point if end is None)."""
+        end = start if end is None else end
+        hi = int(np.searchsorted(self.starts, end, side="right"))
+        lo = int(np.searchsorted(self._max_end[:hi], start, side="left"))
+        hits = lo + np.flatnonzero(self.ends[lo:hi] >= start)
+        return [self.labels[i] for i in hits.tolist()]
@@ -0,0 +1,422 @@
+# Analysis Jobs
+# Long analyses run in the background instead of inside the HTTP request:
+# submit returns a job ID at once and the job is polled (or watched) until
+# it has a result.
+# - Concurrency: at most ``concurrency`` jobs run at a time; the rest wait
+#   in FIFO order, and submissions beyond ``max_queued`` are refused
+# - Cancellation: queued jobs are dropped, running ones are cancelled
+# - Expiry: finished jobs and their results are deleted after ``ttl`` seconds,
+#   by a sweep every ``sweep_interval`` seconds and on lookup
+# - Persistence: jobs and results live in SQLite; after a restart finished
+#   jobs are still served and queued or running ones are queued again. One
+#   thread owns the connection, so reads, writes and result encoding never
+#   block the event loop
+# - Watching: every status / progress change is pushed to subscribers
+#   (served as server-sent events by the API)
+# The manager does not know what a job does: the API passes a ``runner``
+# coroutine, called as ``runner(job, progress)``, whose return value (any
+# JSON-serializable object, or JSON already encoded as bytes) becomes the
+# job result.
+#
+# Configured from the environment:
+#   JOBS_DB_PATH       SQLite file (default: jobs.sqlite in the data directory, see datadir.py)
+#   JOBS_CONCURRENCY   jobs running at once (default 2)
+#   JOBS_MAX_QUEUED    queued jobs accepted before submissions are refused (default 100)
+#   JOBS_RESULT_TTL    seconds a finished job is kept (default 1 day)
+#   JOBS_SWEEP_INTERVAL  seconds between sweeps of expired jobs (default 10 minutes)
+#   JOBS_TASK_TIMEOUT  seconds one analysis task of a job may take (default 1 hour;
+#                      requests keep DNA_TASK_TIMEOUT)
+
+import asyncio
+import json
+import os
+import sqlite3
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from datadir import data_path
+
+ACTIVE = ("queued", "running")
+FINISHED = ("succeeded", "failed", "cancelled")
+# Seconds between keep-alive events while a watched job makes no progress.
+KEEPALIVE = 15.0
+
+
+class JobQueueFull(Exception):
+    """Raised when ``max_queued`` jobs are already waiting."""
+
+
+def _encode(result):
+    return json.dumps(result, default=str).encode("utf-8")
+
+
+# --------------------------
+# --- Job Store
+# --------------------------
+class JobStore:
+    """Jobs and their JSON results in SQLite.
+
+    The public methods queue their query on the store's thread and return
+    an asyncio future; queries run one at a time in call order.
+    """
+
+    COLUMNS = ("id", "type", "params", "status", "progress", "error",
+               "created", "started", "finished", "expires")
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._db = None
+        self._disk = None  # single thread that owns the SQLite connection
+
+    def open(self):
+        if self._disk is None:
+            self._disk = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-store")
+        return self._on_disk(self._open)
+
+    def _on_disk(self, func, *args):
+        return asyncio.get_running_loop().run_in_executor(self._disk, func, *args)
+
+    # _open, _close and the _db_ methods run on the store's thread.
+    def _open(self):
+        if self._db is not None:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, type TEXT, params TEXT, status TEXT, progress TEXT,"
+            " error TEXT, created REAL, started REAL, finished REAL, expires REAL, result BLOB)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_created ON jobs (created)")
+        self._db.commit()
+
+    def _close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _job(self, row):
+        if row is None:
+            return None
+        job = dict(zip(self.COLUMNS, row))
+        job["params"] = json.loads(job["params"])
+        job["progress"] = json.loads(job["progress"])
+        return job
+
+    def _db_save(self, values, result):
+        values[2], values[4] = json.dumps(values[2]), json.dumps(values[4])
+        self._db.execute(
+            f"INSERT INTO jobs ({', '.join(self.COLUMNS)}, result) VALUES ({', '.join('?' * 11)})"
+            f" ON CONFLICT(id) DO UPDATE SET"
+            f" {', '.join(f'{column} = excluded.{column}' for column in self.COLUMNS[3:])},"
+            f" result = COALESCE(excluded.result, result)",
+            (*values, result))
+        self._db.commit()
+
+    def _db_get(self, job_id):
+        return self._job(self._db.execute(
+            f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def _db_result(self, job_id):
+        row = self._db.execute("SELECT result FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row[0] if row else None
+
+    def _db_recent(self, limit):
+        rows = self._db.execute(
+            f"SELECT {', '.join(self.COLUMNS)} FROM jobs ORDER BY created DESC LIMIT ?", (limit,))
+        return [self._job(row) for row in rows]
+
+    def _db_unfinished(self):
+        rows = self._db.execute(
+            f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE status IN (?, ?) ORDER BY created", ACTIVE)
+        return [self._job(row) for row in rows]
+
+    def _db_delete(self, job_id):
+        self._db.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        self._db.commit()
+
+    def _db_expire(self, now):
+        deleted = self._db.execute("DELETE FROM jobs WHERE expires < ?", (now,)).rowcount
+        self._db.commit()
+        return deleted
+
+    def save(self, job, result=None):
+        """Insert or update ``job``; ``result`` (JSON bytes) is kept unless replaced."""
+        # A snapshot: the job dict keeps changing on the event loop, but its
+        # params and progress dicts are replaced, never modified in place.
+        values = [job[column] for column in self.COLUMNS]
+        return self._on_disk(self._db_save, values, result)
+
+    def get(self, job_id):
+        return self._on_disk(self._db_get, job_id)
+
+    def result(self, job_id):
+        return self._on_disk(self._db_result, job_id)
+
+    def recent(self, limit=100):
+        return self._on_disk(self._db_recent, limit)
+
+    def unfinished(self):
+        return self._on_disk(self._db_unfinished)
+
+    def delete(self, job_id):
+        return self._on_disk(self._db_delete, job_id)
+
+    def expire(self, now):
+        """Delete finished jobs whose expiry has passed; resolves to how many."""
+        return self._on_disk(self._db_expire, now)
+
+    async def close(self):
+        if self._disk is not None:
+            await self._on_disk(self._close)
+            self._disk.shutdown()
+            self._disk = None
+
+
+# --------------------------
+# --- Job Manager
+# --------------------------
+class JobManager:
+    """Queues jobs, runs them ``concurrency`` at a time and records the outcome.
+
+    Job dicts have ``id``, ``type``, ``params``, ``status`` ('queued',
+    'running', 'succeeded', 'failed' or 'cancelled'), ``progress`` (a dict
+    with at least ``stage``), ``error`` and the ``created`` / ``started``
+    / ``finished`` / ``expires`` timestamps.
+    """
+
+    def __init__(self, store, runner=None, concurrency=2, max_queued=100, ttl=24 * 3600,
+                 task_timeout=3600.0, sweep_interval=600.0):
+        self.store = store
+        self.runner = runner
+        self.concurrency = concurrency
+        self.max_queued = max_queued
+        self.ttl = ttl
+        self.task_timeout = task_timeout
+        self.sweep_interval = sweep_interval
+        self._active = {}            # id -> job, queued or running
+        self._queued = OrderedDict()  # ids waiting for a slot, in order
+        self._queue = None
+        self._running = {}           # id -> asyncio task
+        self._watchers = {}          # id -> set of asyncio queues
+        self._workers = []
+        self._sweeper = None
+        self._closing = False
+
+    @classmethod
+    def from_env(cls, runner=None):
+        return cls(
+            JobStore(os.environ.get("JOBS_DB_PATH") or data_path("jobs.sqlite")),
+            runner,
+            concurrency=int(os.environ.get("JOBS_CONCURRENCY", 2)),
+            max_queued=int(os.environ.get("JOBS_MAX_QUEUED", 100)),
+            ttl=float(os.environ.get("JOBS_RESULT_TTL", 24 * 3600)),
+            task_timeout=float(os.environ.get("JOBS_TASK_TIMEOUT", 3600)),
+            sweep_interval=float(os.environ.get("JOBS_SWEEP_INTERVAL", 600)),
+        )
+
+    async def start(self):
+        """Start the workers and the sweep; queue again the jobs a previous run left unfinished."""
+        self._closing = False
+        self._active.clear()
+        self._queued.clear()
+        self._queue = asyncio.Queue()
+        await self.store.open()
+        await self.store.expire(time.time())
+        for job in await self.store.unfinished():
+            job.update(status="queued", progress={"stage": "queued"}, started=None)
+            self._enqueue(job)
+        self._workers = [asyncio.ensure_future(self._worker()) for _ in range(self.concurrency)]
+        self._sweeper = asyncio.ensure_future(self._sweep())
+
+    async def aclose(self):
+        """Stop the workers; running jobs stay queued in the store for the next start."""
+        self._closing = True
+        tasks = [*self._workers, *self._running.values(), *filter(None, [self._sweeper])]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.store.close()
+
+    async def _sweep(self):
+        # Finished jobs nobody asks about again are only deleted here.
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            await self.store.expire(time.time())
+
+    # --------------------------
+    # --- Submit / Cancel
+    # --------------------------
+    def _enqueue(self, job):
+        saved = self.store.save(job)
+        self._active[job["id"]] = job
+        self._queued[job["id"]] = None
+        self._queue.put_nowait(job["id"])
+        return saved
+
+    async def submit(self, job_type, params):
+        """Queue a job and return it."""
+        if len(self._queued) >= self.max_queued:
+            raise JobQueueFull(f"{len(self._queued)} jobs are already queued.")
+        job = {
+            "id": uuid.uuid4().hex,
+            "type": job_type,
+            "params": params,
+            "status": "queued",
+            "progress": {"stage": "queued"},
+            "error": None,
+            "created": time.time(),
+            "started": None,
+            "finished": None,
+            "expires": None,
+        }
+        saved = self._enqueue(job)
+        self._publish(job)
+        await saved
+        return job
+
+    async def cancel(self, job_id):
+        """Cancel a queued or running job; returns the job, or None if it is not active."""
+        job = self._active.get(job_id)
+        if job is None:
+            return None
+        if job_id in self._running:
+            self._running[job_id].cancel()
+        else:
+            self._queued.pop(job_id, None)
+            await self._finish(job, "cancelled")
+        return job
+
+    async def delete(self, job_id):
+        """Forget a finished job and its result."""
+        await self.store.delete(job_id)
+
+    # --------------------------
+    # --- Running
+    # --------------------------
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            job = self._active.get(job_id)
+            if job is None or job["status"] != "queued":
+                continue  # cancelled while it waited
+            self._queued.pop(job_id, None)
+            task = asyncio.ensure_future(self._run(job))
+            self._running[job_id] = task
+            try:
+                await asyncio.wait([task])
+            finally:
+                self._running.pop(job_id, None)
+
+    async def _run(self, job):
+        job.update(status="running", started=time.time(), progress={"stage": "running"})
+        saved = self.store.save(job)
+        self._publish(job)
+        await saved
+
+        def progress(stage, **info):
+            job["progress"] = {"stage": stage, **info}
+            self._publish(job)
+
+        try:
+            result = await self.runner(job, progress)
+            if not isinstance(result, bytes):
+                # Large results take a while to encode; keep that off the loop too.
+                result = await asyncio.to_thread(_encode, result)
+        except asyncio.CancelledError:
+            if self._closing:
+                return  # left 'running' in the store, queued again on the next start
+            await self._finish(job, "cancelled")
+        except Exception as e:
+            await self._finish(job, "failed", error=str(e))
+        else:
+            await self._finish(job, "succeeded", result=result)
+
+    async def _finish(self, job, status, error=None, result=None):
+        now = time.time()
+        job.update(status=status, error=error, finished=now, expires=now + self.ttl,
+                   progress={"stage": status})
+        # Queued before any later read of the job, so lookups see the outcome.
+        saved = self.store.save(job, result)
+        self._active.pop(job["id"], None)
+        self._publish(job)
+        await saved
+
+    # --------------------------
+    # --- Lookup / Watch
+    # --------------------------
+    async def get(self, job_id):
+        """Job by ID, from memory or the store; None if unknown or expired."""
+        job = self._active.get(job_id)
+        if job is not None:
+            return job
+        job = await self.store.get(job_id)
+        if job is not None and job["expires"] is not None and job["expires"] < time.time():
+            await self.store.delete(job_id)
+            return None
+        return job
+
+    async def result(self, job_id):
+        """The JSON result of a succeeded job as bytes, or None."""
+        return await self.store.result(job_id)
+
+    def position(self, job_id):
+        """0-based place in the queue of a queued job, else None."""
+        for position, queued_id in enumerate(self._queued):
+            if queued_id == job_id:
+                return position
+        return None
+
+    async def recent(self, limit=100):
+        """The newest jobs, active ones as they are in memory."""
+        await self.store.expire(time.time())
+        return [self._active.get(job["id"], job) for job in await self.store.recent(limit)]
+
+    def _publish(self, job):
+        for queue in self._watchers.get(job["id"], ()):
+            queue.put_nowait(self.snapshot(job))
+
+    def snapshot(self, job):
+        """The public view of a job: everything but its parameters."""
+        view = {key: value for key, value in job.items() if key != "params"}
+        if job["status"] == "queued":
+            view["queue_position"] = self.position(job["id"])
+        return view
+
+    async def watch(self, job_id, keepalive=KEEPALIVE):
+        """Yield snapshots of a job as it changes, ending once it has finished.
+
+        None is yielded every ``keepalive`` seconds without a change.
+        """
+        job = await self.get(job_id)
+        if job is None:
+            return
+        queue = asyncio.Queue()
+        self._watchers.setdefault(job_id, set()).add(queue)
+        try:
+            snapshot = self.snapshot(job)
+            yield snapshot
+            while snapshot["status"] not in FINISHED:
+                try:
+                    snapshot = await asyncio.wait_for(queue.get(), keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield snapshot
+        finally:
+            watchers = self._watchers.get(job_id, set())
+            watchers.discard(queue)
+            if not watchers:
+                self._watchers.pop(job_id, None)
+
+    def summary(self):
+        statuses = [job["status"] for job in self._active.values()]
+        return {
+            "queued": statuses.count("queued"),
+            "running": statuses.count("running"),
+            "concurrency": self.concurrency,
+            "max_queued": self.max_queued,
+            "ttl": self.ttl,
+        }
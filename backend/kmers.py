@@ -0,0 +1,147 @@
+# K-mer Engine
+# 2-bit rolling hashes of every k-mer (k <= 31) as a uint64 NumPy array,
+# k-mer counting and tandem-repeat detection. Works on clean_sequence
+# output; windows with non-ACGT bases are dropped.
+# - hashes for length k are built by doubling (h[a+b] = h[a] << 2b | h[b]
+#   shifted by a), so k = 31 costs ~5 passes instead of 31
+# - counting uses bincount when the 4**k counters are few next to the
+#   k-mers counted (k <= 12 and 4**k <= 4 * n) and sort + unique otherwise,
+#   so short inputs never allocate the full table
+
+import numpy as np
+
+import seqcore
+
+MAX_K = 31
+DENSE_K = 12  # 4**12 counters = 128 MB of int64; sort-based counting above
+DENSE_RATIO = 4  # bincount only with at most this many counters per k-mer
+
+
+# --------------------------
+# --- Hashing
+# --------------------------
+def kmer_hashes(seq, k):
+    """(hashes, valid): the 2-bit code of the k-mer at every start, A=0 C=1 G=2 T=3.
+
+    ``valid`` is False where the window contains a non-ACGT base.
+    """
+    if not 1 <= k <= MAX_K:
+        raise ValueError(f"k must be between 1 and {MAX_K}.")
+    codes = seqcore.encode_2bit(seq)
+    n = len(codes) - k + 1
+    if n <= 0:
+        return np.empty(0, dtype=np.uint64), np.empty(0, dtype=bool)
+
+    bad = np.concatenate(([0], np.cumsum(codes > 3)))
+    valid = (bad[k:] - bad[:-k]) == 0
+
+    # Binary decomposition of k: ``block`` holds hashes of length ``size``,
+    # ``total`` accumulates the hashes of length ``length`` built so far.
+    block = (codes & 3).astype(np.uint64)
+    size = 1
+    total, length = None, 0
+    remaining = k
+    while True:
+        if remaining & 1:
+            if total is None:
+                total, length = block, size
+            else:
+                total = (total[:len(block) - length] << np.uint64(2 * size)) | block[length:]
+                length += size
+        remaining >>= 1
+        if not remaining:
+            break
+        block = (block[:-size] << np.uint64(2 * size)) | block[size:]
+        size *= 2
+    return total[:n], valid
+
+
+def decode_kmer(code, k):
+    code = int(code)
+    return "".join(chr(seqcore.BASES[(code >> (2 * (k - 1 - j))) & 3]) for j in range(k))
+
+
+# --------------------------
+# --- Counting
+# --------------------------
+def count_kmers(seq, k, canonical=False):
+    """(codes, counts) of every distinct k-mer, codes sorted ascending.
+
+    ``canonical`` merges each k-mer with its reverse complement (the smaller
+    code is kept), so both strands are counted together.
+    """
+    hashes, valid = kmer_hashes(seq, k)
+    if canonical:
+        # The reverse strand's hashes, reversed, line up with the forward ones.
+        rc_hashes, _ = kmer_hashes(seqcore.reverse_complement_bytes(seq, strict=False), k)
+        hashes = np.minimum(hashes, rc_hashes[::-1])
+    hashes = hashes[valid]
+    if k <= DENSE_K and 4 ** k <= DENSE_RATIO * len(hashes):
+        counts = np.bincount(hashes.astype(np.int64), minlength=4 ** k)
+        codes = np.flatnonzero(counts)
+        return codes.astype(np.uint64), counts[codes]
+    return np.unique(hashes, return_counts=True)
+
+
+def top_kmers(seq, k, top=20, canonical=False):
+    """JSON-ready summary: the ``top`` most frequent k-mers and totals."""
+    codes, counts = count_kmers(seq, k, canonical)
+    order = np.argsort(-counts, kind="stable")[:top]
+    total = int(counts.sum())
+    return {
+        "k": k,
+        "canonical": canonical,
+        "total_kmers": total,
+        "distinct_kmers": int(len(codes)),
+        "top": [
+            {"kmer": decode_kmer(codes[i], k), "count": int(counts[i]),
+             "frequency": round(int(counts[i]) / total, 6)}
+            for i in order.tolist()
+        ],
+    }
+
+
+# --------------------------
+# --- Tandem Repeats
+# --------------------------
+def _primitive_period(unit):
+    for p in range(1, len(unit)):
+        if len(unit) % p == 0 and unit[:p] * (len(unit) // p) == unit:
+            return p
+    return len(unit)
+
+
+def tandem_repeats(seq, min_period=1, max_period=6, min_copies=3, min_length=10):
+    """Perfect tandem repeats (microsatellites) of period min_period..max_period.
+
+    A repeat of period p is a run where base i equals base i + p; runs whose
+    unit is itself periodic (e.g. ATAT for period 4) are left to the smaller
+    period. Returns dicts with 1-based inclusive coordinates, sorted by start.
+    """
+    if not 1 <= min_period <= max_period:
+        raise ValueError("Need 1 <= min_period <= max_period.")
+    data = seqcore.to_bytes(seq)
+    codes = seqcore.encode_2bit(data)
+    repeats = []
+    for p in range(min_period, max_period + 1):
+        if len(codes) <= p:
+            break
+        same = np.concatenate(([False], (codes[:-p] == codes[p:]) & (codes[p:] < 4), [False]))
+        edges = np.flatnonzero(same[1:] != same[:-1])
+        starts, ends = edges[0::2], edges[1::2]  # run of matches covers [start, end + p)
+        span = ends - starts + p
+        keep = (span >= max(min_length, min_copies * p))
+        for start, length in zip(starts[keep].tolist(), span[keep].tolist()):
+            unit = data[start:start + p].decode("ascii")
+            if _primitive_period(unit) != p:
+                continue
+            repeats.append({
+                "start": start + 1,
+                "end": start + length,
+                "period": p,
+                "unit": unit,
+                "copies": round(length / p, 2),
+                "length": length,
+            })
+    repeats.sort(key=lambda r: (r["start"], r["period"]))
+    return repeats
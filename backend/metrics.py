@@ -0,0 +1,183 @@
+# Metrics
+# Stage timings for the analyzer and a small Prometheus-style registry.
+# - ``stage(name)`` / ``@timed(name)`` time analyzer stages; outside a
+#   ``collect_stages()`` block they cost one ContextVar lookup. Nested stages are
+#   counted towards the outermost one, so stage times add up to the total.
+# - Counter, Gauge and Histogram render in the Prometheus text exposition
+#   format (version 0.0.4) without depending on prometheus_client.
+
+import math
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+
+# [{stage: [seconds, calls]}, nesting depth] while collecting, None otherwise.
+# A ContextVar, so concurrent requests (threads or asyncio tasks) each
+# collect into their own dict.
+_collecting = ContextVar("collecting_stages", default=None)
+
+
+# --------------------------
+# --- Stage Timing
+# --------------------------
+@contextmanager
+def collect_stages():
+    """Record stage timings inside the block into the yielded dict."""
+    state = [{}, 0]
+    token = _collecting.set(state)
+    try:
+        yield state[0]
+    finally:
+        _collecting.reset(token)
+
+
+@contextmanager
+def stage(name):
+    state = _collecting.get()
+    if state is None or state[1]:
+        yield
+        return
+    state[1] += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        state[1] -= 1
+        entry = state[0].setdefault(name, [0.0, 0])
+        entry[0] += time.perf_counter() - start
+        entry[1] += 1
+
+
+def timed(name):
+    """Decorator form of ``stage(name)``."""
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _collecting.get() is None:
+                return func(*args, **kwargs)
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def server_timing(stages):
+    """``Server-Timing`` header value for {name: seconds} (durations in ms)."""
+    return ", ".join(f"{name};dur={seconds * 1000:.3f}" for name, seconds in stages.items())
+
+
+# --------------------------
+# --- Registry
+# --------------------------
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{value}"' for name, value in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def set(self, value, **labels):
+        self._values[self._key(labels)] = value
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        for key, value in sorted(self._values.items()):
+            yield self.name + _format_labels(self.labels, key), value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(f"{name} {_format_value(value)}" for name, value in self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+        counts = state[0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        state[1] += value
+        state[2] += 1
+
+    def samples(self):
+        for key, (counts, total, count) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = _format_value(bound if bound == math.inf else float(bound))
+                yield self.name + "_bucket" + _format_labels(self.labels, key, [("le", le)]), cumulative
+            yield self.name + "_sum" + _format_labels(self.labels, key), total
+            yield self.name + "_count" + _format_labels(self.labels, key), count
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def _add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labels=()):
+        return self._add(Counter(name, help, labels))
+
+    def gauge(self, name, help, labels=()):
+        return self._add(Gauge(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def render(self):
+        return "\n".join(metric.render() for metric in self.metrics) + "\n"
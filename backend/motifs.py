@@ -0,0 +1,101 @@
+# Motif Search
+# Multi-pattern IUPAC motif search over both strands.
+# Patterns (and the reverse complements of the non-palindromic ones) are
+# merged into one trie; the sequence is scanned once by walking the trie
+# breadth-first with NumPy arrays of candidate positions, so patterns that
+# share a prefix share the work and each level only tests the positions
+# that survived the previous one.
+
+import numpy as np
+
+import seqcore
+
+# Bit per base: A=1, C=2, G=4, T=8 (index = 2-bit code; 4 = invalid -> 0).
+IUPAC = {
+    "A": 1, "C": 2, "G": 4, "T": 8, "U": 8,
+    "R": 5, "Y": 10, "S": 6, "W": 9, "K": 12, "M": 3,
+    "B": 14, "D": 13, "H": 11, "V": 7, "N": 15,
+}
+_IUPAC_COMPLEMENT = str.maketrans("ACGTURYSWKMBDHVN", "TGCAAYRSWMKVHDBN")
+_BASE_BITS = np.array([1, 2, 4, 8, 0], dtype=np.uint8)
+
+
+def normalize_pattern(pattern):
+    pattern = pattern.strip().upper()
+    if not pattern or any(ch not in IUPAC for ch in pattern):
+        raise ValueError(f"Invalid motif '{pattern}'; use IUPAC nucleotide codes.")
+    return pattern
+
+
+def reverse_complement_iupac(pattern):
+    return pattern.translate(_IUPAC_COMPLEMENT)[::-1]
+
+
+class MotifSet:
+    """Compiled set of named IUPAC patterns.
+
+    ``patterns`` maps name -> pattern (or is a list of patterns, used as
+    their own names). With ``both_strands`` each pattern also matches on
+    the reverse strand; palindromic patterns are reported once, as '+'.
+    """
+
+    def __init__(self, patterns, both_strands=True):
+        if not isinstance(patterns, dict):
+            patterns = {pattern: pattern for pattern in patterns}
+        if not patterns:
+            raise ValueError("No motifs given.")
+        self.patterns = {name: normalize_pattern(p) for name, p in patterns.items()}
+        # Trie node: {"children": {iupac_char: node}, "hits": [(name, strand)]}
+        self._root = {"children": {}, "hits": []}
+        for name, pattern in self.patterns.items():
+            self._insert(pattern, (name, "+"))
+            rc = reverse_complement_iupac(pattern)
+            if both_strands and rc != pattern:
+                self._insert(rc, (name, "-"))
+
+    def _insert(self, pattern, hit):
+        node = self._root
+        for ch in pattern:
+            node = node["children"].setdefault(ch, {"children": {}, "hits": []})
+        node["hits"].append(hit)
+
+    def search(self, seq):
+        """Every match as (name, strand, start, end), 1-based inclusive, sorted by start."""
+        bits = _BASE_BITS[seqcore.encode_2bit(seq)]
+        n = len(bits)
+        found = []
+        # Each frontier entry: (node, depth, candidate 0-based starts).
+        frontier = [(self._root, 0, np.arange(n, dtype=np.int64))]
+        while frontier:
+            node, depth, candidates = frontier.pop()
+            for name, strand in node["hits"]:
+                found.append((name, strand, depth, candidates))
+            in_range = candidates[candidates + depth < n]
+            if not len(in_range):
+                continue
+            for ch, child in node["children"].items():
+                survivors = in_range[(bits[in_range + depth] & IUPAC[ch]) != 0]
+                if len(survivors):
+                    frontier.append((child, depth + 1, survivors))
+
+        hits = [(name, strand, start + 1, start + length)
+                for name, strand, length, starts in found for start in starts.tolist()]
+        hits.sort(key=lambda hit: (hit[2], hit[0], hit[1]))
+        return hits
+
+
+def find_motifs(seq, patterns, both_strands=True):
+    """JSON-ready motif hits plus per-motif counts."""
+    motif_set = MotifSet(patterns, both_strands)
+    hits = motif_set.search(seq)
+    data = seqcore.to_bytes(seq)
+    counts = {name: 0 for name in motif_set.patterns}
+    for name, *_ in hits:
+        counts[name] += 1
+    return {
+        "motifs": motif_set.patterns,
+        "counts": counts,
+        "hits_found": len(hits),
+        "hits": [{"motif": name, "strand": strand, "start": start, "end": end,
+                  "match": data[start - 1:end].decode("ascii")} for name, strand, start, end in hits],
+    }
@@ -0,0 +1,198 @@
+# NCBI Client
+# Non-blocking client for the NCBI E-utilities and BLAST URL API.
+# - One pooled httpx.AsyncClient per process
+# - NCBI-compliant rate limiting: 3 req/s, or 10 req/s with an API key;
+#   BLAST calls (submit, poll, fetch) at most once every NCBI_BLAST_INTERVAL s
+# - Retries with exponential backoff on 429/5xx and network errors
+# - esummary is batched: all PubMed IDs go in one request
+#
+# Configured from the environment:
+#   NCBI_API_KEY, NCBI_EMAIL, NCBI_TOOL
+#   NCBI_EUTILS_URL, NCBI_BLAST_URL   point these at a stub server (see ncbi_stub.py)
+#   NCBI_BLAST_INTERVAL               seconds between BLAST calls (default 10)
+
+import asyncio
+import os
+import time
+
+import httpx
+
+EUTILS_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+BLAST_URL = "https://blast.ncbi.nlm.nih.gov/Blast.cgi"
+DEFAULT_EMAIL = "pandegautam01@gmail.com"
+USER_AGENT = "GautamPandey-DNAAnalyzer/1.0 (pandegautam01@gmail.com)"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class NCBIError(Exception):
+    """Raised when NCBI cannot be reached or returns an unusable response."""
+
+
+# --------------------------
+# --- Rate Limiting
+# --------------------------
+class RateLimiter:
+    """Spaces calls at least ``1 / rate`` seconds apart across all tasks."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next = max(now, self._next) + self.interval
+
+
+# --------------------------
+# --- Client
+# --------------------------
+class NCBIClient:
+    def __init__(self, eutils_url=None, blast_url=None, api_key=None, email=None,
+                 tool="dna-sequence-analyzer", timeout=30.0, retries=3, backoff=0.5,
+                 blast_interval=10.0, transport=None):
+        self.eutils_url = (eutils_url or EUTILS_URL).rstrip("/")
+        self.blast_url = blast_url or BLAST_URL
+        self.api_key = api_key
+        self.email = email or DEFAULT_EMAIL
+        self.tool = tool
+        self.retries = retries
+        self.backoff = backoff
+        self.limiter = RateLimiter(10 if api_key else 3)
+        self.blast_limiter = RateLimiter(1.0 / blast_interval) if blast_interval else None
+        self.calls = 0
+        self._client = httpx.AsyncClient(
+            timeout=timeout,
+            headers={"User-Agent": USER_AGENT},
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+            transport=transport,
+        )
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            eutils_url=os.environ.get("NCBI_EUTILS_URL"),
+            blast_url=os.environ.get("NCBI_BLAST_URL"),
+            api_key=os.environ.get("NCBI_API_KEY"),
+            email=os.environ.get("NCBI_EMAIL"),
+            tool=os.environ.get("NCBI_TOOL", "dna-sequence-analyzer"),
+            blast_interval=float(os.environ.get("NCBI_BLAST_INTERVAL", 10)),
+        )
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    async def request(self, method, url, limiter=None, **kwargs):
+        """Send a rate-limited request, retrying transient failures."""
+        limiter = limiter or self.limiter
+        for attempt in range(self.retries + 1):
+            await limiter.acquire()
+            self.calls += 1
+            try:
+                response = await self._client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                if attempt == self.retries:
+                    raise NCBIError(f"NCBI request failed: {e}") from e
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+                continue
+            if response.status_code in RETRY_STATUSES and attempt < self.retries:
+                retry_after = response.headers.get("Retry-After", "")
+                delay = float(retry_after) if retry_after.isdigit() else self.backoff * 2 ** attempt
+                await asyncio.sleep(delay)
+                continue
+            if response.status_code >= 400:
+                raise NCBIError(f"NCBI returned HTTP {response.status_code}.")
+            return response
+
+    def _eutils_params(self, **params):
+        params.update({"retmode": "json", "tool": self.tool, "email": self.email})
+        if self.api_key:
+            params["api_key"] = self.api_key
+        return params
+
+    # --------------------------
+    # --- E-utilities
+    # --------------------------
+    async def esearch(self, db, term, retmax=20):
+        response = await self.request("GET", f"{self.eutils_url}/esearch.fcgi",
+                                      params=self._eutils_params(db=db, term=term, retmax=retmax))
+        return response.json().get("esearchresult", {}).get("idlist", [])
+
+    async def esummary(self, db, ids):
+        """Summaries for many IDs in a single request, keyed by ID."""
+        if not ids:
+            return {}
+        response = await self.request("POST", f"{self.eutils_url}/esummary.fcgi",
+                                      data=self._eutils_params(db=db, id=",".join(ids)))
+        result = response.json().get("result", {})
+        return {uid: result.get(uid, {}) for uid in result.get("uids", ids)}
+
+    async def search_literature(self, seq, max_results=5):
+        """Async counterpart of analyzer.search_literature_by_sequence."""
+        try:
+            id_list = await self.esearch("pubmed", seq, retmax=max_results)
+            summaries = await self.esummary("pubmed", id_list)
+        except (NCBIError, ValueError) as e:
+            return {"status": "error", "message": str(e)}
+
+        results = [{
+            'id': pubmed_id,
+            'title': summaries.get(pubmed_id, {}).get('title', 'No Title'),
+            'url': f"https://pubmed.ncbi.nlm.nih.gov/{pubmed_id}/"
+        } for pubmed_id in id_list]
+        return {"status": "success", "count": len(results), "results": results}
+
+    # --------------------------
+    # --- BLAST
+    # --------------------------
+    async def blast_submit(self, primer_seq, program="blastn", database="nt"):
+        """Async counterpart of analyzer.blast_primer: submit and return the RID."""
+        params = {
+            "CMD": "Put",
+            "PROGRAM": program,
+            "DATABASE": database,
+            "QUERY": primer_seq,
+            "MEGABLAST": "on",
+            "EMAIL": self.email,
+            "TOOL": self.tool,
+        }
+        try:
+            response = await self.request("POST", self.blast_url, data=params,
+                                          limiter=self.blast_limiter or self.limiter)
+        except NCBIError:
+            return {"status": "failed", "message": "BLAST request failed. Try again later."}
+        if "RID =" not in response.text:
+            return {"status": "failed", "message": "BLAST request failed. Try again later."}
+
+        rid = response.text.split("RID = ")[1].split("\n")[0].strip()
+        blast_result_url = f"{self.blast_url}?CMD=Get&RID={rid}"
+        result = {"status": "success", "rid": rid, "result_url": blast_result_url}
+        if "RTOE = " in response.text:
+            rtoe = response.text.split("RTOE = ")[1].split("\n")[0].strip()
+            if rtoe.isdigit():
+                result["rtoe"] = int(rtoe)
+        return result
+
+    async def blast_status(self, rid):
+        """Search status of a RID: 'WAITING', 'READY', 'FAILED' or 'UNKNOWN'."""
+        response = await self.request("GET", self.blast_url,
+                                      params={"CMD": "Get", "FORMAT_OBJECT": "SearchInfo", "RID": rid},
+                                      limiter=self.blast_limiter or self.limiter)
+        for status in ("WAITING", "READY", "FAILED", "UNKNOWN"):
+            if f"Status={status}" in response.text:
+                return status
+        return "UNKNOWN"
+
+    async def blast_results(self, rid):
+        """Fetch a finished search as single-file JSON (FORMAT_TYPE=JSON2_S)."""
+        response = await self.request("GET", self.blast_url,
+                                      params={"CMD": "Get", "FORMAT_TYPE": "JSON2_S", "RID": rid},
+                                      limiter=self.blast_limiter or self.limiter)
+        try:
+            return response.json()
+        except ValueError:
+            raise NCBIError("BLAST results were not valid JSON.") from None
@@ -0,0 +1,80 @@
+# NCBI Stub Server
+# A tiny local stand-in for the E-utilities and BLAST URL API, for
+# developing and testing without network access or NCBI rate limits.
+#   uvicorn ncbi_stub:app --port 8001
+#   NCBI_EUTILS_URL=http://localhost:8001/entrez/eutils \
+#   NCBI_BLAST_URL=http://localhost:8001/Blast.cgi uvicorn api:app
+# GET /stats reports how many calls each endpoint received.
+
+from collections import Counter
+
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
+
+app = FastAPI(title="NCBI stub")
+calls = Counter()
+polls = Counter()
+queries = {}
+
+
+async def _params(request):
+    params = dict(request.query_params)
+    if request.method == "POST":
+        params.update(await request.form())
+    return params
+
+
+@app.api_route("/entrez/eutils/esearch.fcgi", methods=["GET", "POST"])
+async def esearch(request: Request):
+    calls["esearch"] += 1
+    params = await _params(request)
+    retmax = int(params.get("retmax", 20))
+    ids = [str(1000 + i) for i in range(min(retmax, 3))]
+    return {"esearchresult": {"count": str(len(ids)), "idlist": ids}}
+
+
+@app.api_route("/entrez/eutils/esummary.fcgi", methods=["GET", "POST"])
+async def esummary(request: Request):
+    calls["esummary"] += 1
+    params = await _params(request)
+    ids = [i for i in params.get("id", "").split(",") if i]
+    result = {"uids": ids}
+    for uid in ids:
+        result[uid] = {"uid": uid, "title": f"Stub article {uid}"}
+    return {"result": result}
+
+
+@app.api_route("/Blast.cgi", methods=["GET", "POST"])
+async def blast(request: Request):
+    params = await _params(request)
+    cmd = params.get("CMD", "")
+    calls[f"blast_{cmd.lower()}"] += 1
+    if cmd == "Put":
+        rid = f"STUB{calls['blast_put']:04d}"
+        queries[rid] = params.get("QUERY", "")
+        return PlainTextResponse(f"<!--QBlastInfoBegin\n    RID = {rid}\n    RTOE = 1\nQBlastInfoEnd\n-->")
+    rid = params.get("RID", "")
+    if cmd == "Get" and rid not in queries:
+        return PlainTextResponse("QBlastInfoBegin\n\tStatus=UNKNOWN\nQBlastInfoEnd")
+    if cmd == "Get" and params.get("FORMAT_OBJECT") == "SearchInfo":
+        # Every search is WAITING on its first poll and READY afterwards.
+        polls[rid] += 1
+        status = "WAITING" if polls[rid] == 1 else "READY"
+        return PlainTextResponse(f"QBlastInfoBegin\n\tStatus={status}\nQBlastInfoEnd")
+    if cmd == "Get":
+        query = queries[rid]
+        hsp = {"num": 1, "bit_score": 2.0 * len(query), "score": len(query), "evalue": 0.01,
+               "identity": len(query), "align_len": len(query), "gaps": 0,
+               "query_from": 1, "query_to": len(query), "hit_from": 101,
+               "hit_to": 100 + len(query), "hit_strand": "Plus"}
+        hit = {"num": 1, "len": 5000, "hsps": [hsp],
+               "description": [{"accession": "NM_000000.1", "title": "Stub hit", "taxid": 9606,
+                                "sciname": "Homo sapiens"}]}
+        report = {"program": "blastn", "results": {"search": {"query_len": len(query), "hits": [hit]}}}
+        return {"BlastOutput2": [{"report": report}]}
+    return PlainTextResponse("Unknown CMD", status_code=400)
+
+
+@app.get("/stats")
+async def stats():
+    return dict(calls)
@@ -0,0 +1,303 @@
+# Off-Target Search
+# Local primer specificity check against indexed reference sequences, as an
+# offline alternative to BLASTing primers at NCBI.
+# An index directory holds NumPy arrays that are memory-mapped on open:
+#   codes.npy      every reference base as a 2-bit code (4 = N / separator)
+#   offsets.npy    direct-address table: seeds with hash h start at offsets[h]
+#   positions.npy  seed start positions, grouped by hash
+#   meta.json      seed length and reference names / coordinates
+# A search looks up seeds of each primer and of its reverse complement,
+# then verifies each candidate diagonal against the reference with
+# vectorized mismatch counting. Seeds come from splitting the primer
+# into mismatches + 1 pieces, so every site within the mismatch limit is
+# found (pigeonhole); pieces shorter than k are looked up as a contiguous
+# range of the table. The last k - 1 starts before each reference end or
+# N are indexed as seeds truncated there, so a short piece at a reference
+# end is found too. Indexes built before that need rebuilding.
+#   python offtarget.py build refs.fa.gz offtarget/refs -k 10
+#   python offtarget.py search offtarget/refs ACGT... ACGT...
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+import seqcore
+from kmers import kmer_hashes
+
+DEFAULT_K = 10
+MAX_INDEX_K = 14  # 4**14 offsets = 2 GB of int64; keep the table reasonable
+SEPARATOR = 4
+THREE_PRIME_WINDOW = 5
+BUILD_CHUNK = 1 << 22  # bases hashed and sorted at a time while building
+
+
+# --------------------------
+# --- Building
+# --------------------------
+def build_index(path, records, k=DEFAULT_K, chunk=BUILD_CHUNK):
+    """Index ``(name, sequence)`` records into directory ``path``.
+
+    Bases are streamed to disk as records arrive and seeds are sorted in
+    two passes over ``chunk``-base slices (count per hash, then place each
+    slice into the memory-mapped positions), so memory stays at the
+    offsets table plus one slice however large the references are.
+    """
+    if not 4 <= k <= MAX_INDEX_K:
+        raise ValueError(f"Seed length must be between 4 and {MAX_INDEX_K}.")
+    os.makedirs(path, exist_ok=True)
+    raw_path = os.path.join(path, "codes.raw")
+    try:
+        references, total = _write_codes(raw_path, records, k)
+        codes = np.lib.format.open_memmap(os.path.join(path, "codes.npy"), mode="w+",
+                                          dtype=np.uint8, shape=(total,))
+        raw = np.memmap(raw_path, dtype=np.uint8, mode="r")
+        for lo in range(0, total, chunk):
+            codes[lo:lo + chunk] = raw[lo:lo + chunk]
+        del raw
+    finally:
+        if os.path.exists(raw_path):
+            os.remove(raw_path)
+
+    counts = np.zeros(4 ** k, dtype=np.int64)
+    for _, hashes in _seed_chunks(codes, k, chunk):
+        found, found_counts = np.unique(hashes, return_counts=True)
+        counts[found] += found_counts
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    del counts
+
+    # Each slice's seeds land in hash order, so the writes into positions
+    # sweep the file front to back once per slice.
+    positions = np.lib.format.open_memmap(os.path.join(path, "positions.npy"), mode="w+",
+                                          dtype=np.uint32, shape=(int(offsets[-1]),))
+    cursor = offsets[:-1].astype(np.uint32)
+    for seed_positions, hashes in _seed_chunks(codes, k, chunk):
+        order = np.argsort(hashes, kind="stable")
+        hashes, seed_positions = hashes[order], seed_positions[order]
+        found, first, found_counts = np.unique(hashes, return_index=True, return_counts=True)
+        rank = np.arange(len(hashes), dtype=np.uint32) - np.repeat(first, found_counts).astype(np.uint32)
+        positions[cursor[hashes] + rank] = seed_positions
+        cursor[found] += found_counts.astype(np.uint32)
+    positions.flush()
+    codes.flush()
+    del positions, codes, cursor
+
+    np.save(os.path.join(path, "offsets.npy"), offsets.astype(np.int64))
+    with open(os.path.join(path, "meta.json"), "w") as fh:
+        json.dump({"k": k, "references": references}, fh)
+    return OffTargetIndex(path)
+
+
+def _write_codes(raw_path, records, k):
+    """Append each record's 2-bit codes to ``raw_path``; (references, total bases)."""
+    references, position = [], 0
+    separator = bytes([SEPARATOR]) * k
+    with open(raw_path, "wb") as fh:
+        for name, seq in records:
+            codes = seqcore.encode_2bit(seq)
+            references.append({"name": name, "start": position, "length": len(codes)})
+            # A run of separators keeps seeds from spanning two references.
+            fh.write(codes.tobytes())
+            fh.write(separator)
+            position += len(codes) + k
+            if position >= 1 << 32:
+                raise ValueError("References are limited to 4 Gbp per index.")
+    if not references:
+        raise ValueError("No reference sequences to index.")
+    return references, position
+
+
+def _seed_chunks(codes, k, chunk):
+    """(positions as uint32, hashes as int64) of the seeds, ``chunk`` starts at a time.
+
+    Besides every k-mer without an N, each of the k - 1 starts before an N
+    or separator is a seed: its bases up to the N, padded with A (code 0).
+    A primer piece shorter than k sitting there has no whole k-mer, but it
+    still falls in the range ``_lookup`` scans for it.
+    """
+    for lo in range(0, len(codes) - k + 1, chunk):
+        window = codes[lo:lo + chunk + k - 1]
+        hashes, valid = kmer_hashes(codes_to_bytes(window), k)
+        # Bases from each start up to the next N (k or more means none in the k-mer).
+        starts = np.arange(len(hashes))
+        bad = np.append(np.flatnonzero(window > 3), len(window) + k)
+        run = bad[np.searchsorted(bad, starts)] - starts
+        seed_positions = np.flatnonzero(valid | ((run >= 1) & (run < k)))
+        # Zero the bases from the N on; whole k-mers (run >= k) are unchanged.
+        shift = (2 * np.maximum(k - run[seed_positions], 0)).astype(np.uint64)
+        hashes[seed_positions] = (hashes[seed_positions] >> shift) << shift
+        yield (seed_positions + lo).astype(np.uint32), hashes[seed_positions].astype(np.int64)
+
+
+def codes_to_bytes(codes):
+    """ASCII bases for 2-bit codes (separators become 'N')."""
+    return np.frombuffer(b"ACGTN", dtype=np.uint8)[codes].tobytes()
+
+
+# --------------------------
+# --- Searching
+# --------------------------
+class OffTargetIndex:
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as fh:
+            meta = json.load(fh)
+        self.k = meta["k"]
+        self.references = meta["references"]
+        self._ref_starts = np.array([ref["start"] for ref in self.references], dtype=np.int64)
+        self._ref_ends = self._ref_starts + np.array([ref["length"] for ref in self.references], dtype=np.int64)
+        self.codes = np.load(os.path.join(path, "codes.npy"), mmap_mode="r")
+        self.offsets = np.load(os.path.join(path, "offsets.npy"), mmap_mode="r")
+        self.positions = np.load(os.path.join(path, "positions.npy"), mmap_mode="r")
+
+    def summary(self):
+        return {
+            "k": self.k,
+            "references": len(self.references),
+            "bases": sum(ref["length"] for ref in self.references),
+            "seeds": int(len(self.positions)),
+        }
+
+    def _lookup(self, seed):
+        """Positions where the 2-bit ``seed`` (at most k bases) occurs.
+
+        Hashes are grouped in sorted order, so every indexed k-mer starting
+        with a shorter seed lies in one contiguous slice of ``positions``.
+        """
+        h = 0
+        for code in seed.tolist():
+            h = h * 4 + code
+        shift = 2 * (self.k - len(seed))
+        lo, hi = self.offsets[h << shift], self.offsets[(h + 1) << shift]
+        return self.positions[lo:hi].astype(np.int64)
+
+    def _candidates(self, codes, max_mismatches):
+        """Start positions that could hold a match with <= ``max_mismatches``.
+
+        By the pigeonhole principle, splitting the primer into
+        max_mismatches + 1 pieces leaves at least one piece matching
+        exactly; each piece is looked up by its first min(piece, k) bases.
+        """
+        pieces = max_mismatches + 1
+        bounds = np.linspace(0, len(codes), pieces + 1).astype(int)
+        found = []
+        for offset, end in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            seed = codes[offset:offset + min(end - offset, self.k)]
+            found.append(self._lookup(seed) - offset)
+        starts = np.unique(np.concatenate(found))
+        return starts[(starts >= 0) & (starts + len(codes) <= len(self.codes))]
+
+    def _sites(self, codes, strand, max_mismatches):
+        starts = self._candidates(codes, max_mismatches)
+        if not len(starts):
+            return []
+        window = self.codes[starts[:, None] + np.arange(len(codes))]
+        mismatch = window != codes
+        count = mismatch.sum(axis=1)
+        ref_index = np.searchsorted(self._ref_starts, starts, side="right") - 1
+        # A window running into the separator padding would count the
+        # padding as mismatches and report a site past the reference end.
+        keep = ((count <= max_mismatches) & ~(window == SEPARATOR).any(axis=1)
+                & (starts + len(codes) <= self._ref_ends[ref_index]))
+        starts, mismatch, count, ref_index = starts[keep], mismatch[keep], count[keep], ref_index[keep]
+        # The primer's 3' end is the right end of a '+' site, the left of a '-' site.
+        tail = mismatch[:, -THREE_PRIME_WINDOW:] if strand == "+" else mismatch[:, :THREE_PRIME_WINDOW]
+        sites = []
+        for start, n_mm, n_tail, ref in zip(starts.tolist(), count.tolist(),
+                                            tail.sum(axis=1).tolist(), ref_index.tolist()):
+            reference = self.references[ref]
+            sites.append({
+                "reference": reference["name"],
+                "strand": strand,
+                "start": start - reference["start"] + 1,
+                "end": start - reference["start"] + len(codes),
+                "mismatches": n_mm,
+                "three_prime_mismatches": n_tail,
+            })
+        return sites
+
+    def find_sites(self, primer, max_mismatches=3):
+        """Binding sites of ``primer`` on both strands with <= ``max_mismatches``.
+
+        Coordinates are 1-based on the reference's forward strand; a '-'
+        site is where the primer's reverse complement matches.
+        """
+        codes = seqcore.encode_2bit(primer)
+        if (codes > 3).any() or len(codes) < 2 * (max_mismatches + 1):
+            raise ValueError("Primers must be A, C, G, T only, with at least two bases "
+                             "per allowed mismatch plus two.")
+        rc = seqcore.encode_2bit(seqcore.reverse_complement_bytes(primer))
+        return self._sites(codes, "+", max_mismatches) + self._sites(rc, "-", max_mismatches)
+
+    def search(self, primers, max_mismatches=3, max_amplicon=3000, max_three_prime_mismatches=None):
+        """Binding sites for each primer and the amplicons any two sites would produce.
+
+        An amplicon is a '+' site followed, on the same reference, by a '-'
+        site ending at most ``max_amplicon`` bases later. Sites with more
+        than ``max_three_prime_mismatches`` mismatches in the last
+        THREE_PRIME_WINDOW bases are reported but not paired.
+        """
+        sites = {}
+        for name, primer in primers.items():
+            sites[name] = sorted(self.find_sites(primer, max_mismatches),
+                                 key=lambda s: (s["reference"], s["start"], s["strand"]))
+
+        extendable = [(name, site) for name, primer_sites in sites.items() for site in primer_sites
+                      if max_three_prime_mismatches is None
+                      or site["three_prime_mismatches"] <= max_three_prime_mismatches]
+        amplicons = []
+        for f_name, f_site in extendable:
+            if f_site["strand"] != "+":
+                continue
+            for r_name, r_site in extendable:
+                if (r_site["strand"] == "-" and r_site["reference"] == f_site["reference"]
+                        and f_site["start"] <= r_site["start"]
+                        and r_site["end"] - f_site["start"] + 1 <= max_amplicon):
+                    amplicons.append({
+                        "reference": f_site["reference"],
+                        "start": f_site["start"],
+                        "end": r_site["end"],
+                        "size": r_site["end"] - f_site["start"] + 1,
+                        "forward": f_name,
+                        "reverse": r_name,
+                        "mismatches": f_site["mismatches"] + r_site["mismatches"],
+                    })
+        amplicons.sort(key=lambda a: (a["mismatches"], a["size"]))
+        return {
+            "sites": sites,
+            "sites_found": {name: len(primer_sites) for name, primer_sites in sites.items()},
+            "amplicons_found": len(amplicons),
+            "amplicons": amplicons,
+        }
+
+
+# --------------------------
+# --- CLI
+# --------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query a local primer off-target index.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="FASTA/FASTQ (gzip ok) -> index directory")
+    build.add_argument("input")
+    build.add_argument("index")
+    build.add_argument("-k", type=int, default=DEFAULT_K, help="seed length")
+    search = commands.add_parser("search", help="report binding sites and amplicons")
+    search.add_argument("index")
+    search.add_argument("primers", nargs="+")
+    search.add_argument("--max-mismatches", type=int, default=3)
+    search.add_argument("--max-amplicon", type=int, default=3000)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        from seqio import read_records
+        index = build_index(args.index, ((r.id, r.sequence) for r in read_records(args.input)), args.k)
+        print(json.dumps(index.summary()))
+    else:
+        index = OffTargetIndex(args.index)
+        primers = {f"primer_{i}": p.upper() for i, p in enumerate(args.primers, 1)}
+        print(json.dumps(index.search(primers, args.max_mismatches, args.max_amplicon), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# ORF Engine
+# Finds open reading frames on one or both strands in a single vectorized pass.
+# Codons are encoded once (see seqcore.codon_indices); start and stop
+# positions are then grouped by frame and each start is paired with the
+# next in-frame stop via a binary search, so the scan is linear in the
+# sequence length no matter how many ATGs it contains.
+
+import numpy as np
+
+import seqcore
+
+START_CODONS = ("ATG",)
+STOP_CODONS = ("TAA", "TAG", "TGA")
+
+MODES = ("nested", "longest")
+
+_START_LUT = np.zeros(seqcore.INVALID_CODON + 1, dtype=bool)
+_START_LUT[[seqcore.codon_index(c) for c in START_CODONS]] = True
+_STOP_LUT = np.zeros(seqcore.INVALID_CODON + 1, dtype=bool)
+_STOP_LUT[[seqcore.codon_index(c) for c in STOP_CODONS]] = True
+
+
+# --------------------------
+# --- Single Strand Scan
+# --------------------------
+def _scan_strand(idx, min_length, mode):
+    """Return (frame, start, stop) arrays for one strand, 0-based.
+
+    ``idx`` holds the strand's codon indices (seqcore.codon_indices).
+    ``start`` is the first base of the start codon and ``stop`` the first
+    base of the stop codon, ordered by frame then start like the original
+    forward-frame scanner.
+    """
+    starts = np.flatnonzero(_START_LUT[idx])
+    stops = np.flatnonzero(_STOP_LUT[idx])
+
+    frames, orf_starts, orf_stops = [], [], []
+    for frame in range(3):
+        frame_starts = starts[starts % 3 == frame]
+        frame_stops = stops[stops % 3 == frame]
+        nxt = np.searchsorted(frame_stops, frame_starts)
+        has_stop = nxt < len(frame_stops)
+        frame_starts = frame_starts[has_stop]
+        nxt = nxt[has_stop]
+
+        if mode == "longest":
+            # Starts are sorted, so the first start pointing at a given stop
+            # is the outermost (longest) ORF ending there.
+            _, first = np.unique(nxt, return_index=True)
+            frame_starts = frame_starts[first]
+            nxt = nxt[first]
+
+        frame_ends = frame_stops[nxt]
+        if min_length:
+            keep = (frame_ends + 3 - frame_starts) >= min_length
+            frame_starts = frame_starts[keep]
+            frame_ends = frame_ends[keep]
+
+        frames.append(np.full(len(frame_starts), frame, dtype=np.int64))
+        orf_starts.append(frame_starts)
+        orf_stops.append(frame_ends)
+
+    return np.concatenate(frames), np.concatenate(orf_starts), np.concatenate(orf_stops)
+
+
+# --------------------------
+# --- ORF Scan
+# --------------------------
+def scan_orfs(seq, min_length=0, mode="nested", both_strands=False, indices=None):
+    """Yield ``(strand, frame, start, end)`` for every ORF in ``seq``.
+
+    Coordinates are 1-based and inclusive on the forward strand, so a
+    reverse-strand ORF reads ``reverse_complement(seq[start-1:end])``.
+    ``frame`` is 1-3 on the forward strand and -1 to -3 on the reverse one.
+    ``mode='nested'`` reports every ATG with a downstream in-frame stop;
+    ``mode='longest'`` keeps only the outermost ATG for each stop.
+    ``indices`` may pass precomputed (forward, reverse) codon indices,
+    e.g. from a SequenceContext.
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+
+    data = seqcore.to_bytes(seq)
+    if indices is None:
+        indices = (seqcore.codon_indices(data), None)
+    frames, starts, stops = _scan_strand(indices[0], min_length, mode)
+    for frame, start, stop in zip(frames.tolist(), starts.tolist(), stops.tolist()):
+        yield "+", frame + 1, start + 1, stop + 3
+
+    if both_strands:
+        n = len(data)
+        rc_idx = indices[1]
+        if rc_idx is None:
+            rc_idx = seqcore.codon_indices(seqcore.reverse_complement_bytes(data, strict=False))
+        frames, starts, stops = _scan_strand(rc_idx, min_length, mode)
+        for frame, start, stop in zip(frames.tolist(), starts.tolist(), stops.tolist()):
+            yield "-", -(frame + 1), n - (stop + 3) + 1, n - start
@@ -0,0 +1,300 @@
+# Chunked Parallel Analysis
+# Map-reduce over very long sequences (whole chromosomes and up) on all cores.
+# The sequence is copied into shared memory once; each worker task attaches
+# to it by name and reads only its own chunk, so no sequence is pickled.
+# Per-chunk results are merged in chunk order, which keeps the output
+# identical to the serial functions whatever the worker count.
+# - Base counts / GC content / stats: integer counts per chunk, summed
+#   (CpG pairs read one base past the chunk end)
+# - ORFs: each chunk scans the codons that start in it (reading two bases
+#   past its end). Starts without an in-frame stop in their chunk are carried
+#   forward and paired with the first in-frame stop of a later chunk, so an
+#   ORF may span any number of chunks. The reverse strand is scanned the
+#   same way on reverse-complemented chunks. ORF sequences and proteins are
+#   built in a second parallel pass over batches of ORFs.
+#
+# Configured from the environment:
+#   DNA_PARALLEL_WORKERS   worker processes (default: CPU count; 0 runs chunks inline)
+#   DNA_CHUNK_SIZE         bases per chunk (default 4 Mbp)
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import orfs as orfs_engine
+import seqcore
+import translation
+
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+# ORFs per sequence/protein batch, at least; more when there are many ORFs.
+MIN_ORF_BATCH = 2000
+
+
+# --------------------------
+# --- Shared Memory
+# --------------------------
+@contextmanager
+def _shared(data):
+    """Copy ``data`` into a new shared memory block; yields its name."""
+    shm = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+    try:
+        shm.buf[:len(data)] = data
+        yield shm.name
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _read(name, n, start, end, strand="+"):
+    """Bases [start, end) of the '+' or '-' strand of the shared sequence."""
+    shm = shared_memory.SharedMemory(name)
+    try:
+        if strand == "+":
+            return bytes(shm.buf[start:end])
+        return seqcore.reverse_complement_bytes(bytes(shm.buf[n - end:n - start]), strict=False)
+    finally:
+        shm.close()
+
+
+# --------------------------
+# --- Chunk Tasks (run in the workers)
+# --------------------------
+def _count_chunk(name, n, start, end, cpg=False):
+    """A, C, G, T counts of [start, end) and, with ``cpg``, the CpG pairs starting in it."""
+    data = _read(name, n, start, min(end + 1, n) if cpg else end)
+    arr = np.frombuffer(data, dtype=np.uint8)
+    counts = [int(np.count_nonzero(arr[:end - start] == base)) for base in seqcore.BASES]
+    pairs = int(np.count_nonzero((arr[:-1] == ord("C")) & (arr[1:] == ord("G")))) if cpg else 0
+    return counts, pairs
+
+
+def _scan_chunk(name, n, strand, start, end, min_length, mode):
+    """Starts and stops of the codons beginning in [start, end) of one strand.
+
+    Returns, per frame (position % 3): ORFs closed inside the chunk as
+    (starts, stops) arrays, the starts still open at its end, and the
+    chunk's first stop (-1 if none). Positions are 0-based strand
+    coordinates; a stop is the first base of the stop codon.
+    """
+    idx = seqcore.codon_indices(_read(name, n, start, min(end + 2, n), strand))
+    starts = np.flatnonzero(orfs_engine._START_LUT[idx]) + start
+    stops = np.flatnonzero(orfs_engine._STOP_LUT[idx]) + start
+    frames = []
+    for frame in range(3):
+        frame_starts = starts[starts % 3 == frame]
+        frame_stops = stops[stops % 3 == frame]
+        nxt = np.searchsorted(frame_stops, frame_starts)
+        closed = nxt < len(frame_stops)
+        open_starts = frame_starts[~closed]
+        frame_starts, nxt = frame_starts[closed], nxt[closed]
+        if mode == "longest":
+            _, first = np.unique(nxt, return_index=True)
+            frame_starts, nxt = frame_starts[first], nxt[first]
+            # Only the outermost open start can still begin a longest ORF.
+            open_starts = open_starts[:1]
+        frame_ends = frame_stops[nxt]
+        if min_length:
+            keep = (frame_ends + 3 - frame_starts) >= min_length
+            frame_starts, frame_ends = frame_starts[keep], frame_ends[keep]
+        first_stop = int(frame_stops[0]) if len(frame_stops) else -1
+        frames.append((frame_starts, frame_ends, open_starts, first_stop))
+    return frames
+
+
+def _orf_batch(name, n, strand, starts, stops, as_text):
+    """Sequences and proteins of same-frame ORFs, sorted by start, on one strand."""
+    lo, hi = int(starts[0]), int(stops[-1]) + 3
+    region = _read(name, n, lo, hi, strand)
+    protein = translation.translate(region, read_through=True)
+    if as_text:
+        region = region.decode("ascii")
+    sequences, proteins = [], []
+    for start, stop in zip((starts - lo).tolist(), (stops - lo).tolist()):
+        sequences.append(region[start:stop + 3])
+        proteins.append(protein[start // 3:stop // 3])
+    return sequences, proteins
+
+
+# --------------------------
+# --- Merging
+# --------------------------
+def _merge_frame(chunks, min_length, mode):
+    """Join one frame's per-chunk scans (in chunk order) into sorted (starts, stops)."""
+    starts, stops, pending = [], [], np.empty(0, dtype=np.int64)
+    for chunk_starts, chunk_stops, open_starts, first_stop in chunks:
+        if first_stop >= 0 and len(pending):
+            if mode == "longest":
+                # The open start from an earlier chunk is outermost for this stop.
+                pending = pending[:1]
+                keep = chunk_stops != first_stop
+                chunk_starts, chunk_stops = chunk_starts[keep], chunk_stops[keep]
+            if min_length:
+                pending = pending[first_stop + 3 - pending >= min_length]
+            starts.append(pending)
+            stops.append(np.full(len(pending), first_stop, dtype=np.int64))
+            pending = pending[:0]
+        starts.append(chunk_starts)
+        stops.append(chunk_stops)
+        if first_stop >= 0:
+            pending = open_starts
+        elif mode == "nested" or not len(pending):
+            pending = np.concatenate((pending, open_starts))
+    starts = np.concatenate(starts) if starts else np.empty(0, dtype=np.int64)
+    stops = np.concatenate(stops) if stops else np.empty(0, dtype=np.int64)
+    order = np.argsort(starts, kind="stable")
+    return starts[order], stops[order]
+
+
+def _stats(counts, cpg, length):
+    a, c, g, t = counts
+    return {
+        "length": length,
+        "base_counts": {"A": a, "C": c, "G": g, "T": t},
+        "gc_content": round(((g + c) / length) * 100, 2) if length else 0.0,
+        "gc_skew": round((g - c) / (g + c), 4) if g + c else None,
+        "cpg_count": cpg,
+        "cpg_oe": round(cpg * length / (c * g), 4) if c * g else None,
+    }
+
+
+def sequence_stats(seq):
+    """Length, base counts, GC%, GC skew and CpG observed/expected (serial)."""
+    arr = seqcore.as_array(seq)
+    counts = [int(np.count_nonzero(arr == base)) for base in seqcore.BASES]
+    cpg = int(np.count_nonzero((arr[:-1] == ord("C")) & (arr[1:] == ord("G"))))
+    return _stats(counts, cpg, len(arr))
+
+
+# --------------------------
+# --- Chunked Analyzer
+# --------------------------
+class ChunkedAnalyzer:
+    """Run analyses chunk by chunk in a process pool; results match the serial path."""
+
+    def __init__(self, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.chunk_size = chunk_size
+        self._pool = None
+
+    @classmethod
+    def from_env(cls):
+        workers = os.environ.get("DNA_PARALLEL_WORKERS")
+        return cls(
+            workers=int(workers) if workers else None,
+            chunk_size=int(os.environ.get("DNA_CHUNK_SIZE", DEFAULT_CHUNK_SIZE)),
+        )
+
+    def start(self):
+        if self.workers and self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _map(self, func, calls):
+        """``[func(*args) for args in calls]``, in the pool when there is one."""
+        if not self.workers:
+            return [func(*args) for args in calls]
+        self.start()
+        futures = [self._pool.submit(func, *args) for args in calls]
+        return [future.result() for future in futures]
+
+    def _chunks(self, n):
+        return [(start, min(start + self.chunk_size, n)) for start in range(0, n, self.chunk_size)]
+
+    # --------------------------
+    # --- Composition
+    # --------------------------
+    def _counts(self, data, cpg=False):
+        """Summed [A, C, G, T] counts and CpG pairs over all chunks."""
+        with _shared(data) as name:
+            results = self._map(_count_chunk, [(name, len(data), start, end, cpg)
+                                               for start, end in self._chunks(len(data))])
+        counts = [sum(chunk[i] for chunk, _ in results) for i in range(4)]
+        return counts, sum(pairs for _, pairs in results)
+
+    def base_counts(self, seq):
+        """Same as seqcore.base_counts."""
+        counts, _ = self._counts(seqcore.to_bytes(seq))
+        return {chr(base): count for base, count in zip(seqcore.BASES, counts)}
+
+    def gc_content(self, seq):
+        """Same as analyzer.gc_content."""
+        (_, c, g, _), _ = self._counts(seqcore.to_bytes(seq))
+        return round(((g + c) / len(seq)) * 100, 2)
+
+    def stats(self, seq):
+        """Same as sequence_stats."""
+        data = seqcore.to_bytes(seq)
+        counts, cpg = self._counts(data, cpg=True)
+        return _stats(counts, cpg, len(data))
+
+    # --------------------------
+    # --- ORFs
+    # --------------------------
+    def find_orfs_with_translation(self, seq, min_length=0, mode="nested", both_strands=False,
+                                   include_sequence=True):
+        """Same list as analyzer.find_orfs_with_translation."""
+        if mode not in orfs_engine.MODES:
+            raise ValueError(f"mode must be one of {orfs_engine.MODES}, got {mode!r}")
+        data = seqcore.to_bytes(seq)
+        n = len(data)
+        strands = ("+", "-") if both_strands else ("+",)
+        with _shared(data) as name:
+            calls = [(name, n, strand, start, end, min_length, mode)
+                     for strand in strands for start, end in self._chunks(max(n - 2, 0))]
+            scans = iter(self._map(_scan_chunk, calls))
+            # (strand, frame, starts, stops) in scan_orfs order
+            groups = []
+            for strand in strands:
+                chunks = [next(scans) for _ in self._chunks(max(n - 2, 0))]
+                for frame in range(3):
+                    starts, stops = _merge_frame([chunk[frame] for chunk in chunks], min_length, mode)
+                    groups.append((strand, frame, starts, stops))
+
+            if include_sequence:
+                total = sum(len(starts) for _, _, starts, _ in groups)
+                size = max(MIN_ORF_BATCH, -(-total // (max(self.workers, 1) * 4)))
+                calls = [(name, n, strand, starts[i:i + size], stops[i:i + size], isinstance(seq, str))
+                         for strand, _, starts, stops in groups for i in range(0, len(starts), size)]
+                built = iter(self._map(_orf_batch, calls))
+
+        found = []
+        for strand, frame, starts, stops in groups:
+            if strand == "+":
+                frame, begins, ends = frame + 1, starts + 1, stops + 3
+            else:
+                frame, begins, ends = -(frame + 1), n - (stops + 3) + 1, n - starts
+            if include_sequence:
+                sequences, proteins = [], []
+                for i in range(0, len(starts), size):
+                    batch_sequences, batch_proteins = next(built)
+                    sequences += batch_sequences
+                    proteins += batch_proteins
+            for i, (start, end) in enumerate(zip(begins.tolist(), ends.tolist())):
+                orf = {
+                    'start': start,
+                    'end': end,
+                    'length': end - start + 1,
+                }
+                if both_strands:
+                    orf['strand'] = strand
+                    orf['frame'] = frame
+                if include_sequence:
+                    orf['sequence'] = sequences[i]
+                    orf['protein'] = proteins[i]
+                found.append(orf)
+        return found
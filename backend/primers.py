@@ -0,0 +1,288 @@
+# Primer Design
+# Scores every candidate primer window in both flanks of a template and
+# returns the best forward/reverse pairs.
+# - Tm: nearest-neighbour thermodynamics (SantaLucia 1998 unified
+#   parameters) with entropy salt correction; Mg2+ is folded into an
+#   equivalent Na+ concentration (von Ahsen 2001)
+# - Tm and GC for every window and length come from prefix sums over the
+#   template, so a full scan is a handful of NumPy operations
+# - GC clamp, self-complementarity, hairpin and primer-dimer checks run only
+#   on the shortlisted candidates
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+import seqcore
+
+R = 1.987  # gas constant, cal / (K mol)
+
+# --------------------------
+# --- Nearest-Neighbour Parameters
+# --------------------------
+# dH (kcal/mol) and dS (cal/K/mol) per dinucleotide on the top strand.
+_NN = {
+    "AA": (-7.9, -22.2), "TT": (-7.9, -22.2),
+    "AT": (-7.2, -20.4),
+    "TA": (-7.2, -21.3),
+    "CA": (-8.5, -22.7), "TG": (-8.5, -22.7),
+    "GT": (-8.4, -22.4), "AC": (-8.4, -22.4),
+    "CT": (-7.8, -21.0), "AG": (-7.8, -21.0),
+    "GA": (-8.2, -22.2), "TC": (-8.2, -22.2),
+    "CG": (-10.6, -27.2),
+    "GC": (-9.8, -24.4),
+    "GG": (-8.0, -19.9), "CC": (-8.0, -19.9),
+}
+# Initiation by terminal base pair.
+_INIT_GC = (0.1, -2.8)
+_INIT_AT = (2.3, 4.1)
+
+# Lookup tables indexed by 2-bit codes (A=0, C=1, G=2, T=3).
+_NN_DH = np.zeros(16)
+_NN_DS = np.zeros(16)
+for _pair, (_dh, _ds) in _NN.items():
+    _idx = seqcore.BASES.index(_pair[0].encode()) * 4 + seqcore.BASES.index(_pair[1].encode())
+    _NN_DH[_idx] = _dh
+    _NN_DS[_idx] = _ds
+_INIT_DH = np.array([_INIT_AT[0], _INIT_GC[0], _INIT_GC[0], _INIT_AT[0]])
+_INIT_DS = np.array([_INIT_AT[1], _INIT_GC[1], _INIT_GC[1], _INIT_AT[1]])
+_IS_GC = np.array([0, 1, 1, 0])
+_COMPLEMENT = {"A": "T", "T": "A", "G": "C", "C": "G"}
+
+
+@dataclass
+class PrimerConditions:
+    """Reaction conditions used for Tm (Primer3's defaults)."""
+    na: float = 50.0          # monovalent cations, mM
+    mg: float = 1.5           # Mg2+, mM
+    dntp: float = 0.6         # dNTPs, mM
+    oligo_nm: float = 50.0    # primer concentration, nM
+
+    def na_equivalent(self):
+        free_mg = max(self.mg - self.dntp, 0.0)
+        return (self.na + 120 * math.sqrt(free_mg)) / 1000.0  # molar
+
+    def concentration_term(self):
+        return R * math.log(self.oligo_nm * 1e-9 / 4)
+
+
+# --------------------------
+# --- Tm / GC
+# --------------------------
+def primer_tm(primer, conditions=None):
+    """Nearest-neighbour Tm (deg C) of a single primer."""
+    codes = seqcore.encode_2bit(primer).astype(np.int64)
+    if len(codes) < 2 or (codes > 3).any():
+        raise ValueError("Primer must be at least 2 bases of A, C, G, T.")
+    tm, _ = _window_tm_gc(codes, len(codes), conditions or PrimerConditions())
+    return round(float(tm[0]), 2)
+
+
+def _window_tm_gc(codes, length, conditions):
+    """Tm and GC% of every window of ``length`` over 2-bit ``codes``."""
+    dinuc = codes[:-1] * 4 + codes[1:]
+    dh = np.concatenate(([0.0], np.cumsum(_NN_DH[dinuc])))
+    ds = np.concatenate(([0.0], np.cumsum(_NN_DS[dinuc])))
+    gc = np.concatenate(([0], np.cumsum(_IS_GC[codes])))
+
+    n_windows = len(codes) - length + 1
+    starts = np.arange(n_windows)
+    ends = starts + length - 1
+    first, last = codes[starts], codes[ends]
+    window_dh = dh[ends] - dh[starts] + _INIT_DH[first] + _INIT_DH[last]
+    window_ds = ds[ends] - ds[starts] + _INIT_DS[first] + _INIT_DS[last]
+    window_ds = window_ds + 0.368 * (length - 1) * math.log(conditions.na_equivalent())
+    tm = window_dh * 1000.0 / (window_ds + conditions.concentration_term()) - 273.15
+    gc_pct = (gc[starts + length] - gc[starts]) * 100.0 / length
+    return tm, gc_pct
+
+
+# --------------------------
+# --- Secondary Structure Checks
+# --------------------------
+def _pairs(a, b):
+    return _COMPLEMENT.get(a) == b
+
+
+def max_complementarity(a, b, three_prime=False):
+    """Longest run of Watson-Crick pairs between ``a`` and ``b`` antiparallel.
+
+    With ``three_prime`` only runs that include the last base of ``a`` count,
+    which is what makes a dimer extendable by the polymerase.
+    """
+    rb = b[::-1]
+    best = 0
+    for shift in range(-len(rb) + 1, len(a)):
+        run = 0
+        for i in range(max(0, shift), min(len(a), shift + len(rb))):
+            if _pairs(a[i], rb[i - shift]):
+                run += 1
+                if not three_prime or i == len(a) - 1:
+                    best = max(best, run)
+            else:
+                run = 0
+    return best
+
+
+def hairpin_stem(primer, min_loop=3):
+    """Longest stem a primer can form with itself across a loop of >= min_loop."""
+    n = len(primer)
+    best = 0
+    for i in range(n):
+        for j in range(n - 1, i + min_loop, -1):
+            stem = 0
+            while (i + stem < j - stem - min_loop
+                   and _pairs(primer[i + stem], primer[j - stem])):
+                stem += 1
+            best = max(best, stem)
+    return best
+
+
+def gc_clamp(primer, window=5):
+    """G/C count in the 3'-terminal ``window`` bases."""
+    tail = primer[-window:]
+    return tail.count("G") + tail.count("C")
+
+
+# --------------------------
+# --- Candidate Scan
+# --------------------------
+def scan_candidates(codes, lengths, conditions, tm_range, gc_range, tm_target):
+    """All windows within ``tm_range`` and ``gc_range``, as (penalty, start, length, tm, gc) arrays."""
+    found = []
+    # Windows spanning a non-ACGT base are never primers. Their codes are
+    # clamped into the parameter tables first, then the windows are masked.
+    bad = np.concatenate(([0], np.cumsum(codes > 3)))
+    codes = np.minimum(codes, 3)
+    for length in lengths:
+        if len(codes) < length:
+            continue
+        tm, gc = _window_tm_gc(codes, length, conditions)
+        ok = (tm >= tm_range[0]) & (tm <= tm_range[1]) & (gc >= gc_range[0]) & (gc <= gc_range[1])
+        ok &= (bad[length:] - bad[:-length]) == 0
+        starts = np.flatnonzero(ok)
+        penalty = np.abs(tm[starts] - tm_target) + np.abs(gc[starts] - 50.0) / 10.0
+        found.append((penalty, starts, np.full(len(starts), length), tm[starts], gc[starts]))
+    if not found:
+        return tuple(np.empty(0) for _ in range(5))
+    return tuple(np.concatenate(column) for column in zip(*found))
+
+
+def _shortlist(seq, scan, limit, strand, template_len, max_self, max_hairpin, clamp):
+    penalty, starts, lengths, tms, gcs = scan
+    order = np.argsort(penalty, kind="stable")
+    picked = []
+    for k in order:
+        if len(picked) >= limit:
+            break
+        start, length = int(starts[k]), int(lengths[k])
+        primer = seq[start:start + length]
+        self_comp = max_complementarity(primer, primer)
+        hairpin = hairpin_stem(primer)
+        clamp_gc = gc_clamp(primer)
+        if self_comp > max_self or hairpin > max_hairpin or not clamp[0] <= clamp_gc <= clamp[1]:
+            continue
+        if strand == "+":
+            first, last = start + 1, start + length
+        else:
+            # ``seq`` is the reverse complement here; map back to the template.
+            first, last = template_len - start - length + 1, template_len - start
+        picked.append({
+            "sequence": primer,
+            "start": first,
+            "end": last,
+            "length": length,
+            "tm": round(float(tms[k]), 2),
+            "gc_content": round(float(gcs[k]), 2),
+            "gc_clamp": clamp_gc,
+            "self_complementarity": self_comp,
+            "hairpin": hairpin,
+            "penalty": round(float(penalty[k]), 3),
+        })
+    return picked
+
+
+# --------------------------
+# --- Pair Design
+# --------------------------
+def design_primers(seq, length_range=(18, 25), tm_range=(57.0, 63.0), tm_target=60.0,
+                   gc_range=(40.0, 60.0), flank=None, product_range=None, top_k=5,
+                   max_self_complementarity=8, max_hairpin=4, max_dimer=8,
+                   max_three_prime_dimer=4, gc_clamp_range=(1, 3), max_tm_difference=5.0,
+                   conditions=None, shortlist=50):
+    """Best ``top_k`` forward/reverse primer pairs for amplifying ``seq``.
+
+    Forward primers start within the first ``flank`` bases and reverse
+    primers end within the last ``flank`` bases (default: anywhere).
+    ``product_range`` bounds the amplicon length. Coordinates are 1-based
+    on the template; the reverse primer's sequence is 5'->3' on the
+    opposite strand. Windows containing N or other non-ACGT bases are
+    skipped. Returns a dict with the pairs and candidate counts.
+    """
+    if not 2 <= length_range[0] <= length_range[1]:
+        raise ValueError(f"Invalid primer length range {length_range[0]}-{length_range[1]}.")
+    if tm_range[0] > tm_range[1] or gc_range[0] > gc_range[1]:
+        raise ValueError("Tm and GC ranges must be given as (min, max).")
+    conditions = conditions or PrimerConditions()
+    if isinstance(seq, bytes):
+        seq = seq.decode("ascii")
+    # Soft-masked (lowercase) bases are still primer sites; N never is.
+    seq = seq.upper()
+    n = len(seq)
+    flank = n if flank is None else min(flank, n)
+    lengths = range(length_range[0], length_range[1] + 1)
+
+    left = seq[:flank]
+    right_rc = seqcore.reverse_complement_bytes(seq[n - flank:], strict=False).decode("ascii")
+    fwd_scan = scan_candidates(seqcore.encode_2bit(left).astype(np.int64), lengths, conditions,
+                               tm_range, gc_range, tm_target)
+    rev_scan = scan_candidates(seqcore.encode_2bit(right_rc).astype(np.int64), lengths, conditions,
+                               tm_range, gc_range, tm_target)
+
+    checks = (max_self_complementarity, max_hairpin, gc_clamp_range)
+    forward = _shortlist(left, fwd_scan, shortlist, "+", n, *checks)
+    # Reverse-strand coordinates are relative to the right flank's reverse complement.
+    reverse = _shortlist(right_rc, rev_scan, shortlist, "-", flank, *checks)
+    for primer in reverse:
+        primer["start"] += n - flank
+        primer["end"] += n - flank
+
+    candidates = []
+    for f in forward:
+        for r in reverse:
+            product = r["end"] - f["start"] + 1
+            if r["start"] <= f["end"]:
+                continue
+            if product_range and not product_range[0] <= product <= product_range[1]:
+                continue
+            tm_diff = abs(f["tm"] - r["tm"])
+            if tm_diff > max_tm_difference:
+                continue
+            candidates.append((f["penalty"] + r["penalty"] + tm_diff, f, r, product))
+    candidates.sort(key=lambda c: c[0])
+
+    pairs = []
+    for penalty, f, r, product in candidates:
+        if len(pairs) >= top_k:
+            break
+        dimer = max_complementarity(f["sequence"], r["sequence"])
+        dimer_3 = max(max_complementarity(f["sequence"], r["sequence"], three_prime=True),
+                      max_complementarity(r["sequence"], f["sequence"], three_prime=True))
+        if dimer > max_dimer or dimer_3 > max_three_prime_dimer:
+            continue
+        pairs.append({
+            "forward": f,
+            "reverse": r,
+            "product_size": product,
+            "tm_difference": round(abs(f["tm"] - r["tm"]), 2),
+            "primer_dimer": dimer,
+            "primer_dimer_3prime": dimer_3,
+            "penalty": round(penalty, 3),
+        })
+
+    return {
+        "pairs": pairs,
+        "forward_candidates": int(len(fwd_scan[0])),
+        "reverse_candidates": int(len(rev_scan[0])),
+    }
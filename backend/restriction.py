@@ -0,0 +1,105 @@
+# Restriction Map
+# Bundled table of common commercial restriction enzymes and a site/cut
+# map built on the motif engine (all enzymes are searched in one pass).
+# Sites are from REBASE; ``cut`` is the top-strand cut offset from the start
+# of the site (G^AATTC -> 1).
+
+from motifs import MotifSet, reverse_complement_iupac
+
+# name: (site, top-strand cut offset)
+ENZYMES = {
+    "AatII": ("GACGTC", 5),
+    "AccI": ("GTMKAC", 2),
+    "AflII": ("CTTAAG", 1),
+    "AgeI": ("ACCGGT", 1),
+    "AluI": ("AGCT", 2),
+    "ApaI": ("GGGCCC", 5),
+    "AscI": ("GGCGCGCC", 2),
+    "AvaI": ("CYCGRG", 1),
+    "AvrII": ("CCTAGG", 1),
+    "BamHI": ("GGATCC", 1),
+    "BglII": ("AGATCT", 1),
+    "BsrGI": ("TGTACA", 1),
+    "BstBI": ("TTCGAA", 2),
+    "ClaI": ("ATCGAT", 2),
+    "DraI": ("TTTAAA", 3),
+    "EagI": ("CGGCCG", 1),
+    "EcoRI": ("GAATTC", 1),
+    "EcoRV": ("GATATC", 3),
+    "HaeIII": ("GGCC", 2),
+    "HhaI": ("GCGC", 3),
+    "HindIII": ("AAGCTT", 1),
+    "HinfI": ("GANTC", 1),
+    "HpaI": ("GTTAAC", 3),
+    "KpnI": ("GGTACC", 5),
+    "MboI": ("GATC", 0),
+    "MfeI": ("CAATTG", 1),
+    "MluI": ("ACGCGT", 1),
+    "MspI": ("CCGG", 1),
+    "NcoI": ("CCATGG", 1),
+    "NdeI": ("CATATG", 2),
+    "NheI": ("GCTAGC", 1),
+    "NotI": ("GCGGCCGC", 2),
+    "NsiI": ("ATGCAT", 5),
+    "PacI": ("TTAATTAA", 5),
+    "PmeI": ("GTTTAAAC", 4),
+    "PstI": ("CTGCAG", 5),
+    "PvuI": ("CGATCG", 4),
+    "PvuII": ("CAGCTG", 3),
+    "SacI": ("GAGCTC", 5),
+    "SacII": ("CCGCGG", 4),
+    "SalI": ("GTCGAC", 1),
+    "ScaI": ("AGTACT", 3),
+    "SfiI": ("GGCCNNNNNGGCC", 8),
+    "SmaI": ("CCCGGG", 3),
+    "SpeI": ("ACTAGT", 1),
+    "SphI": ("GCATGC", 5),
+    "StuI": ("AGGCCT", 3),
+    "TaqI": ("TCGA", 1),
+    "XbaI": ("TCTAGA", 1),
+    "XhoI": ("CTCGAG", 1),
+    "XmaI": ("CCCGGG", 1),
+}
+
+
+def restriction_map(seq, enzymes=None, include_fragments=True):
+    """Sites and cut positions of ``enzymes`` (default: all bundled) in ``seq``.
+
+    Cut positions are 1-based: a cut at p falls between bases p and p + 1.
+    On the reverse strand the cut is mirrored within the site. Fragment
+    lengths assume a linear molecule digested with each enzyme alone.
+    """
+    names = list(ENZYMES) if enzymes is None else list(enzymes)
+    unknown = [name for name in names if name not in ENZYMES]
+    if unknown:
+        raise ValueError(f"Unknown enzyme(s) {unknown}.")
+    motif_set = MotifSet({name: ENZYMES[name][0] for name in names}, both_strands=True)
+
+    sites = {name: [] for name in names}
+    for name, strand, start, end in motif_set.search(seq):
+        site, cut = ENZYMES[name]
+        cut_at = start - 1 + cut if strand == "+" else end - cut
+        sites[name].append({"start": start, "end": end, "strand": strand, "cut": cut_at})
+
+    length = len(seq)
+    enzymes_out = {}
+    for name in names:
+        site, cut = ENZYMES[name]
+        entry = {
+            "site": site,
+            "palindromic": reverse_complement_iupac(site) == site,
+            "count": len(sites[name]),
+            "sites": sites[name],
+        }
+        if include_fragments and sites[name]:
+            cuts = sorted({s["cut"] for s in sites[name] if 0 < s["cut"] < length})
+            bounds = [0] + cuts + [length]
+            entry["fragments"] = [b - a for a, b in zip(bounds, bounds[1:])]
+        enzymes_out[name] = entry
+
+    return {
+        "length": length,
+        "enzymes": enzymes_out,
+        "unique_cutters": [name for name in names if len(sites[name]) == 1],
+        "non_cutters": [name for name in names if not sites[name]],
+    }
@@ -0,0 +1,143 @@
+# Sequence Context
+# One cleaned sequence plus its derived views, each computed on first use
+# and kept for the rest of the request:
+# - 2-bit codes and base counts (GC content comes from the counts)
+# - reverse complement and the codon indices of both strands
+# - read-through translations per (genetic code, frame)
+# - ORF coordinates per (min_length, mode, both_strands)
+# - primers, taken from the sequence and its memoized reverse complement
+# Views are built with the same seqcore / translation / orfs primitives as
+# the analyzer functions, so results are identical to calling those.
+
+import numpy as np
+
+import orfs as orfs_engine
+import seqcore
+import translation
+
+# Complement of a 2-bit code; invalid (4) stays invalid.
+_COMPLEMENT_CODE = np.array([3, 2, 1, 0, seqcore.INVALID_CODE], dtype=np.uint8)
+
+
+class SequenceContext:
+    """A DNA sequence and lazily memoized views of it.
+
+    The input is cleaned (non-ACGT dropped, upper-cased) unless ``clean``
+    is False, e.g. for stored regions that keep their N bases.
+    """
+
+    __slots__ = ("data", "_text", "_codes", "_counts", "_rc", "_rc_text",
+                 "_indices", "_rc_indices", "_proteins", "_orfs")
+
+    def __init__(self, seq, clean=True):
+        if clean:
+            cleaned = seqcore.clean_bytes(seq)
+            self.data = cleaned
+            self._text = cleaned.decode("ascii") if isinstance(seq, str) else None
+        else:
+            self.data = seqcore.to_bytes(seq)
+            self._text = seq if isinstance(seq, str) else None
+        self._codes = self._counts = self._rc = self._rc_text = None
+        self._indices = self._rc_indices = None
+        self._proteins = {}
+        self._orfs = {}
+
+    def __len__(self):
+        return len(self.data)
+
+    def __repr__(self):
+        return f"SequenceContext({len(self.data)} bp)"
+
+    @property
+    def text(self):
+        if self._text is None:
+            self._text = self.data.decode("ascii")
+        return self._text
+
+    # --------------------------
+    # --- Composition
+    # --------------------------
+    @property
+    def codes(self):
+        """2-bit code per base (A=0, C=1, G=2, T=3, other=4)."""
+        if self._codes is None:
+            self._codes = seqcore.encode_2bit(self.data)
+        return self._codes
+
+    @property
+    def base_counts(self):
+        if self._counts is None:
+            counts = np.bincount(self.codes, minlength=5).tolist()
+            self._counts = {chr(base): counts[code] for code, base in enumerate(seqcore.BASES)}
+        return self._counts
+
+    @property
+    def gc_content(self):
+        counts = self.base_counts
+        return round(((counts["G"] + counts["C"]) / len(self.data)) * 100, 2)
+
+    # --------------------------
+    # --- Reverse Strand
+    # --------------------------
+    @property
+    def reverse_complement(self):
+        """Reverse complement as bytes; non-ACGT bases are kept in place."""
+        if self._rc is None:
+            self._rc = seqcore.reverse_complement_bytes(self.data, strict=False)
+        return self._rc
+
+    @property
+    def reverse_complement_text(self):
+        if self._rc_text is None:
+            self._rc_text = self.reverse_complement.decode("ascii")
+        return self._rc_text
+
+    def codon_indices(self, strand="+"):
+        """Codon index at every position of the '+' or '-' strand."""
+        if strand == "+":
+            if self._indices is None:
+                self._indices = seqcore.codon_indices(self.data, self.codes)
+            return self._indices
+        if self._rc_indices is None:
+            rc_codes = _COMPLEMENT_CODE[self.codes[::-1]]
+            self._rc_indices = seqcore.codon_indices(None, rc_codes)
+        return self._rc_indices
+
+    # --------------------------
+    # --- Translation
+    # --------------------------
+    def translation(self, frame=1, code=1, read_through=False):
+        """Protein of one frame, as translation.translate would return it."""
+        key = (code, frame)
+        protein = self._proteins.get(key)
+        if protein is None:
+            indices = self.codon_indices("+" if frame > 0 else "-")
+            protein = translation.translate(None, code, frame, read_through=True, indices=indices)
+            self._proteins[key] = protein
+        if not read_through:
+            stop = protein.find(translation.STOP_SYMBOL)
+            if stop != -1:
+                protein = protein[:stop]
+        return protein
+
+    def six_frames(self, code=1, read_through=True):
+        return {frame: self.translation(frame, code, read_through) for frame in translation.FRAMES}
+
+    # --------------------------
+    # --- ORFs / Primers
+    # --------------------------
+    def orfs(self, min_length=0, mode="nested", both_strands=False):
+        """List of (strand, frame, start, end) tuples, as orfs.scan_orfs yields them."""
+        key = (min_length, mode, both_strands)
+        found = self._orfs.get(key)
+        if found is None:
+            indices = (self.codon_indices("+"), self.codon_indices("-") if both_strands else None)
+            found = list(orfs_engine.scan_orfs(self.data, min_length, mode, both_strands, indices))
+            self._orfs[key] = found
+        return found
+
+    def primers(self, length=20):
+        """(forward, reverse) primers like analyzer.get_primers, as str."""
+        if len(self.data) < length:
+            return ("Sequence too short", "Sequence too short")
+        return self.text[:length], self.reverse_complement_text[:length]
@@ -0,0 +1,149 @@
+# Sequence Core
+# Byte-level primitives used by the analyzer for large inputs.
+# Every function here works on ASCII ``bytes`` so that the heavy lifting
+# happens inside ``bytes.translate`` / NumPy instead of Python loops.
+# - Cleaning (drop non-ACGT, uppercase)
+# - Base counts / GC content
+# - Reverse complement
+# - Transcription
+# NumPy is imported on first use: inputs shorter than SMALL_INPUT are
+# counted with ``bytes.count``, so one-shot CLI calls on short sequences
+# never load it.
+
+import functools
+
+BASES = b"ACGT"
+# Below this many bases ``bytes.count`` beats a NumPy pass plus its import.
+SMALL_INPUT = 1 << 16
+
+# --------------------------
+# --- Translation Tables
+# --------------------------
+# Uppercase a/c/g/t, leave everything else alone (deleted separately).
+_UPPER_TABLE = bytes.maketrans(b"acgt", b"ACGT")
+# Every byte that is not a DNA letter in either case.
+_NON_DNA = bytes(b for b in range(256) if b not in b"ACGTacgt")
+# Complement table; non-ACGT bytes are left as-is and caught by validation.
+_COMPLEMENT_TABLE = bytes.maketrans(b"ACGT", b"TGCA")
+
+
+# --------------------------
+# --- Conversion
+# --------------------------
+def to_bytes(seq):
+    """Return ``seq`` as ASCII bytes without copying when it already is."""
+    if isinstance(seq, (bytes, bytearray, memoryview)):
+        return bytes(seq) if not isinstance(seq, bytes) else seq
+    return seq.encode("ascii", "ignore")
+
+
+def as_array(seq):
+    """Zero-copy ``numpy.uint8`` view over a byte sequence."""
+    import numpy as np
+    return np.frombuffer(to_bytes(seq), dtype=np.uint8)
+
+
+# --------------------------
+# --- Clean Sequence
+# --------------------------
+def clean_bytes(seq):
+    if isinstance(seq, str):
+        # A handful of non-ASCII letters uppercase to A/C/G/T (e.g. 'ẗ');
+        # upper() keeps the result identical to the original str cleaner.
+        if not seq.isascii():
+            seq = seq.upper()
+        seq = seq.encode("ascii", "ignore")
+    return to_bytes(seq).translate(_UPPER_TABLE, _NON_DNA)
+
+
+# --------------------------
+# --- Base Counts / GC Content
+# --------------------------
+def base_counts(seq):
+    """Count A, C, G and T over a uint8 view; returns a dict keyed by base."""
+    data = to_bytes(seq)
+    if len(data) < SMALL_INPUT:
+        return {chr(b): data.count(b) for b in BASES}
+    import numpy as np
+    arr = as_array(data)
+    return {chr(b): int(np.count_nonzero(arr == b)) for b in BASES}
+
+
+def gc_content_bytes(seq):
+    data = to_bytes(seq)
+    if len(data) < SMALL_INPUT:
+        gc = data.count(b"G") + data.count(b"C")
+    else:
+        import numpy as np
+        arr = as_array(data)
+        gc = int(np.count_nonzero(arr == ord("G"))) + int(np.count_nonzero(arr == ord("C")))
+    return round((gc / len(seq)) * 100, 2)
+
+
+# --------------------------
+# --- Reverse Complement
+# --------------------------
+def reverse_complement_bytes(seq, strict=True):
+    """Reverse complement of ``seq``.
+
+    With ``strict`` a non-ACGT base raises KeyError like the original dict
+    lookup did; otherwise such bases are kept in place as placeholders.
+    """
+    data = to_bytes(seq)
+    if strict:
+        invalid = data.translate(None, BASES)
+        if invalid:
+            raise KeyError(chr(invalid[-1]))
+    return data.translate(_COMPLEMENT_TABLE)[::-1]
+
+
+# --------------------------
+# --- Transcription
+# --------------------------
+def transcribe_bytes(seq):
+    return to_bytes(seq).replace(b"T", b"U")
+
+
+# --------------------------
+# --- 2-bit Codes / Codon Indices
+# --------------------------
+# A=0, C=1, G=2, T=3; anything else is flagged with INVALID_CODE.
+INVALID_CODE = 4
+INVALID_CODON = 64
+
+
+@functools.cache
+def _code_lut():
+    import numpy as np
+    lut = np.full(256, INVALID_CODE, dtype=np.uint8)
+    for code, base in enumerate(BASES):
+        lut[base] = code
+    return lut
+
+
+def encode_2bit(seq):
+    """Map each base to its 2-bit code (A=0, C=1, G=2, T=3, other=4)."""
+    return _code_lut()[as_array(seq)]
+
+
+def codon_index(codon):
+    """Integer index 0-63 of a three-letter codon such as 'ATG'."""
+    a, b, c = (BASES.index(base.encode("ascii")) for base in codon)
+    return a * 16 + b * 4 + c
+
+
+def codon_indices(seq, codes=None):
+    """Codon index starting at every position (length n - 2, uint8).
+
+    Codons that contain a non-ACGT base get ``INVALID_CODON`` (64).
+    """
+    if codes is None:
+        codes = encode_2bit(seq)
+    if len(codes) < 3:
+        import numpy as np
+        return np.empty(0, dtype=np.uint8)
+    idx = (codes[:-2] << 4) | (codes[1:-1] << 2) | codes[2:]
+    bad = codes == INVALID_CODE
+    if bad.any():
+        idx[bad[:-2] | bad[1:-1] | bad[2:]] = INVALID_CODON
+    return idx
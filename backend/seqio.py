@@ -0,0 +1,128 @@
+# Sequence I/O
+# Streaming FASTA / FASTQ readers.
+# Records are yielded one at a time from a binary line iterator, so only the
+# record currently being read is held in memory. Gzip input is detected
+# from its magic bytes, whatever the file is called.
+
+import gzip
+import io
+import zlib
+from collections import namedtuple
+
+Record = namedtuple("Record", ["id", "description", "sequence", "quality"])
+
+GZIP_MAGIC = b"\x1f\x8b"
+FORMATS = ("fasta", "fastq")
+# Raised partway through a read by a corrupt or truncated gzip stream.
+READ_ERRORS = (OSError, EOFError, zlib.error)
+
+
+# --------------------------
+# --- Opening Inputs
+# --------------------------
+def _is_path(source):
+    return isinstance(source, (str, bytes)) or hasattr(source, "__fspath__")
+
+
+def open_binary(source):
+    """Return a buffered binary stream for a path or file object, un-gzipped."""
+    if _is_path(source):
+        stream = open(source, "rb")
+    else:
+        stream = source
+        if isinstance(stream, io.TextIOBase):
+            stream = stream.buffer
+    if not hasattr(stream, "peek"):
+        stream = io.BufferedReader(stream)
+    if stream.peek(2)[:2] == GZIP_MAGIC:
+        stream = gzip.GzipFile(fileobj=stream, mode="rb")
+    return stream
+
+
+def detect_format(stream):
+    """Guess 'fasta' or 'fastq' from the first non-blank byte of a stream."""
+    head = stream.peek(1024).lstrip()
+    if head.startswith(b">"):
+        return "fasta"
+    if head.startswith(b"@"):
+        return "fastq"
+    if not head:
+        return "fasta"
+    raise ValueError("Input is neither FASTA ('>') nor FASTQ ('@').")
+
+
+def _split_header(line):
+    header = line[1:].strip().decode("utf-8", "replace")
+    name, _, description = header.partition(" ")
+    return name, description.strip()
+
+
+# --------------------------
+# --- FASTA
+# --------------------------
+def read_fasta(stream):
+    name = description = None
+    chunks = []
+    for line_no, line in enumerate(stream, 1):
+        if line.startswith(b">"):
+            if name is not None:
+                yield Record(name, description, b"".join(chunks), None)
+            name, description = _split_header(line)
+            chunks = []
+        elif name is None:
+            if line.strip():
+                raise ValueError(f"Line {line_no}: sequence data before the first '>' header.")
+        else:
+            chunks.append(line.rstrip())
+    if name is not None:
+        yield Record(name, description, b"".join(chunks), None)
+
+
+# --------------------------
+# --- FASTQ
+# --------------------------
+def read_fastq(stream):
+    lines = iter(stream)
+    line_no = 0
+    for header in lines:
+        line_no += 1
+        if not header.strip():
+            continue
+        if not header.startswith(b"@"):
+            raise ValueError(f"Line {line_no}: expected '@' header, found {header[:20]!r}.")
+        try:
+            sequence = next(lines).rstrip()
+            plus = next(lines)
+            quality = next(lines).rstrip()
+        except StopIteration:
+            raise ValueError(f"Line {line_no}: truncated FASTQ record.") from None
+        line_no += 3
+        if not plus.startswith(b"+"):
+            raise ValueError(f"Line {line_no - 1}: expected '+' separator.")
+        if len(quality) != len(sequence):
+            raise ValueError(f"Line {line_no}: quality length does not match sequence length.")
+        name, description = _split_header(header)
+        yield Record(name, description, sequence, quality)
+
+
+# --------------------------
+# --- Any Format
+# --------------------------
+def read_records(source, fmt=None):
+    """Lazily yield Records from a FASTA/FASTQ path or binary file object.
+
+    ``fmt`` is 'fasta', 'fastq' or None to detect from the content.
+    Sequences and qualities are returned as raw ``bytes``. Files opened
+    from a path are closed once the generator is exhausted or closed.
+    """
+    if fmt is not None and fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}. Choose one of {FORMATS}.")
+    stream = open_binary(source)
+    try:
+        if fmt is None:
+            fmt = detect_format(stream)
+        reader = read_fasta if fmt == "fasta" else read_fastq
+        yield from reader(stream)
+    finally:
+        if _is_path(source):
+            stream.close()
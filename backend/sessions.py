@@ -0,0 +1,162 @@
+# Sequence Sessions
+# Cleaned sequences uploaded once through POST /sequences and referenced by
+# their content hash (``sequence_id``) in later requests.
+# - ID: SHA-256 of the cleaned sequence, so uploading the same construct
+#   twice (even with different case or whitespace) returns the same ID
+# - Memory tier: LRU over the cleaned bytes, bounded by total bytes
+# - Disk spill (optional): sequences evicted from memory are written as
+#   .2bit files and reloaded on their next use; ``persist`` writes one
+#   straight away (background jobs use it to survive a restart)
+# - add, get and persist are coroutines: hashing, spilling and reloading a
+#   multi-megabase sequence run in a thread, not on the event loop
+#
+# Configured from the environment:
+#   SEQUENCE_STORE_MAX_BYTES   memory budget (default 512 MB)
+#   SEQUENCE_STORE_DIR         spill directory (unset: memory only, evicted IDs are gone)
+
+import asyncio
+import hashlib
+import os
+import re
+from collections import Counter, OrderedDict
+
+_ID_RE = re.compile(r"[0-9a-f]{64}")
+
+
+def sequence_id(cleaned):
+    """Content hash ID of a cleaned sequence (str or bytes)."""
+    data = cleaned.encode("ascii") if isinstance(cleaned, str) else cleaned
+    return hashlib.sha256(data).hexdigest()
+
+
+class SequenceSessionStore:
+    def __init__(self, max_bytes=512 * 1024 * 1024, spill_dir=None):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.size = 0
+        self.stats = Counter()
+        self._sequences = OrderedDict()
+        self._spilling = {}  # id -> bytes evicted from memory, still being written
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_bytes=int(os.environ.get("SEQUENCE_STORE_MAX_BYTES", 512 * 1024 * 1024)),
+            spill_dir=os.environ.get("SEQUENCE_STORE_DIR") or None,
+        )
+
+    def _spill_path(self, seq_id):
+        return os.path.join(self.spill_dir, f"{seq_id}.2bit")
+
+    # --------------------------
+    # --- Memory Tier
+    # --------------------------
+    async def _remember(self, seq_id, data):
+        if seq_id in self._sequences:
+            self._sequences.move_to_end(seq_id)
+            return
+        self._sequences[seq_id] = data
+        self.size += len(data)
+        # The newest sequence always stays, even when it alone is over budget.
+        evicted = []
+        while self.size > self.max_bytes and len(self._sequences) > 1:
+            evicted_id, evicted_data = self._sequences.popitem(last=False)
+            self.size -= len(evicted_data)
+            self.stats["evictions"] += 1
+            evicted.append((evicted_id, evicted_data))
+        if self.spill_dir:
+            for evicted_id, evicted_data in evicted:
+                await self._spill(evicted_id, evicted_data)
+
+    async def _spill(self, seq_id, data):
+        # Lookups are served from _spilling until the file is complete.
+        if seq_id in self._spilling:
+            return
+        self._spilling[seq_id] = data
+        try:
+            if await asyncio.to_thread(self._write, seq_id, data):
+                self.stats["spills"] += 1
+        finally:
+            if self._spilling.pop(seq_id, None) is None:
+                # Removed while it was being written.
+                await asyncio.to_thread(self._unlink, seq_id)
+
+    def _write(self, seq_id, data):
+        if os.path.exists(self._spill_path(seq_id)):
+            return False
+        from twobit import write_twobit
+        # Written under a temporary name, so a reader never sees half a file.
+        partial = f"{self._spill_path(seq_id)}.{os.getpid()}.partial"
+        write_twobit(partial, [(seq_id, data)])
+        os.replace(partial, self._spill_path(seq_id))
+        return True
+
+    def _read(self, seq_id):
+        if not os.path.exists(self._spill_path(seq_id)):
+            return None
+        from twobit import TwoBitFile
+        with TwoBitFile(self._spill_path(seq_id)) as twobit:
+            return twobit.fetch(seq_id)
+
+    # --------------------------
+    # --- Add / Lookup
+    # --------------------------
+    async def add(self, cleaned, seq_id=None):
+        """Store a cleaned sequence (bytes) and return its ID (hashed here unless given)."""
+        if seq_id is None:
+            seq_id = await asyncio.to_thread(sequence_id, cleaned)
+        await self._remember(seq_id, cleaned)
+        return seq_id
+
+    async def get(self, seq_id):
+        """The cleaned sequence (bytes) for ``seq_id``, or None when unknown or evicted."""
+        data = self._sequences.get(seq_id)
+        if data is not None:
+            self._sequences.move_to_end(seq_id)
+            self.stats["hits_memory"] += 1
+            return data
+        data = self._spilling.get(seq_id)
+        if data is None and self.spill_dir and _ID_RE.fullmatch(seq_id):
+            data = await asyncio.to_thread(self._read, seq_id)
+        if data is not None:
+            await self._remember(seq_id, data)
+            self.stats["hits_disk"] += 1
+            return data
+        self.stats["misses"] += 1
+        return None
+
+    async def persist(self, seq_id):
+        """Write ``seq_id`` to the spill directory now; False if memory-only or unknown."""
+        if not self.spill_dir or not _ID_RE.fullmatch(seq_id):
+            return False
+        data = self._sequences.get(seq_id) or self._spilling.get(seq_id)
+        if data is None:
+            return await asyncio.to_thread(os.path.exists, self._spill_path(seq_id))
+        await self._spill(seq_id, data)
+        return True
+
+    def _unlink(self, seq_id):
+        if os.path.exists(self._spill_path(seq_id)):
+            os.remove(self._spill_path(seq_id))
+            return True
+        return False
+
+    def remove(self, seq_id):
+        """Forget ``seq_id`` in both tiers; returns whether it was stored."""
+        data = self._sequences.pop(seq_id, None)
+        if data is not None:
+            self.size -= len(data)
+        spilling = self._spilling.pop(seq_id, None) is not None
+        spilled = bool(self.spill_dir) and bool(_ID_RE.fullmatch(seq_id)) and self._unlink(seq_id)
+        return data is not None or spilling or spilled
+
+    def summary(self):
+        return {
+            "sequences": len(self._sequences),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "disk": self.spill_dir is not None,
+            **self.stats,
+        }
@@ -0,0 +1,66 @@
+# Paging and Streaming Helpers
+# Opaque cursors, field selection and NDJSON output shared by the paginated
+# endpoints (/orfs, /analyze/display), and server-sent events for /jobs.
+# Everything here works on generators so a page never needs the full result
+# list in memory.
+
+import base64
+import json
+
+
+def encode_cursor(offset):
+    """Opaque cursor for resuming a listing at ``offset``."""
+    return base64.urlsafe_b64encode(f"o:{offset}".encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Offset from a cursor made by encode_cursor; None or '' means the start."""
+    if not cursor:
+        return 0
+    try:
+        text = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("ascii")
+        tag, offset = text.split(":")
+        if tag != "o" or not offset.isdigit():
+            raise ValueError
+    except ValueError:
+        raise ValueError(f"Invalid cursor '{cursor}'.") from None
+    return int(offset)
+
+
+def parse_fields(fields, allowed):
+    """Tuple of field names from a comma-separated string, or None for all."""
+    if not fields:
+        return None
+    names = tuple(name.strip() for name in fields.split(",") if name.strip())
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown field(s) {unknown}. Choose from {list(allowed)}.")
+    return names
+
+
+def select_fields(item, fields):
+    if fields is None:
+        return item
+    return {name: item[name] for name in fields if name in item}
+
+
+def page_of(items, offset, limit):
+    """(page, next_cursor) from the first ``limit + 1`` items starting at ``offset``."""
+    items = list(items)
+    if limit is not None and len(items) > limit:
+        return items[:limit], encode_cursor(offset + limit)
+    return items, None
+
+
+def ndjson(items):
+    for item in items:
+        yield json.dumps(item) + "\n"
+
+
+async def sse(events, event="status"):
+    """Server-sent events from an async iterator; None items become keep-alive comments."""
+    async for item in events:
+        if item is None:
+            yield ": keep-alive\n\n"
+        else:
+            yield f"event: {event}\ndata: {json.dumps(item, default=str)}\n\n"
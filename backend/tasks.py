@@ -0,0 +1,406 @@
+# Analysis Tasks
+# Top-level, picklable wrappers around the analyzer that build the JSON
+# bodies of the CPU-bound endpoints. They run inside executor worker
+# processes, so this module only imports the analyzer, not FastAPI.
+# The NumPy-backed engines (composition, kmers, motifs, offtarget, primers,
+# seqcontext, twobit, variants, ...) are imported by the tasks that use
+# them, so importing this module, as the API does, stays cheap.
+# Invalid input raises ValueError, which the API turns into a 400.
+
+import hashlib
+import os
+
+from analyzer import (clean_sequence, transcribe, primer_stats, iter_orfs, get_primers,
+                      find_orfs_with_translation, display_sequence_with_positions,
+                      iter_display_chunks, scan_for_mutation)
+from batch import analyze_records
+from metrics import collect_stages, stage
+from seqio import READ_ERRORS, read_records
+import seqcore
+from translation import GENETIC_CODES
+from streaming import decode_cursor, page_of, select_fields
+
+
+def profiled(func, *args):
+    """Run ``func(*args)`` and return (result, {stage: [seconds, calls]})."""
+    with collect_stages() as stages:
+        result = func(*args)
+    return result, stages
+
+
+def _clean(sequence):
+    cleaned_sequence = clean_sequence(sequence)
+    if not cleaned_sequence:
+        raise ValueError("No valid DNA sequence found.")
+    return cleaned_sequence
+
+
+def _context(sequence):
+    # One SequenceContext per task: every derived view is computed once.
+    from seqcontext import SequenceContext
+    with stage("clean"):
+        context = SequenceContext(sequence)
+    if not len(context):
+        raise ValueError("No valid DNA sequence found.")
+    return context
+
+
+# --------------------------
+# --- /analyze
+# --------------------------
+ANALYZE_FIELDS = ("cleaned_sequence", "length", "gc_content", "reverse_complement",
+                  "transcribed_mrna", "translated_protein", "forward_primer", "reverse_primer",
+                  "display_sequence", "forward_primer_stats", "reverse_primer_stats")
+
+
+def _primer_stats_dict(primer):
+    gc, tm, quality = primer_stats(primer)
+    return {"gc_content": gc, "tm": tm, "quality": quality}
+
+
+def analyze_sequence(sequence, primer_length=20, genetic_code=1, include_input=True, fields=None):
+    # include_input=False leaves out original_input so the result depends only
+    # on the cleaned sequence and can be cached by content. ``fields`` limits
+    # the output (and the work) to those keys of ANALYZE_FIELDS.
+    context = _context(sequence)
+    cleaned_sequence = context.text
+
+    builders = {
+        "cleaned_sequence": lambda: cleaned_sequence,
+        "length": lambda: len(cleaned_sequence),
+        "gc_content": lambda: context.gc_content,
+        "reverse_complement": lambda: context.reverse_complement_text,
+        "transcribed_mrna": lambda: transcribe(cleaned_sequence),
+        "translated_protein": lambda: context.translation(1, genetic_code),
+        "forward_primer": lambda: context.primers(primer_length)[0],
+        "reverse_primer": lambda: context.primers(primer_length)[1],
+        "display_sequence": lambda: display_sequence_with_positions(cleaned_sequence),
+        "forward_primer_stats": lambda: _primer_stats_dict(context.primers(primer_length)[0]),
+        "reverse_primer_stats": lambda: _primer_stats_dict(context.primers(primer_length)[1]),
+    }
+    results = {"original_input": sequence} if include_input else {}
+    for field in ANALYZE_FIELDS:
+        if fields is None or field in fields:
+            with stage(field):
+                results[field] = builders[field]()
+    return results
+
+
+def display_page(sequence, cursor=None, limit=100, chunk_size=10):
+    # One page of display_sequence rows plus the cursor for the next one.
+    cleaned_sequence = _clean(sequence)
+    offset = decode_cursor(cursor)
+    rows = iter_display_chunks(cleaned_sequence, chunk_size, offset, offset + limit + 1)
+    with stage("display"):
+        chunks, next_cursor = page_of(rows, offset, limit)
+    return {
+        "length": len(cleaned_sequence),
+        "chunk_size": chunk_size,
+        "total_chunks": -(-len(cleaned_sequence) // chunk_size),
+        "display_sequence": chunks,
+        "next_cursor": next_cursor,
+    }
+
+
+# --------------------------
+# --- /mutation
+# --------------------------
+def analyze_mutation(sequence, forward_primer, reverse_primer, mutation):
+    cleaned_sequence = _clean(sequence)
+    mutation_result = scan_for_mutation(cleaned_sequence, forward_primer, reverse_primer, mutation)
+    if not mutation_result:
+        return {"message": "No mutation analysis performed"}
+    return mutation_result
+
+
+# --------------------------
+# --- /mutations/batch
+# --------------------------
+def analyze_mutations(sequence, variants=None, vcf=None, forward_primer=None, reverse_primer=None,
+                      primer_length=20, genetic_code=1, min_orf_length=0, both_strands=True,
+                      context=10):
+    from variants import parse_variants, scan_variants
+    sequence_context = _context(sequence)
+    cleaned_sequence = sequence_context.text
+    parsed = parse_variants(variants, vcf)
+    if not parsed:
+        raise ValueError("No variants given.")
+    if not forward_primer and not reverse_primer:
+        forward_primer, reverse_primer = sequence_context.primers(primer_length)
+        if forward_primer == "Sequence too short":
+            forward_primer = reverse_primer = None
+    return scan_variants(cleaned_sequence, parsed, clean_sequence(forward_primer or ""),
+                         clean_sequence(reverse_primer or ""), genetic_code=genetic_code,
+                         min_orf_length=min_orf_length, both_strands=both_strands,
+                         context=context)
+
+
+# --------------------------
+# --- /sequences/{id}/edits
+# --------------------------
+def analyze_edits(sequence, variants=None, vcf=None, sequence_id=None, primer_length=20,
+                  genetic_code=1, min_orf_length=0, orf_mode="nested", both_strands=True,
+                  include_sequence=True, window=None):
+    # ``sequence`` comes cleaned from the session store; the IDs key the
+    # per-process base count cache (see incremental.py). Returns the delta
+    # and the edited bytes, which the API stores under the delta's sequence_id.
+    from incremental import apply_edits, edit_delta
+    from sessions import sequence_id as content_id
+    from variants import parse_variants
+    edits = parse_variants(variants, vcf)
+    if not edits:
+        raise ValueError("No edits given.")
+    data = sequence.encode("ascii")
+    with stage("apply_edits"):
+        edited, splices = apply_edits(data, edits)
+        edited_id = content_id(edited)
+    with stage("edit_delta"):
+        delta = edit_delta(data, edited, edits, splices, min_orf_length, orf_mode, both_strands,
+                           include_sequence, genetic_code, primer_length, window, sequence_id, edited_id)
+    for primer in delta["primers"].values():
+        if primer["after"] != primer["before"] and primer["after"] != "Sequence too short":
+            primer["stats"] = _primer_stats_dict(primer["after"])
+    return {"sequence_id": edited_id, "previous_sequence_id": sequence_id, **delta}, edited
+
+
+# --------------------------
+# --- /orfs
+# --------------------------
+ORF_FIELDS = ("start", "end", "length", "strand", "frame", "sequence", "protein")
+
+
+def find_orfs(sequence, min_length=0, mode="nested", both_strands=False, include_sequence=True,
+              cursor=None, limit=None, fields=None):
+    # Without ``limit`` this is the original full listing. With it, one page
+    # of ORFs is returned with a next_cursor and the input is not echoed
+    # back. ``fields`` selects keys of each ORF (see ORF_FIELDS).
+    context = _context(sequence)
+    cleaned_sequence = context.text
+    if fields is not None:
+        include_sequence = include_sequence and bool({"sequence", "protein"} & set(fields))
+    offset = decode_cursor(cursor)
+    orfs = iter_orfs(cleaned_sequence, min_length=min_length, mode=mode,
+                     both_strands=both_strands, include_sequence=include_sequence,
+                     offset=offset, limit=None if limit is None else limit + 1, context=context)
+    with stage("orfs"):
+        orfs, next_cursor = page_of((select_fields(orf, fields) for orf in orfs), offset, limit)
+    if limit is None:
+        return {
+            "sequence": cleaned_sequence,
+            "orfs_found": len(orfs),
+            "orfs": orfs
+        }
+    return {
+        "orfs_found": len(context.orfs(min_length, mode, both_strands)),
+        "orfs": orfs,
+        "next_cursor": next_cursor,
+    }
+
+
+def stream_orfs(sequence, min_length=0, mode="nested", both_strands=False, include_sequence=True,
+                cursor=None, limit=None, fields=None):
+    # Generator of ORF dicts for NDJSON streaming; runs in the caller's
+    # thread, one ORF at a time.
+    context = _context(sequence)
+    if fields is not None:
+        include_sequence = include_sequence and bool({"sequence", "protein"} & set(fields))
+    orfs = iter_orfs(context.text, min_length=min_length, mode=mode,
+                     both_strands=both_strands, include_sequence=include_sequence,
+                     offset=decode_cursor(cursor), limit=limit, context=context)
+    return (select_fields(orf, fields) for orf in orfs)
+
+
+# --------------------------
+# --- /translate
+# --------------------------
+def translate_frames(sequence, genetic_code=1, read_through=True):
+    context = _context(sequence)
+    with stage("translate"):
+        frames = context.six_frames(genetic_code, read_through)
+    return {
+        "sequence": context.text,
+        "genetic_code": genetic_code,
+        "genetic_code_name": GENETIC_CODES[genetic_code][0],
+        "frames": {f"{frame:+d}": protein for frame, protein in frames.items()}
+    }
+
+
+# --------------------------
+# --- /primers
+# --------------------------
+def design_primers(sequence, options):
+    from primers import design_primers as design_primer_pairs
+    cleaned_sequence = _clean(sequence)
+    designed = design_primer_pairs(cleaned_sequence, **options)
+    return {
+        "length": len(cleaned_sequence),
+        "pairs_found": len(designed["pairs"]),
+        **designed,
+    }
+
+
+# --------------------------
+# --- /profile
+# --------------------------
+def profile_sequence(sequence, window=None, step=None, points=1000, tracks=None, k=None):
+    import composition
+    tracks = composition.TRACKS if tracks is None else tracks
+    cleaned_sequence = _clean(sequence)
+    digest = hashlib.sha256(cleaned_sequence.encode("ascii")).hexdigest()
+    profile = composition.get_profile(("sequence", digest), lambda: cleaned_sequence)
+    return composition.sequence_profile(cleaned_sequence, window, step, points, tracks, k, profile)
+
+
+def profile_stored(path, name, start, end, window=None, step=None, points=1000,
+                   tracks=None, k=None):
+    # Reads the region from the .2bit file in the worker instead of shipping
+    # it through the pool; N bases are left out of every window's counts.
+    import composition
+    from twobit import TwoBitFile
+    tracks = composition.TRACKS if tracks is None else tracks
+
+    def load():
+        with TwoBitFile(path) as twobit:
+            return twobit.fetch(name, start, end)
+    key = ("store", path, os.path.getmtime(path), name, start, end)
+    profile = composition.get_profile(key, load)
+    result = composition.sequence_profile(None, window, step, points, tracks, k, profile)
+    result["positions"] = [start + position for position in result["positions"]]
+    return result
+
+
+# --------------------------
+# --- /analyze/batch
+# --------------------------
+def analyze_batch(records, primer_length=20, include_sequences=False):
+    return list(analyze_records(records, primer_length, include_sequences))
+
+
+# --------------------------
+# --- /store
+# --------------------------
+def pack_twobit(source, path):
+    """Pack a FASTA/FASTQ file into the .2bit file ``path``."""
+    from twobit import write_twobit
+    try:
+        write_twobit(path, ((r.id, r.sequence) for r in read_records(source)))
+    except READ_ERRORS as e:
+        raise ValueError(f"Could not read the upload: {e}")
+
+
+def analyze_stored(path, name, start, end, primer_length=20, include_reverse_complement=True):
+    # GC is counted on the packed bytes without unpacking the region; N
+    # bases are left out of the percentage, as clean_sequence would drop them.
+    from twobit import TwoBitFile
+    with TwoBitFile(path) as twobit:
+        n_count = twobit.n_count(name, start, end)
+        called = end - start - n_count
+        gc = round(twobit.gc_count(name, start, end) / called * 100, 2) if called else None
+        region = twobit.fetch(name, start, end)
+    results = {"length": end - start, "n_count": n_count, "gc_content": gc}
+    if include_reverse_complement:
+        results["reverse_complement"] = seqcore.reverse_complement_bytes(region, strict=False).decode("ascii")
+
+    # Primers come from the region's ends as they are; an N in either window
+    # is refused the same way, rather than returned or failing to complement.
+    for window, end_name in ((region[:primer_length], "5'"), (region[-primer_length:], "3'")):
+        if len(region) >= primer_length and window.strip(b"ACGT"):
+            raise ValueError(f"The {primer_length} bp primer window at the region's {end_name} end "
+                             f"contains unknown (N) bases; move start or end.")
+    forward_primer, reverse_primer = get_primers(region, primer_length)
+    if isinstance(forward_primer, bytes):
+        forward_primer = forward_primer.decode("ascii")
+        reverse_primer = reverse_primer.decode("ascii")
+    results.update({
+        "forward_primer": forward_primer,
+        "reverse_primer": reverse_primer,
+        "forward_primer_stats": _primer_stats_dict(forward_primer),
+        "reverse_primer_stats": _primer_stats_dict(reverse_primer),
+    })
+    return results
+
+
+def find_stored_orfs(path, name, start, end, min_length=0, mode="nested", both_strands=False,
+                     include_sequence=False):
+    # Coordinates are moved onto the stored sequence; frames count from the region start.
+    from twobit import TwoBitFile
+    with TwoBitFile(path) as twobit:
+        region = twobit.fetch(name, start, end)
+    orfs = find_orfs_with_translation(region, min_length=min_length, mode=mode,
+                                      both_strands=both_strands, include_sequence=include_sequence)
+    for orf in orfs:
+        orf["start"] += start
+        orf["end"] += start
+        if include_sequence:
+            orf["sequence"] = orf["sequence"].decode("ascii")
+    return {"orfs_found": len(orfs), "orfs": orfs}
+
+
+# --------------------------
+# --- /kmers, /motifs, /repeats, /restriction
+# --------------------------
+def count_kmers(sequence, k, top=20, canonical=False):
+    from kmers import top_kmers
+    cleaned_sequence = _clean(sequence)
+    return {"length": len(cleaned_sequence), **top_kmers(cleaned_sequence, k, top, canonical)}
+
+
+def search_motifs(sequence, patterns, both_strands=True):
+    from motifs import find_motifs
+    cleaned_sequence = _clean(sequence)
+    return {"length": len(cleaned_sequence), **find_motifs(cleaned_sequence, patterns, both_strands)}
+
+
+def find_repeats(sequence, min_period=1, max_period=6, min_copies=3, min_length=10):
+    from kmers import tandem_repeats
+    cleaned_sequence = _clean(sequence)
+    repeats = tandem_repeats(cleaned_sequence, min_period, max_period, min_copies, min_length)
+    return {"length": len(cleaned_sequence), "repeats_found": len(repeats), "repeats": repeats}
+
+
+def map_restriction_sites(sequence, enzymes=None, include_fragments=True):
+    from restriction import restriction_map
+    return restriction_map(_clean(sequence), enzymes, include_fragments)
+
+
+# --------------------------
+# --- /offtarget
+# --------------------------
+# Opened indexes per worker process; the arrays are memory-mapped, so the
+# OS page cache is shared between workers and reopening is cheap.
+_OFFTARGET_INDEXES = {}
+
+
+def _offtarget_index(path):
+    from offtarget import OffTargetIndex
+    mtime = os.path.getmtime(os.path.join(path, "meta.json"))
+    cached = _OFFTARGET_INDEXES.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = _OFFTARGET_INDEXES[path] = (mtime, OffTargetIndex(path))
+    return cached[1]
+
+
+def build_offtarget(path, references, k=None):
+    """Build the index at ``path`` from a FASTA/FASTQ file; returns its summary."""
+    from offtarget import DEFAULT_K, build_index
+    k = DEFAULT_K if k is None else k
+    try:
+        index = build_index(path, ((r.id, r.sequence) for r in read_records(references)), k)
+    except READ_ERRORS as e:
+        # A corrupt or truncated gzip upload surfaces only while reading.
+        raise ValueError(f"Could not read the references: {e}")
+    return index.summary()
+
+
+def offtarget_search(path, primers, max_mismatches=3, max_amplicon=3000,
+                     max_three_prime_mismatches=None):
+    index = _offtarget_index(path)
+    return {
+        "primers": primers,
+        **index.search(primers, max_mismatches, max_amplicon, max_three_prime_mismatches),
+    }
+
+
+def ping():
+    """No-op used to start worker processes ahead of the first request."""
+    return True
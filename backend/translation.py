@@ -0,0 +1,163 @@
+# Translation Engine
+# Table-driven DNA -> protein translation.
+# Each genetic code is compiled once at import into a 256-byte
+# ``bytes.translate`` table indexed by 2-bit codon index (see
+# seqcore.codon_indices), so translating a frame is one NumPy slice plus
+# one ``bytes.translate`` call with no per-codon Python work.
+
+import functools
+
+import seqcore
+
+STOP_SYMBOL = "_"
+UNKNOWN_SYMBOL = "?"
+FRAMES = (1, 2, 3, -1, -2, -3)
+
+# --------------------------
+# --- NCBI Genetic Codes
+# --------------------------
+# Amino acids in NCBI order (first/second/third base over T, C, A, G),
+# '*' marks a stop; codons that are stop-or-sense in context (tables
+# 27, 28, 31) translate as their amino acid, as in NCBI's ncbieaa strings.
+# https://www.ncbi.nlm.nih.gov/Taxonomy/Utils/wprintgc.cgi
+GENETIC_CODES = {
+    1: ("Standard",
+        "FFLLSSSSYY**CC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"),
+    2: ("Vertebrate Mitochondrial",
+        "FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIMMTTTTNNKKSS**VVVVAAAADDEEGGGG"),
+    3: ("Yeast Mitochondrial",
+        "FFLLSSSSYY**CCWWTTTTPPPPHHQQRRRRIIMMTTTTNNKKSSRRVVVVAAAADDEEGGGG"),
+    4: ("Mold Mitochondrial",
+        "FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"),
+    5: ("Invertebrate Mitochondrial",
+        "FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIMMTTTTNNKKSSSSVVVVAAAADDEEGGGG"),
+    6: ("Ciliate Nuclear",
+        "FFLLSSSSYYQQCC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"),
+    9: ("Echinoderm Mitochondrial",
+        "FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIIMTTTTNNNKSSSSVVVVAAAADDEEGGGG"),
+    10: ("Euplotid Nuclear",
+        "FFLLSSSSYY**CCCWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"),
+    11: ("Bacterial",
+        "FFLLSSSSYY**CC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"),
+    12: ("Alternative Yeast Nuclear",
+        "FFLLSSSSYY**CC*WLLLSPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"),
+    13: ("Ascidian Mitochondrial",
+        "FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIMMTTTTNNKKSSGGVVVVAAAADDEEGGGG"),
+    14: ("Alternative Flatworm Mitochondrial",
+        "FFLLSSSSYYY*CCWWLLLLPPPPHHQQRRRRIIIMTTTTNNNKSSSSVVVVAAAADDEEGGGG"),
+    15: ("Blepharisma Macronuclear",
+        "FFLLSSSSYY*QCC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"),
+    16: ("Chlorophycean Mitochondrial",
+        "FFLLSSSSYY*LCC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"),
+    21: ("Trematode Mitochondrial",
+        "FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIMMTTTTNNNKSSSSVVVVAAAADDEEGGGG"),
+    22: ("Scenedesmus obliquus Mitochondrial",
+        "FFLLSS*SYY*LCC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"),
+    23: ("Thraustochytrium Mitochondrial",
+        "FF*LSSSSYY**CC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"),
+    24: ("Pterobranchia Mitochondrial",
+        "FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSSKVVVVAAAADDEEGGGG"),
+    25: ("Candidate Division SR1",
+        "FFLLSSSSYY**CCGWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"),
+    26: ("Pachysolen tannophilus Nuclear",
+        "FFLLSSSSYY**CC*WLLLAPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"),
+    27: ("Karyorelict Nuclear",
+        "FFLLSSSSYYQQCCWWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"),
+    28: ("Condylostoma Nuclear",
+        "FFLLSSSSYYQQCCWWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"),
+    29: ("Mesodinium Nuclear",
+        "FFLLSSSSYYYYCC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"),
+    30: ("Peritrich Nuclear",
+        "FFLLSSSSYYEECC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"),
+    31: ("Blastocrithidia Nuclear",
+        "FFLLSSSSYYEECCWWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"),
+    32: ("Balanophoraceae Plastid",
+        "FFLLSSSSYY*WCC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"),
+    33: ("Cephalodiscidae Mitochondrial",
+        "FFLLSSSSYYY*CCWWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSSKVVVVAAAADDEEGGGG"),
+}
+
+_NCBI_ORDER = "TCAG"
+
+
+def _compile(aas):
+    table = bytearray(UNKNOWN_SYMBOL.encode("ascii") * 256)
+    for idx in range(64):
+        a, b, c = (seqcore.BASES[idx >> 4], seqcore.BASES[(idx >> 2) & 3], seqcore.BASES[idx & 3])
+        ncbi = (_NCBI_ORDER.index(chr(a)) * 16 + _NCBI_ORDER.index(chr(b)) * 4
+                + _NCBI_ORDER.index(chr(c)))
+        aa = aas[ncbi]
+        table[idx] = ord(STOP_SYMBOL if aa == "*" else aa)
+    return bytes(table)
+
+
+_TABLES = {code: _compile(aas) for code, (_, aas) in GENETIC_CODES.items()}
+
+
+def get_table(code=1):
+    """256-byte translate table for an NCBI genetic code id."""
+    try:
+        return _TABLES[code]
+    except KeyError:
+        raise ValueError(f"Unknown genetic code {code}. Choose one of {sorted(_TABLES)}") from None
+
+
+def stop_codons(code=1):
+    """Stop codons of a genetic code, e.g. ('TAA', 'TAG', 'TGA')."""
+    table = get_table(code)
+    return tuple(
+        "".join(chr(seqcore.BASES[(idx >> shift) & 3]) for shift in (4, 2, 0))
+        for idx in range(64) if table[idx] == ord(STOP_SYMBOL)
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def codon_table(code=1):
+    """{codon: amino acid} for a genetic code, for translating a handful of codons."""
+    table = get_table(code)
+    return {
+        "".join(chr(seqcore.BASES[(idx >> shift) & 3]) for shift in (4, 2, 0)): chr(table[idx])
+        for idx in range(64)
+    }
+
+
+# --------------------------
+# --- Translation
+# --------------------------
+def _translate_indices(idx, table, read_through):
+    protein = idx.tobytes().translate(table)
+    if not read_through:
+        stop = protein.find(b"_")
+        if stop != -1:
+            protein = protein[:stop]
+    return protein.decode("ascii")
+
+
+def translate(seq, code=1, frame=1, read_through=False, indices=None):
+    """Translate one frame of ``seq``.
+
+    ``frame`` is 1-3 for the forward strand and -1 to -3 for the reverse
+    complement. Translation stops before the first stop codon unless
+    ``read_through`` is set, in which case stops appear as '_'. Codons with
+    non-ACGT bases translate to '?'. ``indices`` may pass precomputed
+    codon indices for the strand being translated.
+    """
+    if frame not in FRAMES:
+        raise ValueError(f"frame must be one of {FRAMES}, got {frame}")
+    table = get_table(code)
+    if indices is None:
+        strand = seq if frame > 0 else seqcore.reverse_complement_bytes(seq, strict=False)
+        indices = seqcore.codon_indices(strand)
+    return _translate_indices(indices[abs(frame) - 1::3], table, read_through)
+
+
+def translate_frames(seq, code=1, read_through=True):
+    """Translate all six frames at once; returns a dict keyed by frame."""
+    table = get_table(code)
+    forward = seqcore.codon_indices(seq)
+    reverse = seqcore.codon_indices(seqcore.reverse_complement_bytes(seq, strict=False))
+    frames = {}
+    for frame in FRAMES:
+        idx = forward if frame > 0 else reverse
+        frames[frame] = _translate_indices(idx[abs(frame) - 1::3], table, read_through)
+    return frames
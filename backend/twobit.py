@@ -0,0 +1,305 @@
+# 2-bit Sequence Store
+# Reads and writes UCSC .2bit files (4 bases per byte, N runs kept as
+# blocks) and serves subranges straight out of an mmap, so a 3 Gbp genome
+# costs ~750 MB on disk and only the pages a request touches in memory.
+#   python twobit.py pack genome.fa.gz genome.2bit
+#   python twobit.py list genome.2bit
+
+import argparse
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+
+import numpy as np
+
+import seqcore
+
+SIGNATURE = 0x1A412743
+# .2bit base order: T=0, C=1, A=2, G=3
+TWOBIT_BASES = b"TCAG"
+# Bytes per packed-data chunk when scanning a whole sequence (~4 Mbp).
+SCAN_CHUNK = 1 << 20
+
+_PACK_LUT = np.full(256, 255, dtype=np.uint8)
+for _code, _base in enumerate(TWOBIT_BASES):
+    _PACK_LUT[_base] = _code
+    _PACK_LUT[_base + 32] = _code  # lowercase
+
+# Each packed byte unpacks to 4 ASCII bases.
+_UNPACK_LUT = np.array(
+    [[TWOBIT_BASES[(byte >> shift) & 3] for shift in (6, 4, 2, 0)] for byte in range(256)],
+    dtype=np.uint8,
+)
+# G/C count of each packed byte (C=1, G=3).
+_GC_LUT = np.array(
+    [sum(((byte >> shift) & 3) in (1, 3) for shift in (6, 4, 2, 0)) for byte in range(256)],
+    dtype=np.uint8,
+)
+
+
+# --------------------------
+# --- Writing
+# --------------------------
+def _n_blocks(codes):
+    """(starts, sizes) of runs that are not A/C/G/T."""
+    bad = np.concatenate(([False], codes == 255, [False]))
+    edges = np.flatnonzero(bad[1:] != bad[:-1])
+    starts = edges[0::2]
+    return starts, edges[1::2] - starts
+
+
+def pack_record(seq):
+    """Serialise one sequence as a .2bit record (header plus packed DNA)."""
+    codes = _PACK_LUT[seqcore.as_array(seq)]
+    n_starts, n_sizes = _n_blocks(codes)
+    size = len(codes)
+    padded = np.zeros((size + 3) // 4 * 4, dtype=np.uint8)
+    padded[:size] = np.where(codes == 255, 0, codes)
+    quads = padded.reshape(-1, 4)
+    packed = (quads[:, 0] << 6) | (quads[:, 1] << 4) | (quads[:, 2] << 2) | quads[:, 3]
+    return b"".join([
+        struct.pack("<II", size, len(n_starts)),
+        n_starts.astype("<u4").tobytes(),
+        n_sizes.astype("<u4").tobytes(),
+        struct.pack("<II", 0, 0),  # no soft-mask blocks, reserved
+        packed.tobytes(),
+    ])
+
+
+def write_twobit(path, records):
+    """Write ``(name, sequence)`` pairs to a .2bit file one record at a time.
+
+    Records are packed into a temporary file first because the index at the
+    top of the file needs every record's offset.
+    """
+    names, sizes = [], []
+    with tempfile.TemporaryFile() as body:
+        for name, seq in records:
+            record = pack_record(seq)
+            body.write(record)
+            names.append(name.encode("utf-8"))
+            sizes.append(len(record))
+
+        header_size = 16 + sum(1 + len(name) + 4 for name in names)
+        offset = header_size
+        with open(path, "wb") as out:
+            out.write(struct.pack("<IIII", SIGNATURE, 0, len(names), 0))
+            for name, size in zip(names, sizes):
+                if len(name) > 255:
+                    raise ValueError(f"Sequence name too long for .2bit: {name[:40]!r}...")
+                out.write(struct.pack("<B", len(name)) + name + struct.pack("<I", offset))
+                offset += size
+            if offset >= 1 << 32:
+                raise ValueError(".2bit version 0 files are limited to 4 GB.")
+            body.seek(0)
+            shutil.copyfileobj(body, out)
+
+
+# --------------------------
+# --- Reading
+# --------------------------
+class TwoBitFile:
+    """Memory-mapped .2bit file with zero-copy access to packed subranges.
+
+    Coordinates are 0-based and half-open, like Python slices.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self._data = np.frombuffer(self._mm, dtype=np.uint8)
+        signature, version, count, _ = struct.unpack_from("<IIII", self._mm, 0)
+        if signature != SIGNATURE:
+            raise ValueError(f"{path} is not a little-endian .2bit file.")
+        offset_format = "<I" if version == 0 else "<Q"
+        offset_size = struct.calcsize(offset_format)
+
+        self._offsets = {}
+        pos = 16
+        for _ in range(count):
+            name_len = self._mm[pos]
+            name = self._mm[pos + 1:pos + 1 + name_len].decode("utf-8")
+            pos += 1 + name_len
+            self._offsets[name] = struct.unpack_from(offset_format, self._mm, pos)[0]
+            pos += offset_size
+        self._records = {}
+
+    def close(self):
+        self._data = None
+        self._records = {}
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __contains__(self, name):
+        return name in self._offsets
+
+    def names(self):
+        return list(self._offsets)
+
+    def _record(self, name):
+        """(length, n_starts, n_sizes, packed) for a sequence, parsed once."""
+        if name not in self._records:
+            if name not in self._offsets:
+                raise KeyError(name)
+            pos = self._offsets[name]
+            size, n_count = struct.unpack_from("<II", self._mm, pos)
+            pos += 8
+            n_starts = np.frombuffer(self._mm, dtype="<u4", count=n_count, offset=pos)
+            n_sizes = np.frombuffer(self._mm, dtype="<u4", count=n_count, offset=pos + 4 * n_count)
+            pos += 8 * n_count
+            (mask_count,) = struct.unpack_from("<I", self._mm, pos)
+            pos += 4 + 8 * mask_count + 4
+            packed = self._data[pos:pos + (size + 3) // 4]
+            self._records[name] = (size, n_starts, n_sizes, packed)
+        return self._records[name]
+
+    def length(self, name):
+        return self._record(name)[0]
+
+    def _bounds(self, name, start, end):
+        size = self.length(name)
+        end = size if end is None else end
+        if not 0 <= start <= end <= size:
+            raise ValueError(f"Region {start}-{end} is outside {name} (length {size}).")
+        return start, end
+
+    def packed(self, name, start=0, end=None):
+        """Zero-copy uint8 view of the packed bytes covering [start, end)."""
+        start, end = self._bounds(name, start, end)
+        return self._record(name)[3][start // 4:(end + 3) // 4]
+
+    def _n_overlaps(self, name, start, end):
+        _, n_starts, n_sizes, _ = self._record(name)
+        n_ends = n_starts.astype(np.int64) + n_sizes
+        first = np.searchsorted(n_ends, start, side="right")
+        last = np.searchsorted(n_starts, end, side="left")
+        for i in range(first, last):
+            yield max(int(n_starts[i]), start), min(int(n_ends[i]), end)
+
+    def fetch(self, name, start=0, end=None):
+        """Uppercase ASCII bytes for [start, end), with 'N' over N blocks."""
+        start, end = self._bounds(name, start, end)
+        bases = _UNPACK_LUT[self.packed(name, start, end)].reshape(-1)
+        offset = start % 4
+        bases = bases[offset:offset + end - start]
+        for n_start, n_end in self._n_overlaps(name, start, end):
+            bases[n_start - start:n_end - start] = ord("N")
+        return bases.tobytes()
+
+    def n_count(self, name, start=0, end=None):
+        start, end = self._bounds(name, start, end)
+        return sum(n_end - n_start for n_start, n_end in self._n_overlaps(name, start, end))
+
+    def gc_count(self, name, start=0, end=None):
+        """G+C bases in [start, end), counted on the packed bytes in chunks."""
+        start, end = self._bounds(name, start, end)
+        if start == end:
+            return 0
+        # Whole bytes strictly inside the region go through the lookup table;
+        # the ragged edges are unpacked.
+        inner_start, inner_end = (start + 3) // 4 * 4, end // 4 * 4
+        if inner_start >= inner_end:
+            bases = self.fetch(name, start, end)
+            return bases.count(b"G") + bases.count(b"C")
+        head = self.fetch(name, start, inner_start)
+        tail = self.fetch(name, inner_end, end)
+        gc = head.count(b"G") + head.count(b"C") + tail.count(b"G") + tail.count(b"C")
+        packed = self._record(name)[3]
+        for pos in range(inner_start // 4, inner_end // 4, SCAN_CHUNK):
+            chunk = packed[pos:min(pos + SCAN_CHUNK, inner_end // 4)]
+            gc += int(_GC_LUT[chunk].sum(dtype=np.int64))
+        # N blocks are packed as T, so they never add to the G+C count.
+        return gc
+
+
+# --------------------------
+# --- Sequence Store
+# --------------------------
+class SequenceStore:
+    """Named .2bit files in one directory; sequence IDs are '<file>:<name>'
+    or just '<name>' when it is unique across the store."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._files = {}
+        self.refresh()
+
+    def refresh(self):
+        for entry in sorted(os.listdir(self.directory)):
+            if entry.endswith(".2bit") and entry[:-5] not in self._files:
+                self._files[entry[:-5]] = TwoBitFile(os.path.join(self.directory, entry))
+
+    def add(self, file_id, records):
+        """Pack ``(name, sequence)`` records into '<file_id>.2bit' and open it."""
+        path = os.path.join(self.directory, f"{file_id}.2bit")
+        if file_id in self._files:
+            self._files.pop(file_id).close()
+        write_twobit(path, records)
+        self._files[file_id] = TwoBitFile(path)
+        return self._files[file_id]
+
+    def install(self, file_id, packed_path):
+        """Move an already packed .2bit file into the store as '<file_id>' and open it."""
+        path = os.path.join(self.directory, f"{file_id}.2bit")
+        if file_id in self._files:
+            self._files.pop(file_id).close()
+        os.replace(packed_path, path)
+        self._files[file_id] = TwoBitFile(path)
+        return self._files[file_id]
+
+    def sequences(self):
+        return [
+            {"id": f"{file_id}:{name}", "file": file_id, "name": name, "length": twobit.length(name)}
+            for file_id, twobit in self._files.items() for name in twobit.names()
+        ]
+
+    def resolve(self, seq_id):
+        """Return (TwoBitFile, name) for a sequence ID; KeyError if unknown."""
+        file_id, sep, name = seq_id.partition(":")
+        if sep and file_id in self._files and name in self._files[file_id]:
+            return self._files[file_id], name
+        matches = [twobit for twobit in self._files.values() if seq_id in twobit]
+        if len(matches) == 1:
+            return matches[0], seq_id
+        if len(matches) > 1:
+            raise KeyError(f"Sequence '{seq_id}' is ambiguous; use '<file>:{seq_id}'.")
+        raise KeyError(f"Unknown sequence '{seq_id}'.")
+
+    def close(self):
+        for twobit in self._files.values():
+            twobit.close()
+        self._files = {}
+
+
+# --------------------------
+# --- CLI
+# --------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pack FASTA into .2bit or list a .2bit file.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    pack = commands.add_parser("pack", help="FASTA/FASTQ (gzip ok) -> .2bit")
+    pack.add_argument("input")
+    pack.add_argument("output")
+    listing = commands.add_parser("list", help="print sequence names and lengths")
+    listing.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "pack":
+        from seqio import read_records
+        write_twobit(args.output, ((r.id, r.sequence) for r in read_records(args.input)))
+    else:
+        with TwoBitFile(args.path) as twobit:
+            for name in twobit.names():
+                print(f"{name}\t{twobit.length(name)}")
+
+
+if __name__ == "__main__":
+    main()
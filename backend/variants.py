@@ -0,0 +1,253 @@
+# Variant Scanner
+# Checks many SNVs / indels against one reference sequence in a single pass.
+# - Input: VCF text, or a list of "45:A>G", "45 AT>A", "A>G at position 45"
+# - Each variant is checked against the reference, located against the
+#   primers and ORFs through an interval index, and classified
+#   (synonymous, missense, nonsense, stop_lost, start_lost, frameshift,
+#   inframe_indel)
+# - Results carry a short context string around the change instead of
+#   copies of the whole sequence
+
+import re
+from collections import Counter, namedtuple
+
+import orfs as orfs_engine
+import seqcore
+import translation
+from intervals import IntervalIndex
+
+# position is 1-based; an empty ref is an insertion before ``position``,
+# an empty alt a deletion of ``ref``.
+Variant = namedtuple("Variant", ["position", "ref", "alt", "id"])
+
+_LEGACY_RE = re.compile(r"([ATGC])>([ATGC]) at position (\d+)")
+_COMPACT_RE = re.compile(r"(\d+)\s*[:\s]\s*([ACGTN]*|-)\s*>\s*([ACGTN]*|-)")
+_ALLELE_RE = re.compile(r"[ACGTN]+")
+
+
+# --------------------------
+# --- Parsing
+# --------------------------
+def parse_variant(text, variant_id=None):
+    """Parse one variant string: '45:A>G', '45 AT>A', '45 A>-' or 'A>G at position 45'."""
+    text = text.strip()
+    match = _LEGACY_RE.fullmatch(text)
+    if match:
+        ref, alt, pos = match.groups()
+        return Variant(int(pos), ref, alt, variant_id)
+    match = _COMPACT_RE.fullmatch(text.upper())
+    if not match:
+        raise ValueError(f"Cannot parse variant '{text}'. Use e.g. '45:A>G' or 'A>G at position 45'.")
+    pos, ref, alt = match.groups()
+    ref, alt = ref.replace("-", ""), alt.replace("-", "")
+    if ref == alt:
+        raise ValueError(f"Variant '{text}' does not change the sequence.")
+    return Variant(int(pos), ref, alt, variant_id)
+
+
+def parse_vcf(text):
+    """Yield Variants from VCF text; multi-allelic records give one per ALT.
+
+    Symbolic and missing alleles (<DEL>, *, .) cannot be applied to a
+    plain sequence and are skipped.
+    """
+    for line_no, line in enumerate(text.splitlines(), 1):
+        if not line.strip() or line.startswith("#"):
+            continue
+        fields = line.split("\t") if "\t" in line else line.split()
+        if len(fields) < 5 or not fields[1].isdigit():
+            raise ValueError(f"VCF line {line_no}: expected CHROM POS ID REF ALT.")
+        _, pos, vid, ref, alts = fields[:5]
+        ref = ref.upper()
+        if not _ALLELE_RE.fullmatch(ref):
+            raise ValueError(f"VCF line {line_no}: invalid REF '{ref}'.")
+        for alt in alts.upper().split(","):
+            if _ALLELE_RE.fullmatch(alt):
+                yield Variant(int(pos), ref, alt, None if vid == "." else vid)
+
+
+def parse_variants(variants=None, vcf=None):
+    """Variants from a list of strings and/or VCF text."""
+    parsed = [parse_variant(text) for text in variants or []]
+    if vcf:
+        parsed.extend(parse_vcf(vcf))
+    return parsed
+
+
+def variant_type(variant):
+    ref_len, alt_len = len(variant.ref), len(variant.alt)
+    if ref_len == alt_len:
+        return "snv" if ref_len == 1 else "mnv"
+    if ref_len == 0 or (alt_len > ref_len and variant.alt.startswith(variant.ref)):
+        return "insertion"
+    if alt_len == 0 or (ref_len > alt_len and variant.ref.startswith(variant.alt)):
+        return "deletion"
+    return "complex"
+
+
+# --------------------------
+# --- Region Index
+# --------------------------
+def _primer_regions(seq, forward_primer, reverse_primer):
+    """1-based (start, end) of each primer's binding site, falling back to the ends."""
+    n = len(seq)
+    regions = []
+    if forward_primer:
+        at = seq.find(forward_primer)
+        start = at + 1 if at != -1 else 1
+        regions.append((start, min(start + len(forward_primer) - 1, n), "forward_primer"))
+    if reverse_primer:
+        site = seqcore.reverse_complement_bytes(reverse_primer, strict=False).decode("ascii")
+        at = seq.rfind(site)
+        start = at + 1 if at != -1 else max(n - len(reverse_primer) + 1, 1)
+        regions.append((start, min(start + len(reverse_primer) - 1, n), "reverse_primer"))
+    return regions
+
+
+def build_index(seq, forward_primer=None, reverse_primer=None, min_orf_length=0,
+                orf_mode="longest", both_strands=True):
+    """IntervalIndex over the primer sites and ORFs of ``seq``.
+
+    Primer labels are strings; ORF labels are (strand, frame, start, end).
+    """
+    intervals = _primer_regions(seq, forward_primer, reverse_primer)
+    for orf in orfs_engine.scan_orfs(seq, min_orf_length, orf_mode, both_strands):
+        intervals.append((orf[2], orf[3], orf))
+    return IntervalIndex(intervals)
+
+
+# --------------------------
+# --- Effects
+# --------------------------
+def _translate_codons(span, genetic_code):
+    table = translation.codon_table(genetic_code)
+    return "".join(table.get(span[i:i + 3], translation.UNKNOWN_SYMBOL)
+                   for i in range(0, len(span) - 2, 3))
+
+
+def _codon_effect(seq, orf, variant, genetic_code):
+    """Amino-acid consequence of a same-length substitution inside an ORF."""
+    strand, frame, start, end = orf
+    first = max(variant.position, start)
+    last = min(variant.position + len(variant.ref) - 1, end)
+    if strand == "+":
+        k_lo, k_hi = (first - start) // 3, (last - start) // 3
+        span_start, span_end = start + 3 * k_lo, start + 3 * k_hi + 2
+    else:
+        k_lo, k_hi = (end - last) // 3, (end - first) // 3
+        span_start, span_end = end - 3 * k_hi - 2, end - 3 * k_lo
+
+    ref_span = seq[span_start - 1:span_end]
+    bases = list(ref_span)
+    for i, base in enumerate(variant.alt):
+        at = variant.position + i - span_start
+        if 0 <= at < len(bases):
+            bases[at] = base
+    alt_span = "".join(bases)
+    if strand == "-":
+        ref_span = seqcore.reverse_complement_bytes(ref_span, strict=False).decode("ascii")
+        alt_span = seqcore.reverse_complement_bytes(alt_span, strict=False).decode("ascii")
+    ref_aa = _translate_codons(ref_span, genetic_code)
+    alt_aa = _translate_codons(alt_span, genetic_code)
+
+    if ref_aa == alt_aa:
+        consequence = "synonymous"
+    elif k_lo == 0 and ref_aa[0] != alt_aa[0]:
+        consequence = "start_lost"
+    elif alt_aa.count(translation.STOP_SYMBOL) > ref_aa.count(translation.STOP_SYMBOL):
+        consequence = "nonsense"
+    elif translation.STOP_SYMBOL in ref_aa:
+        consequence = "stop_lost"
+    else:
+        consequence = "missense"
+    return {
+        "codon": k_lo + 1,
+        "ref_codon": ref_span,
+        "alt_codon": alt_span,
+        "ref_aa": ref_aa,
+        "alt_aa": alt_aa,
+        "consequence": consequence,
+    }
+
+
+def _orf_effect(seq, orf, variant, genetic_code):
+    strand, frame, start, end = orf
+    effect = {"orf": {"strand": strand, "frame": frame, "start": start, "end": end}}
+    delta = len(variant.alt) - len(variant.ref)
+    if delta == 0:
+        effect.update(_codon_effect(seq, orf, variant, genetic_code))
+    else:
+        effect["consequence"] = "frameshift" if delta % 3 else "inframe_indel"
+    return effect
+
+
+def _context(seq, variant, width):
+    start = variant.position - 1
+    end = start + len(variant.ref)
+    before = seq[max(start - width, 0):start]
+    after = seq[end:end + width]
+    return f"{before}[{variant.ref or '-'}/{variant.alt or '-'}]{after}"
+
+
+# --------------------------
+# --- Batch Scan
+# --------------------------
+def scan_variants(seq, variants, forward_primer=None, reverse_primer=None, genetic_code=1,
+                  min_orf_length=0, orf_mode="longest", both_strands=True, context=10):
+    """Check and classify ``variants`` (Variant tuples) against ``seq``.
+
+    Variants are processed in position order; each result reports where the
+    variant falls (primers, ORFs) and its effect on every overlapping ORF,
+    and ``index``, its 0-based position in ``variants`` (list entries first,
+    then VCF records, as parse_variants returns them).
+    """
+    if isinstance(seq, bytes):
+        seq = seq.decode("ascii")
+    translation.get_table(genetic_code)  # validate before scanning
+    index = build_index(seq, forward_primer, reverse_primer, min_orf_length, orf_mode, both_strands)
+    n = len(seq)
+    summary = Counter()
+    results = []
+    variants = list(variants)
+    order = sorted(range(len(variants)), key=lambda i: (variants[i].position, len(variants[i].ref)))
+    for i in order:
+        variant = variants[i]
+        result = {
+            "index": i,
+            "id": variant.id,
+            "position": variant.position,
+            "ref": variant.ref,
+            "alt": variant.alt,
+            "type": variant_type(variant),
+        }
+        first = variant.position
+        last = first + len(variant.ref) - 1
+        if first < 1 or last > n or (not variant.ref and first > n + 1):
+            result["status"] = "out_of_range"
+        elif seq[first - 1:last] != variant.ref:
+            result["status"] = "ref_mismatch"
+            result["found"] = seq[first - 1:last]
+        else:
+            result["status"] = "ok"
+            # Insertions touch the bases on either side of the insertion point.
+            hits = index.overlapping(first - 1 if not variant.ref else first, max(first, last))
+            result["regions"] = sorted({hit for hit in hits if isinstance(hit, str)})
+            result["effects"] = [_orf_effect(seq, hit, variant, genetic_code)
+                                 for hit in hits if not isinstance(hit, str)]
+            if not result["regions"] and not result["effects"]:
+                result["regions"] = ["intergenic"]
+            for effect in result["effects"]:
+                summary[effect["consequence"]] += 1
+            for region in result["regions"]:
+                summary[region] += 1
+        result["context"] = _context(seq, variant, context)
+        summary[result["status"]] += 1
+        results.append(result)
+
+    return {
+        "length": n,
+        "variants_checked": len(results),
+        "orfs_indexed": sum(1 for label in index.labels if not isinstance(label, str)),
+        "summary": dict(summary),
+        "results": results,
+    }
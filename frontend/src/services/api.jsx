@@ -7,41 +7,93 @@ const api = axios.create({
   timeout: 30000,
 })
 
+// Each sequence is uploaded once (POST /sequences) and then referenced by its
+// sequence_id, so large inputs are not re-sent with every request.
+const sequenceIds = new Map()
+
+const uploadSequence = async (sequence) => {
+  const response = await api.post('/sequences', { sequence })
+  sequenceIds.set(sequence, response.data.sequence_id)
+  return response.data.sequence_id
+}
+
+// Run request(sequenceId), re-uploading once if the server has dropped the ID.
+const withSequenceId = async (sequence, request) => {
+  const sequenceId = sequenceIds.get(sequence) || await uploadSequence(sequence)
+  try {
+    return await request(sequenceId)
+  } catch (error) {
+    if (error.response?.status !== 404) throw error
+    return request(await uploadSequence(sequence))
+  }
+}
+
+// Long analyses run as background jobs (POST /jobs) and are polled until
+// done, so they are not cut off by the request timeout above.
+const JOB_POLL_MS = 1000
+
+const runJob = async (type, params) => {
+  const { data: submitted } = await api.post('/jobs', { type, params })
+  for (;;) {
+    const { data: job } = await api.get(`/jobs/${submitted.id}`)
+    if (job.status === 'succeeded') return job.result
+    if (job.status === 'failed' || job.status === 'cancelled') {
+      // Failed jobs carry the endpoint's error as '<status>: <detail>'.
+      const [, status, detail] = (job.error || '').match(/^(\d{3}): (.*)$/s) || []
+      const error = new Error(job.error || `Job ${job.status}`)
+      error.response = { status: Number(status) || undefined, data: { detail: detail || error.message } }
+      throw error
+    }
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_MS))
+  }
+}
+
 export const dnaAnalysisApi = {
   analyzeSequence: async (sequence, primerLength) => {
-    const response = await api.get('/analyze', {
+    const response = await withSequenceId(sequence, (sequenceId) => api.get('/analyze', {
       params: {
-        sequence,
+        sequence_id: sequenceId,
         primer_length: primerLength
       }
-    })
+    }))
+    return { ...response.data, original_input: sequence }
+  },
+
+  analyzeMutation: async ({ sequence, ...mutationData }) => {
+    const response = await withSequenceId(sequence, (sequenceId) =>
+      api.post('/mutation', { ...mutationData, sequence_id: sequenceId }))
     return response.data
   },
 
-  analyzeMutation: async (mutationData) => {
-    const response = await api.post('/mutation', mutationData)
+  // Applies edits such as '45:A>G' to the stored sequence and returns only
+  // what changed, plus the edited sequence's sequence_id.
+  editSequence: async (sequence, edits, options = {}) => {
+    const response = await withSequenceId(sequence, (sequenceId) =>
+      api.post(`/sequences/${sequenceId}/edits`, { edits, ...options }))
     return response.data
   },
 
   findORFs: async (sequence) => {
-    const response = await api.get('/orfs', {
-      params: { sequence }
-    })
-    return response.data
+    return withSequenceId(sequence, (sequenceId) => runJob('orfs', { sequence_id: sequenceId }))
   },
 
   searchLiterature: async (sequence) => {
-    const response = await api.get('/literature', {
-      params: { sequence }
-    })
-    return response.data
+    return runJob('literature', { sequence })
   },
 
+  // The search is submitted to NCBI in the background; wait for its RID so
+  // the results link can be shown.
   blastSequence: async (sequence) => {
-    const response = await api.get('/blast', {
+    let { data } = await api.get('/blast', {
       params: { sequence }
     })
-    return response.data
+    while (data.search_status === 'submitting') {
+      await new Promise((resolve) => setTimeout(resolve, JOB_POLL_MS))
+      const { data: job } = await api.get(`/blast/${data.id}`)
+      if (job.status === 'failed') return { status: 'failed', message: job.message }
+      data = { ...data, rid: job.rid, result_url: job.result_url, search_status: job.status }
+    }
+    return data
   },
 
   health: async() => {